@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+from lib.position_log import analyze_logs
+from lib.zone_engine.zone_engine_base import ZoneEngineBase
+
+parser = argparse.ArgumentParser(description="Zone occupancy and transition statistics from player position logs (time,player,x,y,z).")
+parser.add_argument("logs", nargs="+", help="position log files, optionally gzipped")
+parser.add_argument("--config", default="../config/region_1.json", help="zone config to look positions up in")
+parser.add_argument("--workers", type=int, default=None, help="worker processes; 0 to run in this process (default: one per CPU)")
+parser.add_argument("--chunk-size", type=int, default=65536, help="positions looked up per batch")
+parser.add_argument("--engine", default="tree", choices=ZoneEngineBase.ENGINE_NAMES, help="spatial index to use")
+parser.add_argument("--json", action="store_true", help="print the results as JSON")
+args = parser.parse_args()
+
+stats, seconds = analyze_logs(args.config, args.logs, workers=args.workers, chunk_size=args.chunk_size, manager_options={"engine": args.engine})
+rows = stats.rows()
+
+if args.json:
+    print(json.dumps({
+        "samples": stats.samples,
+        "seconds": seconds,
+        "zones": [dict(zip(("id", "name", "samples", "dwell", "enters", "exits"), row)) for row in rows],
+    }, indent=2))
+else:
+    print("{:<40} {:>10} {:>12} {:>8} {:>8}".format("Zone", "Samples", "Dwell (s)", "Enters", "Exits"))
+    for zone_id, name, samples, dwell, enters, exits in rows:
+        label = "(no zone)" if zone_id is None else "{} (#{})".format(name, zone_id)
+        print("{:<40} {:>10} {:>12.1f} {:>8} {:>8}".format(label, samples, dwell, enters, exits))
+    print("-"*82)
+    print("{} positions in {:.2f}s: {:.0f} positions/s".format(stats.samples, seconds, stats.samples / max(seconds, 1e-9)))
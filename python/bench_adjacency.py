@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+import json
+import time
+from lib.synthetic import config_bounds, random_walk_trace, random_zones, uniform_trace, zone_centers
+from lib.zone_broad_phase import overlapping_pairs
+from lib.zone_manager import ZoneManager
+
+for config in ("region_1", "region_2"):
+    with open("../config/{}.json".format(config), "r") as fp:
+        zones = json.load(fp)["locationBounds"]
+
+    start = time.perf_counter()
+    manager = ZoneManager(zones, adjacency=True)
+    build_time = time.perf_counter() - start
+    adjacency = manager.adjacency
+    print("{}: built in {:.2f}s, {}".format(config, build_time, adjacency.stats()))
+
+    starts = zone_centers(zones, 40)
+    min_corner, max_corner = config_bounds(zones)
+    traces = (
+        ("walk, step 1", random_walk_trace(starts, 20000, step=1)),
+        ("walk, step 4", random_walk_trace(starts, 20000, step=4)),
+        ("uniform", uniform_trace(min_corner, max_corner, 20000)),
+    )
+
+    for trace_name, trace in traces:
+        root_visits = 0
+        for pos in trace:
+            root_visits += manager.tree.nodes_visited(pos)
+
+        for max_steps in (0, 4):
+            walk_visits = 0
+            node = -1
+            for pos in trace:
+                expected = manager.get_zone(pos)
+                node, checked = adjacency.walk(pos, node, max_steps)
+                walk_visits += checked
+                if (adjacency.zones[node] if node >= 0 else None) is not expected:
+                    raise Exception("Adjacency walk disagrees with the tree at {}".format(pos))
+
+            print("  {:<14} max_steps={}: {:.2f} nodes visited per lookup, vs {:.2f} from the root".format(
+                trace_name, max_steps, walk_visits / len(trace), root_visits / len(trace)
+            ))
+
+        node = -1
+        start = time.perf_counter()
+        for pos in trace:
+            zone, node = manager.get_zone_near(pos, node)
+        near_time = (time.perf_counter() - start) / len(trace) * 1e6
+        start = time.perf_counter()
+        for pos in trace:
+            manager.get_zone(pos)
+        root_time = (time.perf_counter() - start) / len(trace) * 1e6
+        print("  {:<14} get_zone_near {:.2f} us/op, get_zone {:.2f} us/op".format(trace_name, near_time, root_time))
+
+# Large random worlds: the adjacency graph should cost about as much as the engine to build
+print("-"*120)
+for count in (1000, 3000, 10000):
+    side = int(150 * count ** 0.5)
+    zones = random_zones(count, [0, 0, 0], [side, 255, side], [5, 5, 5], [120, 80, 120], seed=count)
+
+    start = time.perf_counter()
+    ZoneManager(zones, engine="grid")
+    engine_time = time.perf_counter() - start
+    start = time.perf_counter()
+    manager = ZoneManager(zones, engine="grid", adjacency=True)
+    adjacency_time = time.perf_counter() - start
+    adjacency = manager.adjacency
+
+    # Nodes must tile the bounds: no two overlap, and their volumes add up
+    mins = [adjacency.box(node)[0] for node in range(len(adjacency))]
+    maxs = [adjacency.box(node)[1] for node in range(len(adjacency))]
+    if any(overlapping_pairs([coord for box_min in mins for coord in box_min], [coord for box_max in maxs for coord in box_max])):
+        raise Exception("Adjacency nodes overlap for {} zones".format(count))
+    volume = 0
+    for box_min, box_max in zip(mins, maxs):
+        volume += (box_max[0] - box_min[0]) * (box_max[1] - box_min[1]) * (box_max[2] - box_min[2])
+    bounds_min, bounds_max = adjacency.bounds
+    if volume != (bounds_max[0] - bounds_min[0]) * (bounds_max[1] - bounds_min[1]) * (bounds_max[2] - bounds_min[2]):
+        raise Exception("Adjacency nodes don't cover the bounds for {} zones".format(count))
+
+    node = -1
+    for pos in uniform_trace([0, 0, 0], [side, 255, side], 5000):
+        zone, node = manager.get_zone_near(pos, node)
+        if zone is not manager.get_zone(pos):
+            raise Exception("Adjacency walk disagrees with the engine at {}".format(pos))
+
+    print("random {:>5}: engine alone {:.2f}s, with adjacency {:.2f}s, {}".format(count, engine_time, adjacency_time, adjacency.stats()))
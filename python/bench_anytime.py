@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+import json
+import time
+from lib.synthetic import config_bounds, random_zones, uniform_trace
+from lib.zone_manager import ZoneManager
+
+worlds = []
+with open("../config/region_1.json", "r") as fp:
+    worlds.append(("region_1", json.load(fp)["locationBounds"]))
+for count in (10000, 20000):
+    # Dense: zones overlap often, so defragmenting has work to do
+    side = int(60 * count ** 0.5)
+    worlds.append(("random {}".format(count), random_zones(count, [0, 0, 0], [side, 255, side], [5, 5, 5], [120, 80, 120], seed=count)))
+
+for name, zones in worlds:
+    min_corner, max_corner = config_bounds(zones)
+    trace = uniform_trace(min_corner, max_corner, 2000)
+
+    start = time.perf_counter()
+    full = ZoneManager(zones, lattice_min_count=None)
+    full.get_zone(trace[0])
+    full_time = time.perf_counter() - start
+    expected = [getattr(zone, "original_id", None) for zone in full.get_zones(trace)]
+
+    # Idle: nothing competes with the background build
+    start = time.perf_counter()
+    manager = ZoneManager(zones, lattice_min_count=None, anytime=True)
+    manager.get_zone(trace[0])
+    first_lookup_time = time.perf_counter() - start
+    manager.wait_refined()
+    idle_final_time = time.perf_counter() - start
+
+    # Busy: keep looking up while the final index is built, as a server would
+    start = time.perf_counter()
+    manager = ZoneManager(zones, lattice_min_count=None, anytime=True)
+    coarse_lookups = 0
+    coarse_time = 0.0
+    while not manager.wait_refined(0):
+        lookup_start = time.perf_counter()
+        result = manager.get_zones(trace[:200])
+        coarse_time += time.perf_counter() - lookup_start
+        if [getattr(zone, "original_id", None) for zone in result] != expected[:200]:
+            raise Exception("Coarse index disagrees with the full build")
+        coarse_lookups += 200
+    busy_final_time = time.perf_counter() - start
+
+    if [getattr(zone, "original_id", None) for zone in manager.get_zones(trace)] != expected:
+        raise Exception("Refined index disagrees with the full build")
+    print("{:<12} full build {:.2f}s; anytime: first lookup after {:.2f}s, final index after {:.2f}s idle, {:.2f}s while serving {} lookups at {:.1f} us/op".format(
+        name, full_time, first_lookup_time, idle_final_time, busy_final_time, coarse_lookups, coarse_time / max(1, coarse_lookups) * 1e6
+    ))
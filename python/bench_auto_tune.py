@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import tempfile
+import time
+from lib.zone_tuner import ZoneTuner
+
+for path in ("../config/region_1.json", "../config/region_2.json"):
+    with open(path, "r") as fp:
+        zones = json.load(fp)["locationBounds"]
+
+    cache_path = os.path.join(tempfile.mkdtemp(), "zone_params.json")
+
+    print("-"*120)
+    print(path)
+    start = time.perf_counter()
+    tuner = ZoneTuner(zones, cache_path=cache_path)
+    manager = tuner.tune()
+    search_time = time.perf_counter() - start
+
+    print("  {:<12} {:<7} {:>10} {:>10} {:>10} {:>10} {:>10}".format("axis_order", "split", "Visits", "Nodes", "Fragments", "Build (s)", "Cost"))
+    for params, stats in zip(tuner.candidates(), tuner.results):
+        print("  {:<12} {:<7} {:>10.3f} {:>10} {:>10} {:>10.3f} {:>10.3f}".format(
+            repr(params["axis_order"]), params["split_mode"], stats["average_visits"], stats["node_count"],
+            stats["fragments"], stats["build_time"], stats["cost"]
+        ))
+    print("  Chose {!r} after searching for {:.3f}s".format(manager.tuned_params, search_time))
+
+    start = time.perf_counter()
+    cached = ZoneTuner(zones, cache_path=cache_path).tune()
+    print("  Reused {!r} from cache in {:.3f}s".format(cached.tuned_params, time.perf_counter() - start))
+
+    os.remove(cache_path)
+    os.rmdir(os.path.dirname(cache_path))
+
+# No zones at all still tunes, to an empty manager
+manager = ZoneTuner([]).tune()
+if manager.get_zone([0, 0, 0]) is not None:
+    raise Exception("Empty tuned manager found a zone")
+print("-"*120)
+print("No zones: chose {!r}".format(manager.tuned_params))
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+import time
+from array import array
+from lib.synthetic import random_zones, uniform_trace
+from lib.zone_broad_phase import overlapping_pairs
+from lib.zone_manager import ZoneManager
+
+def zone_arrays(zones):
+    """Split zone config dicts into the parallel arrays from_arrays() takes."""
+    names = [zone["name"] for zone in zones]
+    types = [zone["type"] for zone in zones]
+    pos1 = array("q", [coord for zone in zones for coord in zone["pos1"]])
+    pos2 = array("q", [coord for zone in zones for coord in zone["pos2"]])
+    return (names, types, pos1, pos2)
+
+def fragment_boxes(manager):
+    """Every zone's fragments as plain lists, to compare two managers."""
+    return [[(fragment._pos.list, fragment._size.list) for fragment in zone.fragments] for zone in manager.zones]
+
+# The broad phase must find exactly the pairs a check of every pair finds
+boxes = random_zones(300, [0, 0, 0], [400, 100, 400], [1, 1, 1], [60, 40, 60], seed=5)
+min_corners = [coord for box in boxes for coord in box["pos1"]]
+max_corners = [coord + 1 for box in boxes for coord in box["pos2"]]
+for cell_size in (None, [1, 1, 1], [7, 300, 13]):
+    pairs = overlapping_pairs(min_corners, max_corners, 3, cell_size)
+    for j in range(len(boxes)):
+        expected = [
+            i for i in range(j)
+            if all(max(min_corners[3*i + axis], min_corners[3*j + axis]) < min(max_corners[3*i + axis], max_corners[3*j + axis]) for axis in range(3))
+        ]
+        if pairs[j] != expected:
+            raise Exception("Broad phase pairs of box {} with cell_size {}: {} != {}".format(j, cell_size, pairs[j], expected))
+
+for count in (10000, 30000, 100000):
+    # Same zone density at every size: about one zone per 150x150 blocks
+    side = int(150 * count ** 0.5)
+    zones = random_zones(count, [0, 0, 0], [side, 255, side], [5, 5, 5], [120, 80, 120], seed=count)
+    names, types, pos1, pos2 = zone_arrays(zones)
+
+    start = time.perf_counter()
+    manager = ZoneManager.from_arrays(names, types, pos1, pos2, engine="tree", lattice_min_count=None)
+    array_time = time.perf_counter() - start
+    num_pairs = sum(len(earlier) for earlier in manager._overlap_candidates())
+    num_fragments = sum(len(zone.fragments) for zone in manager.zones)
+    print("{:>6} zones: from_arrays {:.2f}s, {} overlapping pairs, {} fragments".format(count, array_time, num_pairs, num_fragments))
+
+    if count <= 30000:
+        start = time.perf_counter()
+        dict_manager = ZoneManager(zones, engine="tree", lattice_min_count=None)
+        dict_time = time.perf_counter() - start
+        if fragment_boxes(dict_manager) != fragment_boxes(manager):
+            raise Exception("from_arrays fragments differ from the dict path")
+        trace = uniform_trace([0, 0, 0], [side, 255, side], 20000)
+        if [getattr(zone, "original_id", None) for zone in manager.get_zones(trace)] != [getattr(zone, "original_id", None) for zone in dict_manager.get_zones(trace)]:
+            raise Exception("from_arrays lookups differ from the dict path")
+        print("{:>6} zones: dict path {:.2f}s, same fragments and lookups".format(count, dict_time))
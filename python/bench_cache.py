@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+import json
+import random
+import time
+from lib.synthetic import config_bounds, random_walk_trace, uniform_trace, zone_centers
+from lib.zone_cache import ZoneCache
+from lib.zone_manager import ZoneManager
+
+with open("../config/region_1.json", "r") as fp:
+    zones = json.load(fp)["locationBounds"]
+min_corner, max_corner = config_bounds(zones)
+
+for pos in ((0, 0, 0), (-30000000, -64, 29999999), (33554431, 2047, -33554432)):
+    if ZoneCache.unpack(ZoneCache.pack(pos)) != pos:
+        raise Exception("Packing {} doesn't round trip".format(pos))
+if ZoneCache.pack((10.5, 20.2, -30.7)) != ZoneCache.pack((10, 20, -31)):
+    raise Exception("Float positions must be packed by the block they are in")
+
+# Entities have float positions; cached answers must match uncached ones
+float_trace = [(x + 0.5, y + 0.25, z - 0.75) for x, y, z in uniform_trace(min_corner, max_corner, 2000, seed=2)]
+float_trace += float_trace[:500]
+uncached = ZoneManager(zones)
+cached = ZoneManager(zones, cache_size=10)
+for pos in float_trace:
+    if getattr(cached.get_zone(pos), "original_id", None) != getattr(uncached.get_zone(pos), "original_id", None):
+        raise Exception("Cached lookup of float position {} disagrees".format(pos))
+
+# Spawners and command blocks asking every tick, mixed in with players walking around
+rng = random.Random(0)
+hot = uniform_trace(min_corner, max_corner, 300, seed=1)
+starts = zone_centers(zones, 40)
+walk = random_walk_trace(starts, 20000, step=2)
+trace = []
+for pos in walk:
+    trace.append(pos)
+    for _ in range(3):
+        trace.append(hot[rng.randrange(len(hot))])
+
+expected = None
+for engine in ("tree", "grid"):
+    for cache_size in (0, 256, 4096, 65536):
+        manager = ZoneManager(zones, engine=engine, cache_size=cache_size)
+        start = time.perf_counter()
+        result = [manager.get_zone(pos) for pos in trace]
+        lookup_time = (time.perf_counter() - start) / len(trace) * 1e6
+
+        ids = [getattr(zone, "original_id", None) for zone in result]
+        if expected is None:
+            expected = ids
+        elif ids != expected:
+            raise Exception("Cached lookups disagree")
+
+        if cache_size:
+            stats = manager.cache.stats()
+            print("{:<5} cache {:>6}: {:.2f} us/op, hit rate {:.1%}, {} evictions".format(
+                engine, cache_size, lookup_time, stats["hit_rate"], stats["evictions"]
+            ))
+        else:
+            print("{:<5} no cache    : {:.2f} us/op".format(engine, lookup_time))
+
+# Rebuilding must not leave old answers behind
+manager = ZoneManager(zones, cache_size=4096)
+[manager.get_zone(pos) for pos in hot]
+manager.reload(zones[1:])
+fresh = ZoneManager(zones[1:])
+for pos in hot:
+    if getattr(manager.get_zone(pos), "original_id", None) != getattr(fresh.get_zone(pos), "original_id", None):
+        raise Exception("Cache returned a result from before reload()")
+print("After reload(): {}".format(manager.cache.stats()))
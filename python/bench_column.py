@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+
+import json
+import time
+from lib.synthetic import config_bounds, random_walk_trace, uniform_trace, zone_centers
+from lib.zone_manager import ZoneManager
+
+for config in ("region_1", "region_2"):
+    with open("../config/{}.json".format(config), "r") as fp:
+        zones = json.load(fp)["locationBounds"]
+    min_corner, max_corner = config_bounds(zones)
+    starts = zone_centers(zones, 40)
+    traces = (
+        ("uniform", uniform_trace(min_corner, max_corner, 20000)),
+        ("walk", random_walk_trace(starts, 20000, step=2)),
+    )
+
+    managers = {}
+    for engine in ("tree", "column"):
+        start = time.perf_counter()
+        manager = ZoneManager(zones, engine=engine)
+        build_time = time.perf_counter() - start
+        managers[engine] = manager
+
+        # Overlap removal is the same for both, so time the index on its own too
+        fragments = []
+        for zone in manager.indexed_zones:
+            fragments += zone.fragments
+        start = time.perf_counter()
+        type(manager.engine)(fragments)
+        index_time = time.perf_counter() - start
+        print("{} {:<6}: build {:.2f}s (index {:.3f}s), {}".format(config, engine, build_time, index_time, manager.engine.stats()))
+
+    for trace_name, trace in traces:
+        tree_visits = sum(managers["tree"].tree.nodes_visited(pos) for pos in trace) / len(trace)
+        column_visits = sum(managers["column"].engine.nodes_visited(pos) for pos in trace) / len(trace)
+        times = {}
+        for engine, manager in managers.items():
+            start = time.perf_counter()
+            result = manager.get_zones(trace)
+            times[engine] = (time.perf_counter() - start) / len(trace) * 1e6
+            times[engine, "ids"] = [getattr(zone, "original_id", None) for zone in result]
+        if times["tree", "ids"] != times["column", "ids"]:
+            raise Exception("Column engine disagrees with the tree")
+        print("  {:<8} nodes visited {:.2f} -> {:.2f}, lookup {:.2f} -> {:.2f} us/op".format(
+            trace_name, tree_visits, column_visits, times["tree"], times["column"]
+        ))
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import time
+from lib.synthetic import config_bounds, random_walk_trace, uniform_trace
+from lib.zone_engine.zone_engine_base import ZoneEngineBase
+from lib.zone_manager import ZoneManager
+
+for path in ("../config/region_1.json", "../config/region_2.json"):
+    with open(path, "r") as fp:
+        zones = json.load(fp)["locationBounds"]
+    cache_path = path.replace(".json", ".zone_lookup.py")
+    if os.path.exists(cache_path):
+        os.remove(cache_path)
+
+    manager = ZoneManager(zones, engine="scan")
+    fragments = []
+    for zone in manager.zones:
+        fragments += zone.fragments
+
+    min_corner, max_corner = config_bounds(zones)
+    uniform = uniform_trace(min_corner, max_corner, 50000)
+    walk = random_walk_trace([tuple(fragment.min_corner.list) for fragment in fragments[:20]], 50000, step=2)
+
+    print("-"*100)
+    print(path)
+
+    tree_engine = ZoneEngineBase.CreateZoneEngine("tree", fragments)
+    start = time.perf_counter()
+    compiled = ZoneEngineBase.CreateZoneEngine("compiled", fragments, cache_path=cache_path)
+    print("  compiled build (tree + codegen): {:.3f}s, {} source lines".format(time.perf_counter() - start, compiled.stats()["source_lines"]))
+    start = time.perf_counter()
+    cached = ZoneEngineBase.CreateZoneEngine("compiled", fragments, cache_path=cache_path)
+    print("  compiled build from cache:       {:.3f}s (loaded_from_cache={!r})".format(time.perf_counter() - start, cached.loaded_from_cache))
+
+    tree = tree_engine.tree
+    for pos in uniform + walk:
+        if compiled.get_zone(pos) is not tree.get_zone(pos):
+            raise Exception("Compiled lookup disagrees with the tree at {!r}".format(pos))
+
+    print("  {:<10} {:>16} {:>16}".format("Engine", "Uniform (us/op)", "Walk (us/op)"))
+    for name, index in (("tree", tree_engine), ("compiled", compiled), ("grid", ZoneEngineBase.CreateZoneEngine("grid", fragments)), ("rtree", ZoneEngineBase.CreateZoneEngine("rtree", fragments))):
+        timings = []
+        for trace in (uniform, walk):
+            start = time.perf_counter()
+            index.get_zones(trace)
+            timings.append((time.perf_counter() - start) / len(trace) * 1e6)
+        print("  {:<10} {:>16.2f} {:>16.2f}".format(name, timings[0], timings[1]))
+
+    start = time.perf_counter()
+    lookup = compiled._lookup
+    for x, y, z in uniform:
+        lookup(x, y, z)
+    print("  {:<10} {:>16.2f}   (bare lookup(x, y, z) returning original_id)".format("generated", (time.perf_counter() - start) / len(uniform) * 1e6))
+
+    os.remove(cache_path)
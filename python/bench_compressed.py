@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+
+import json
+import time
+from lib.synthetic import config_bounds, plot_grid_zones, random_zones, uniform_trace
+from lib.zone_engine.zone_engine_base import ZoneEngineBase
+from lib.zone_manager import ZoneManager
+
+worlds = []
+for path in ("../config/region_1.json", "../config/region_2.json"):
+    with open(path, "r") as fp:
+        worlds.append((path.split("/")[-1], json.load(fp)["locationBounds"]))
+for count in (100, 200, 400):
+    worlds.append(("sparse random ({})".format(count), random_zones(count, [-5000, 0, -5000], [5000, 255, 5000], [8, 8, 8], [64, 64, 64], seed=count)))
+worlds.append(("plots (400)", plot_grid_zones(400)))
+
+print("{:<20} {:<6} {:>16} {:>11} {:>12} {:>10} {:>12} {:>12}".format(
+    "World", "Mode", "Shape", "Cells", "Memory (KB)", "Build (s)", "get_zone us", "batch us"
+))
+for name, zones in worlds:
+    manager = ZoneManager(zones, engine="scan")
+    fragments = []
+    for zone in manager.zones:
+        fragments += zone.fragments
+    min_corner, max_corner = config_bounds(zones)
+    trace = uniform_trace(min_corner, max_corner, 50000)
+    expected = manager.get_zones(trace)
+
+    for max_dense_cells in (64*1024*1024, 0):
+        start = time.perf_counter()
+        index = ZoneEngineBase.CreateZoneEngine("compressed", fragments, max_dense_cells=max_dense_cells)
+        build_time = time.perf_counter() - start
+        stats = index.stats()
+
+        start = time.perf_counter()
+        for pos in trace:
+            index.get_zone(pos)
+        single = (time.perf_counter() - start) / len(trace) * 1e6
+
+        start = time.perf_counter()
+        result = index.get_zones(trace)
+        batch = (time.perf_counter() - start) / len(trace) * 1e6
+        if result != expected:
+            raise Exception("Compressed engine disagrees with a scan on {}".format(name))
+
+        print("{:<20} {:<6} {:>16} {:>11} {:>12.1f} {:>10.3f} {:>12.2f} {:>12.2f}".format(
+            name, stats["mode"], "x".join(str(n) for n in stats["shape"]), stats["nodes"],
+            stats["memory_bytes"] / 1024, build_time, single, batch
+        ))
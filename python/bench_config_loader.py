@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import random
+import tempfile
+import time
+from lib.zone.zone import Zone
+from lib.zone_config_loader import ZoneConfigLoader
+from lib.zone_manager import ZoneManager
+
+def load_json_zones(path):
+    """The old path: json.load the whole document, then one Zone(dict) per entry."""
+    with open(path, "r") as fp:
+        prop = json.load(fp)
+    return [Zone(zone, axis_order=[0, 2, 1], original_id=i) for i, zone in enumerate(prop["locationBounds"])]
+
+def load_streamed_zones(path):
+    """The new path: stream the location bounds, then bulk create Zones from arrays."""
+    names, types, pos1, pos2 = ZoneConfigLoader().load_path(path)
+    return ZoneManager.zones_from_arrays(names, types, pos1, pos2)
+
+def write_plot_config(path, num_plots):
+    """Write a config shaped like the real ones, with lots of player plots."""
+    rng = random.Random(num_plots)
+    side = int(num_plots ** 0.5) + 1
+    with open(path, "w") as fp:
+        fp.write('{\n  "plotSurvivalMinHeight": 95,\n  "forbiddenItemLore": ["Plots"],\n  "locationBounds": [\n')
+        for i in range(num_plots):
+            x = (i % side) * 32
+            z = (i // side) * 32
+            fp.write('    {{"name":"Plot {}", "type":"SafeZone", "pos1":"{} {} {}", "pos2":"{} 255 {}"}}{}\n'.format(
+                i, x, rng.randint(0, 95), z, x + 30, z + 30, "," if i + 1 < num_plots else ""
+            ))
+        fp.write('  ],\n  "unbreakableBlocks": []\n}\n')
+
+def same_zones(a, b):
+    for x, y in zip(a, b):
+        if (x.name, x.type, x.original_id, x.pos1, x.pos2) != (y.name, y.type, y.original_id, y.pos1, y.pos2):
+            return False
+    return len(a) == len(b)
+
+def bench(label, func, path, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(path)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+paths = ["../config/region_1.json", "../config/region_2.json"]
+tmp_dir = tempfile.mkdtemp()
+for num_plots in (10000, 100000):
+    path = os.path.join(tmp_dir, "plots_{}.json".format(num_plots))
+    write_plot_config(path, num_plots)
+    paths.append(path)
+
+print("-"*120)
+print("{:<40} {:>8} {:>14} {:>14} {:>8}".format("Config", "Zones", "json+Zone(s)", "streamed (s)", "Speedup"))
+for path in paths:
+    repeat = 5 if os.path.getsize(path) < 1024*1024 else 1
+    old_time, old_zones = bench("json", load_json_zones, path, repeat)
+    new_time, new_zones = bench("stream", load_streamed_zones, path, repeat)
+    if not same_zones(old_zones, new_zones):
+        raise Exception("Streamed zones do not match json.load zones for {}".format(path))
+    print("{:<40} {:>8} {:>14.4f} {:>14.4f} {:>7.2f}x".format(os.path.basename(path), len(new_zones), old_time, new_time, old_time / new_time))
+
+print("-"*120)
+print("End to end, region_1 (build included):")
+start = time.perf_counter()
+with open(paths[0], "r") as fp:
+    ZoneManager(json.load(fp)["locationBounds"])
+print("  json.load + ZoneManager:              {:.3f}s".format(time.perf_counter() - start))
+start = time.perf_counter()
+ZoneManager.from_arrays(*ZoneConfigLoader().load_path(paths[0]))
+print("  ZoneConfigLoader + from_arrays:       {:.3f}s".format(time.perf_counter() - start))
+
+for path in paths[2:]:
+    os.remove(path)
+os.rmdir(tmp_dir)
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+import json
+import time
+from lib.synthetic import config_bounds, plot_grid_zones, random_walk_trace, random_zones, uniform_trace
+from lib.zone_engine.zone_engine_base import ZoneEngineBase
+from lib.zone_manager import ZoneManager
+
+worlds = []
+for path in ("../config/region_1.json", "../config/region_2.json"):
+    with open(path, "r") as fp:
+        worlds.append((path.split("/")[-1], json.load(fp)["locationBounds"]))
+worlds.append(("dense random (60)", random_zones(60, [0, 0, 0], [400, 255, 400], [5, 5, 5], [120, 120, 120], seed=2)))
+worlds.append(("sparse random (500)", random_zones(500, [-10000, 0, -10000], [10000, 255, 10000], [8, 8, 8], [64, 64, 64], seed=3)))
+worlds.append(("plots (500)", plot_grid_zones(500)))
+
+print("{:<22} {:<8} {:>10} {:>8} {:>7} {:>16} {:>16}".format("World", "Engine", "Build (s)", "Nodes", "Depth", "Uniform (us/op)", "Walk (us/op)"))
+for name, zones in worlds:
+    manager = ZoneManager(zones, engine="scan")
+    fragments = []
+    for zone in manager.zones:
+        fragments += zone.fragments
+
+    min_corner, max_corner = config_bounds(zones)
+    uniform = uniform_trace(min_corner, max_corner, 20000)
+    starts = [tuple(fragment.min_corner.list) for fragment in fragments[:20]]
+    walk = random_walk_trace(starts, 20000, step=2)
+
+    for engine in ZoneEngineBase.ENGINE_NAMES:
+        start = time.perf_counter()
+        index = ZoneEngineBase.CreateZoneEngine(engine, fragments)
+        build_time = time.perf_counter() - start
+
+        timings = []
+        for trace in (uniform, walk):
+            start = time.perf_counter()
+            index.get_zones(trace)
+            timings.append((time.perf_counter() - start) / len(trace) * 1e6)
+
+        stats = index.stats()
+        print("{:<22} {:<8} {:>10.3f} {:>8} {:>7} {:>16.2f} {:>16.2f}".format(
+            name, engine, build_time, stats["nodes"], stats["max_depth"], timings[0], timings[1]
+        ))
+    print("-"*96)
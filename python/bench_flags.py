@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+import json
+import time
+from lib.synthetic import config_bounds, uniform_trace
+from lib.zone_manager import ZoneManager
+
+# Example rule flags
+PVP = 1
+SAFE = 2
+RESTRICTED = 4
+BUILD = 8
+
+TYPE_FLAGS = {
+    "SafeZone": SAFE,
+    "AdventureZone": PVP | RESTRICTED,
+    "Capital": SAFE | RESTRICTED,
+    "RestrictedZone": RESTRICTED,
+    # A zone type of its own
+    "None": PVP,
+    # Outside of any zone
+    None: PVP | BUILD,
+}
+
+def pvp_by_type(manager, pos):
+    """What game logic does today: find the zone, then check its type against the rules."""
+    zone = manager.get_zone(pos)
+    if zone is None:
+        return True
+    if zone.type == "SafeZone" or zone.type == "Capital" or zone.type == "RestrictedZone":
+        return False
+    return True
+
+def pvp_by_flags(manager, pos):
+    return manager.get_flags(pos) & PVP != 0
+
+for config in ("region_1", "region_2"):
+    with open("../config/{}.json".format(config), "r") as fp:
+        zones = json.load(fp)["locationBounds"]
+    min_corner, max_corner = config_bounds(zones)
+    trace = uniform_trace(min_corner, max_corner, 50000)
+
+    for engine in ("tree", "grid"):
+        manager = ZoneManager(zones, engine=engine, type_flags=TYPE_FLAGS)
+
+        start = time.perf_counter()
+        by_type = [pvp_by_type(manager, pos) for pos in trace]
+        type_time = (time.perf_counter() - start) / len(trace) * 1e6
+
+        start = time.perf_counter()
+        by_flags = [pvp_by_flags(manager, pos) for pos in trace]
+        flags_time = (time.perf_counter() - start) / len(trace) * 1e6
+
+        start = time.perf_counter()
+        flags = manager.get_flags_array(trace)
+        by_batch = [value & PVP != 0 for value in flags]
+        batch_time = (time.perf_counter() - start) / len(trace) * 1e6
+
+        if by_type != by_flags or by_type != by_batch:
+            raise Exception("Flags disagree with the zone types")
+        print("{} {:<5} type compare {:.2f} us/op, get_flags {:.2f} us/op, get_flags_array {:.2f} us/op".format(
+            config, engine, type_time, flags_time, batch_time
+        ))
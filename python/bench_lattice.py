@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+import time
+import tracemalloc
+from lib.synthetic import config_bounds, plot_grid_zones, uniform_trace
+from lib.zone_manager import ZoneManager
+
+def plot_world(num_plots):
+    """Player plots, plus a spawn town and a market that cut into a few of them."""
+    return (
+        [{"name": "Plots Spawn", "type": "SafeZone", "pos1": [-200, 0, -200], "pos2": [-1, 255, -1]}]
+        + plot_grid_zones(num_plots)
+        + [{"name": "Market", "type": "Capital", "pos1": [40, 0, 40], "pos2": [120, 255, 120]}]
+    )
+
+def measure(zones, **kwargs):
+    start = time.perf_counter()
+    manager = ZoneManager(zones, **kwargs)
+    build_time = time.perf_counter() - start
+
+    tracemalloc.start()
+    ZoneManager(zones, **kwargs)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    min_corner, max_corner = config_bounds(zones)
+    trace = uniform_trace(min_corner, max_corner, 20000)
+    start = time.perf_counter()
+    result = manager.get_zones(trace)
+    lookup_time = (time.perf_counter() - start) / len(trace) * 1e6
+    return manager, build_time, peak, lookup_time, [getattr(zone, "original_id", None) for zone in result]
+
+print("{:<14} {:<10} {:<8} {:>10} {:>14} {:>12} {:>10}".format("Plots", "Lattice", "Engine", "Build (s)", "Peak mem (MB)", "Lookup (us)", "Lattices"))
+for num_plots, engines in ((500, ("tree", "grid")), (10000, ("grid",)), (100000, ("grid",))):
+    zones = plot_world(num_plots)
+    for engine in engines:
+        results = []
+        for lattice_min_count in (None, 64):
+            if lattice_min_count is None and num_plots > 500:
+                # Overlap removal alone is O(n^2) without lattices; skip the big worlds
+                continue
+            manager, build_time, peak, lookup_time, result = measure(zones, engine=engine, lattice_min_count=lattice_min_count)
+            results.append(result)
+            print("{:<14} {:<10} {:<8} {:>10.3f} {:>14.1f} {:>12.2f} {:>10}".format(
+                num_plots, repr(lattice_min_count), engine, build_time, peak / 1024 / 1024, lookup_time, len(manager.lattices)
+            ))
+        if len(results) == 2 and results[0] != results[1]:
+            raise Exception("Lattice lookups disagree with the engine alone")
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+import json
+import time
+from lib.synthetic import config_bounds, random_walk_trace, uniform_trace
+from lib.zone_tree.zone_tree_base import ZoneTreeBase
+from lib.zone_manager import ZoneManager
+
+for path in ("../config/region_1.json", "../config/region_2.json"):
+    with open(path, "r") as fp:
+        zones = json.load(fp)["locationBounds"]
+
+    # Players mostly hang around a handful of towns, so start walks from a few zones.
+    hubs = []
+    for zone in zones[:8]:
+        hub = ZoneManager([zone]).zones[0]
+        hubs.append(tuple(hub.pos1[axis] + hub.size()[axis] // 2 for axis in range(3)))
+    trace = random_walk_trace(hubs, 20000, step=2)
+    min_corner, max_corner = config_bounds(zones)
+    random_trace = uniform_trace(min_corner, max_corner, 20000)
+
+    print("-"*120)
+    print(path)
+
+    results = {}
+    for lazy in (False, True):
+        start = time.perf_counter()
+        manager = ZoneManager(zones, lazy=lazy)
+        built = time.perf_counter()
+        manager.tree.get_zone(trace[0])
+        first = time.perf_counter()
+
+        after_start = manager.tree.node_count()
+        walked = [getattr(manager.tree.get_zone(pos), "original_id", None) for pos in trace]
+        after_walk = manager.tree.node_count()
+        for pos in random_trace:
+            manager.tree.get_zone(pos)
+        after_random = manager.tree.node_count()
+        results[lazy] = walked
+
+        print("  lazy={!r:<5}  startup {:.3f}s, first lookup after {:.3f}s, nodes built: {} after first lookup, {} after walk trace, {} after uniform trace".format(
+            lazy, built - start, first - start, after_start, after_walk, after_random
+        ))
+
+    if results[False] != results[True]:
+        raise Exception("Lazy tree lookups do not match the eager tree")
+
+    # Tree build share, without overlap removal and defragmentation
+    manager = ZoneManager(zones)
+    fragments = list(manager.tree)
+    start = time.perf_counter()
+    eager_tree = ZoneTreeBase.CreateZoneTree(fragments)
+    for pos in trace:
+        eager_tree.get_zone(pos)
+    eager_walk = time.perf_counter() - start
+    start = time.perf_counter()
+    lazy_tree = ZoneTreeBase.CreateZoneTree(fragments, lazy=True)
+    for pos in trace:
+        lazy_tree.get_zone(pos)
+    lazy_walk = time.perf_counter() - start
+    print("  tree only: eager build + walk trace {:.3f}s, lazy build + walk trace {:.3f}s".format(eager_walk, lazy_walk))
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+
+import json
+import random
+import time
+from lib.morton import morton_key, morton_sorted
+from lib.synthetic import random_walk_trace, random_zones, zone_centers
+from lib.zone_manager import ZoneManager
+
+# Keys must follow the bits of every axis, so a box's corners bound its contents
+for low, high in (((0, 0, 0), (1, 1, 1)), ((-5, 3, -5), (-4, 4, -4)), ((-100, 0, -100), (100, 255, 100))):
+    if morton_key(low) >= morton_key(high):
+        raise Exception("Morton key of {} is not below {}".format(low, high))
+
+worlds = []
+with open("../config/region_1.json", "r") as fp:
+    worlds.append(("region_1", json.load(fp)["locationBounds"]))
+worlds.append(("random 300", random_zones(300, [0, 0, 0], [4000, 255, 4000], [5, 5, 5], [120, 100, 120], seed=2)))
+
+rng = random.Random(0)
+for name, zones in worlds:
+    starts = zone_centers(zones, 50)
+    # Many players moving at once: clustered positions, arriving interleaved
+    trace = random_walk_trace(starts, 50000, step=2)
+    rng.shuffle(trace)
+    presorted = morton_sorted(trace)
+
+    for engine, engine_options in (("tree", {"optimize": True, "bucket_size": 8}), ("grid", {})):
+        expected = None
+        for morton_order in (False, True):
+            start = time.perf_counter()
+            manager = ZoneManager(zones, engine=engine, engine_options=engine_options, morton_order=morton_order)
+            build_time = time.perf_counter() - start
+
+            timings = []
+            for positions, sort in ((trace, False), (trace, True), (presorted, False)):
+                start = time.perf_counter()
+                result = manager.get_zones(positions, sort=sort)
+                timings.append((time.perf_counter() - start) / len(positions) * 1e6)
+                if positions is trace:
+                    ids = [getattr(zone, "original_id", None) for zone in result]
+                    if expected is None:
+                        expected = ids
+                    elif ids != expected:
+                        raise Exception("Morton ordered lookups disagree")
+
+            print("{:<10} {:<4} morton_order={!r:<5} build {:.2f}s: shuffled {:.2f} us/op, sort=True {:.2f} us/op, presorted {:.2f} us/op".format(
+                name, engine, morton_order, build_time, *timings
+            ))
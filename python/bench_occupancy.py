@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+import json
+import time
+from lib.synthetic import config_bounds, random_walk_trace, uniform_trace
+from lib.zone_manager import ZoneManager
+from lib.zone_occupancy import ZoneOccupancy
+
+# A clear bit must mean no box is in that cell, including the last block of each box
+occupancy = ZoneOccupancy([((0, 0, 0), (16, 256, 16)), ((40, 0, -8), (41, 256, 1))], 16)
+for pos, expected in (((0, 5, 0), True), ((15, 5, 15), True), ((16, 5, 0), False), ((40, 5, -8), True), ((40, 5, 0), True), ((-1, 5, 0), False)):
+    if occupancy.maybe_occupied(pos) != expected:
+        raise Exception("maybe_occupied({}) should be {}".format(pos, expected))
+for pos, expected in (((15.9, 5.5, 15.9), True), ((16.0, 5.5, 0.5), False), ((-0.5, 5.5, 0.5), False), ((40.5, 5.5, -7.5), True)):
+    if occupancy.maybe_occupied(pos) != expected:
+        raise Exception("maybe_occupied({}) should be {}".format(pos, expected))
+occupancy_2d = ZoneOccupancy([((0, 0), (16, 16))], 16)
+if not occupancy_2d.maybe_occupied((0.5, 15.5)) or occupancy_2d.maybe_occupied((0.5, 16.5)):
+    raise Exception("maybe_occupied() is wrong for float positions in 2D")
+occupancy_3d = ZoneOccupancy([((0, 0, 0), (16, 16, 16))], 16, axes=[0, 1, 2])
+if not occupancy_3d.maybe_occupied((0.5, 15.5, 3.25)) or occupancy_3d.maybe_occupied((0.5, 16.5, 3.25)):
+    raise Exception("maybe_occupied() is wrong for float positions over 3 axes")
+
+with open("../config/region_1.json", "r") as fp:
+    zones = json.load(fp)["locationBounds"]
+min_corner, max_corner = config_bounds(zones)
+
+# Entities have float positions
+float_trace = [(x + 0.5, y + 0.25, z - 0.75) for x, y, z in uniform_trace(min_corner, max_corner, 5000, seed=4)]
+expected = [getattr(zone, "original_id", None) for zone in ZoneManager(zones).get_zones(float_trace)]
+manager = ZoneManager(zones, occupancy_cell_size=16)
+if [getattr(zone, "original_id", None) for zone in manager.get_zones(float_trace)] != expected:
+    raise Exception("Occupancy bitmap changed lookup results for float positions")
+if [getattr(manager.get_zone(pos), "original_id", None) for pos in float_trace] != expected:
+    raise Exception("Occupancy bitmap changed lookup results for float positions")
+
+# Players mostly roam outside of zones: walks starting well outside the zoned area
+wide_min = [min_corner[0] - 4000, 0, min_corner[2] - 4000]
+wide_max = [max_corner[0] + 4000, 255, max_corner[2] + 4000]
+wilderness_starts = uniform_trace(wide_min, wide_max, 200, seed=3)
+traces = (
+    ("uniform", uniform_trace(min_corner, max_corner, 100000)),
+    ("wilderness walk", random_walk_trace(wilderness_starts, 100000, step=2)),
+)
+
+for cell_size in (16, 64):
+    manager = ZoneManager(zones, occupancy_cell_size=cell_size)
+    print("cell size {}: {}".format(cell_size, manager.occupancy.stats()))
+
+for trace_name, trace in traces:
+    for engine in ("tree", "grid"):
+        expected = None
+        for cell_size in (None, 16, 64):
+            manager = ZoneManager(zones, engine=engine, occupancy_cell_size=cell_size)
+
+            start = time.perf_counter()
+            result = [manager.get_zone(pos) for pos in trace]
+            single_time = (time.perf_counter() - start) / len(trace) * 1e6
+
+            start = time.perf_counter()
+            batch = manager.get_zones(trace)
+            batch_time = (time.perf_counter() - start) / len(trace) * 1e6
+
+            ids = [getattr(zone, "original_id", None) for zone in result]
+            if expected is None:
+                expected = ids
+            elif ids != expected or [getattr(zone, "original_id", None) for zone in batch] != expected:
+                raise Exception("Occupancy bitmap changed lookup results")
+
+            skipped = 0.0
+            if manager.occupancy is not None:
+                maybe_occupied = manager.occupancy.maybe_occupied
+                skipped = sum(1 for pos in trace if not maybe_occupied(pos)) / len(trace)
+            print("{:<16} {:<4} cell size {!s:<4}: {:5.1%} skipped, get_zone {:.2f} us/op, get_zones {:.2f} us/op".format(
+                trace_name, engine, cell_size, skipped, single_time, batch_time
+            ))
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+import json
+import time
+import tracemalloc
+from lib.synthetic import config_bounds, random_zones, uniform_trace
+from lib.zone_tree.zone_tree_base import ZoneTreeBase
+from lib.zone_manager import ZoneManager
+
+def build(fragments, bucket_size):
+    tree = ZoneTreeBase.CreateZoneTree(fragments)
+    if bucket_size is not None:
+        tree = tree.optimize(bucket_size)
+    return tree
+
+def measure(fragments, trace, bucket_size):
+    start = time.perf_counter()
+    tree = build(fragments, bucket_size)
+    build_time = time.perf_counter() - start
+
+    tracemalloc.start()
+    kept = build(fragments, bucket_size)
+    memory, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    get_zone = tree.get_zone
+    start = time.perf_counter()
+    result = [get_zone(pos) for pos in trace]
+    lookup_time = (time.perf_counter() - start) / len(trace) * 1e6
+    visits = sum(tree.nodes_visited(pos) for pos in trace) / len(trace)
+    return tree, build_time, memory, lookup_time, visits, result
+
+worlds = []
+for config in ("region_1", "region_2"):
+    with open("../config/{}.json".format(config), "r") as fp:
+        worlds.append((config, json.load(fp)["locationBounds"]))
+worlds.append(("random 150", random_zones(150, [0, 0, 0], [2000, 255, 2000], [5, 5, 5], [150, 100, 150], seed=1)))
+
+print("{:<12} {:<10} {:>9} {:>9} {:>7} {:>10} {:>11} {:>11} {:>10}".format(
+    "World", "Pass", "Avg depth", "Max depth", "Nodes", "Visits", "Lookup (us)", "Memory (KB)", "Build (s)"
+))
+for name, zones in worlds:
+    manager = ZoneManager(zones, lattice_min_count=None)
+    fragments = []
+    for zone in manager.zones:
+        fragments += zone.fragments
+    min_corner, max_corner = config_bounds(zones)
+    trace = uniform_trace(min_corner, max_corner, 20000)
+
+    expected = None
+    for label, bucket_size in (("none", None), ("bucket 1", 1), ("bucket 4", 4), ("bucket 8", 8)):
+        tree, build_time, memory, lookup_time, visits, result = measure(fragments, trace, bucket_size)
+        if expected is None:
+            expected = result
+        elif result != expected:
+            raise Exception("Optimized tree disagrees with the original")
+        print("{:<12} {:<10} {:>9.2f} {:>9} {:>7} {:>10.2f} {:>11.2f} {:>11.1f} {:>10.3f}".format(
+            name, label, tree.average_depth(), tree.max_depth(), tree.node_count(), visits, lookup_time, memory / 1024, build_time
+        ))
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import tempfile
+from lib.position_log import analyze_log, analyze_logs
+from lib.synthetic import write_position_log, zone_centers
+from lib.zone_manager import ZoneManager
+
+config_path = "../config/region_1.json"
+with open(config_path, "r") as fp:
+    zones = json.load(fp)["locationBounds"]
+# Players start in the middle of zones, so they wander in and out of them
+start_points = zone_centers(zones)
+
+with tempfile.TemporaryDirectory() as directory:
+    paths = []
+    for i in range(4):
+        path = os.path.join(directory, "positions_{}.log".format(i))
+        with open(path, "w") as fp:
+            write_position_log(fp, start_points, num_players=200, count=100000, seed=i)
+        paths.append(path)
+
+    results = {}
+    for engine in ("tree", "grid"):
+        for workers in (0, 2, 4):
+            stats, seconds = analyze_logs(config_path, paths, workers=workers, manager_options={"engine": engine})
+            # Includes each worker building its ZoneManager
+            print("{:<5} workers={}: {} positions in {:.2f}s, {:.0f} positions/s".format(
+                engine, workers, stats.samples, seconds, stats.samples / seconds
+            ))
+            results[(engine, workers)] = stats.rows()
+
+    expected = results[("tree", 0)]
+    for key, rows in results.items():
+        if rows != expected:
+            raise Exception("{} disagrees with a single process tree".format(key))
+
+    print("Busiest zones:")
+    for zone_id, name, samples, dwell, enters, exits in expected[:5]:
+        print("  {:<40} {:>10} samples {:>10.1f}s dwell {:>6} enters {:>6} exits".format("{!r} (#{})".format(name, zone_id), samples, dwell, enters, exits))
+
+    # Fractional coordinates are floored to their block
+    float_path = os.path.join(directory, "positions_float.log")
+    with open(paths[0], "r") as fp, open(float_path, "w") as out:
+        for line in fp:
+            now, player, x, y, z = line.rstrip("\n").split(",")
+            out.write("{},{},{},{},{}\n".format(now, player, int(x) + 0.75, int(y) + 0.5, int(z) + 0.25))
+    manager = ZoneManager(zones)
+    if analyze_log(manager, float_path).rows() != analyze_log(manager, paths[0]).rows():
+        raise Exception("Fractional positions counted differently from their blocks")
+
+    # Zones sharing a name are still counted apart
+    twin_path = os.path.join(directory, "positions_twins.log")
+    with open(twin_path, "w") as fp:
+        fp.write("0,a,1,1,1\n1,a,11,1,1\n2,a,11,1,1\n")
+    twins = ZoneManager([
+        {"name": "plot", "type": "SafeZone", "pos1": [0, 0, 0], "pos2": [4, 4, 4]},
+        {"name": "plot", "type": "SafeZone", "pos1": [10, 0, 0], "pos2": [14, 4, 4]},
+    ])
+    rows = analyze_log(twins, twin_path).rows()
+    if rows != [[1, "plot", 2, 1.0, 1, 0], [0, "plot", 1, 1.0, 0, 1]]:
+        raise Exception("Zones sharing a name were merged: {}".format(rows))
+    print("Fractional positions and zones sharing a name counted correctly")
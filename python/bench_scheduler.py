@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+import json
+import random
+import time
+from lib.synthetic import config_bounds, plot_grid_zones, zone_centers
+from lib.zone_manager import ZoneManager
+from lib.zone_scheduler import ZoneScheduler
+
+NUM_ENTITIES = 10000
+NUM_TICKS = 200
+
+# Blocks per tick along any axis
+MOB_SPEED = 0.25
+WALK_SPEED = 0.35
+RIDE_SPEED = 1.0
+
+def simulate(zones, name, seed=0, **manager_options):
+    """Move a crowd around for NUM_TICKS, checking the scheduler against a full lookup every tick."""
+    rng = random.Random(seed)
+    manager = ZoneManager(zones, adjacency=True, **manager_options)
+    min_corner, max_corner = config_bounds(zones)
+
+    # Start half the crowd inside zones, so there are borders to cross
+    starts = zone_centers(rng.sample(zones, min(len(zones), 200)))
+    positions = []
+    for i in range(NUM_ENTITIES):
+        if i % 2 == 0:
+            pos = list(rng.choice(starts))
+        else:
+            pos = [rng.uniform(min_corner[axis], max_corner[axis]) for axis in range(3)]
+        positions.append(pos)
+
+    # Half idle mobs that sometimes wander off, then mobs, walking players, and riders
+    speeds = []
+    velocities = []
+    for i in range(NUM_ENTITIES):
+        kind = i % 20
+        if kind < 10:
+            speed = 0
+        elif kind < 16:
+            speed = MOB_SPEED
+        elif kind < 19:
+            speed = WALK_SPEED
+        else:
+            speed = RIDE_SPEED
+        speeds.append(speed)
+        velocities.append([rng.uniform(-speed, speed), 0, rng.uniform(-speed, speed)])
+
+    scheduler = ZoneScheduler(manager, positions.__getitem__)
+    for i in range(NUM_ENTITIES):
+        scheduler.add(i, speeds[i])
+
+    lookup_counts = []
+    transitions = 0
+    missed = 0
+    scheduler_time = 0.0
+    full_time = 0.0
+    for tick in range(NUM_TICKS):
+        for i in range(NUM_ENTITIES):
+            if i % 20 < 10:
+                # Idle mobs occasionally start or stop wandering
+                if speeds[i] == 0 and rng.random() < 0.005:
+                    speeds[i] = MOB_SPEED
+                    velocities[i] = [rng.uniform(-MOB_SPEED, MOB_SPEED), 0, rng.uniform(-MOB_SPEED, MOB_SPEED)]
+                    scheduler.set_speed(i, MOB_SPEED)
+                elif speeds[i] != 0 and rng.random() < 0.02:
+                    speeds[i] = 0
+                    velocities[i] = [0, 0, 0]
+                    scheduler.set_speed(i, 0)
+            speed = speeds[i]
+            if speed == 0:
+                continue
+            velocity = velocities[i]
+            if rng.random() < 0.05:
+                velocity[0] = rng.uniform(-speed, speed)
+                velocity[2] = rng.uniform(-speed, speed)
+                velocity[1] = rng.choice((-speed, 0, 0, 0, speed))
+            pos = positions[i]
+            pos[0] += velocity[0]
+            pos[1] += velocity[1]
+            pos[2] += velocity[2]
+
+        start = time.perf_counter()
+        transitions += len(scheduler.tick())
+        scheduler_time += time.perf_counter() - start
+        lookup_counts.append(scheduler.last_tick_lookups)
+
+        start = time.perf_counter()
+        expected = manager.get_zones(positions)
+        full_time += time.perf_counter() - start
+        for i in range(NUM_ENTITIES):
+            if scheduler.zone_of(i) is not expected[i]:
+                missed += 1
+
+    print("{:<22} {:.0f} lookups/tick (max {}) instead of {}, {} transitions, {} missed; {:.1f} ms/tick instead of {:.1f} ms/tick".format(
+        name, sum(lookup_counts) / NUM_TICKS, max(lookup_counts), NUM_ENTITIES, transitions, missed,
+        scheduler_time / NUM_TICKS * 1000, full_time / NUM_TICKS * 1000
+    ))
+    if missed:
+        raise Exception("Scheduler missed {} zone transitions".format(missed))
+
+with open("../config/region_1.json", "r") as fp:
+    simulate(json.load(fp)["locationBounds"], "region_1 grid", engine="grid")
+with open("../config/region_1.json", "r") as fp:
+    simulate(json.load(fp)["locationBounds"], "region_1 tree", engine="tree")
+simulate(plot_grid_zones(400), "400 plots in a lattice", engine="grid")
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+import json
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+from lib.synthetic import config_bounds, plot_grid_zones, uniform_trace
+from lib.zone_manager import ZoneManager
+from lib.zone_shared_index import SharedZoneIndex
+
+def rss_kb():
+    """Resident and shared memory of this process, from /proc."""
+    result = {}
+    with open("/proc/self/status", "r") as fp:
+        for line in fp:
+            if line.startswith(("VmRSS:", "RssShmem:")):
+                key, value = line.split(":")
+                result[key] = int(value.split()[0])
+    return result
+
+def worker(name, trace, queue):
+    """Attach to the shared index, look up the trace, and report back."""
+    start = time.perf_counter()
+    index = SharedZoneIndex.attach(name)
+    attach_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ids = [index.get_zone_id(pos) for pos in trace]
+    lookup_time = (time.perf_counter() - start) / len(trace) * 1e6
+
+    # Wait for the owner to rebuild, then pick up the new generation
+    first_generation = index.generation
+    while not index.refresh():
+        time.sleep(0.01)
+    queue.put((os.getpid(), attach_time, lookup_time, ids, first_generation, index.generation, index.get_zone_id(trace[0]), rss_kb()))
+    index.close()
+
+def orphan(manager, name):
+    """Publish and die without cleaning up."""
+    SharedZoneIndex.publish(manager, name)
+    os.kill(os.getpid(), 9)
+
+def build_worker(zones, trace, queue):
+    """What every worker does today: build its own ZoneManager."""
+    start = time.perf_counter()
+    manager = ZoneManager(zones)
+    build_time = time.perf_counter() - start
+    queue.put((build_time, rss_kb()))
+
+if __name__ == "__main__":
+    name = "zone_index_{}".format(os.getpid())
+    with open("../config/region_1.json", "r") as fp:
+        zones = json.load(fp)["locationBounds"]
+    min_corner, max_corner = config_bounds(zones)
+    trace = uniform_trace(min_corner, max_corner, 20000)
+    num_workers = 4
+
+    start = time.perf_counter()
+    manager = ZoneManager(zones)
+    build_time = time.perf_counter() - start
+    expected = [getattr(zone, "original_id", -1) for zone in manager.get_zones(trace)]
+
+    start = time.perf_counter()
+    owner = SharedZoneIndex.publish(manager, name)
+    print("Owner built in {:.3f}s, published generation {} in {:.3f}s".format(build_time, owner.generation, time.perf_counter() - start))
+
+    queue = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=worker, args=(name, trace, queue)) for _ in range(num_workers)]
+    for process in workers:
+        process.start()
+
+    # Rebuild with the first zone dropped, so the new generation answers differently
+    time.sleep(1.0)
+    rebuilt = ZoneManager(zones[1:])
+    owner.republish(rebuilt)
+    print("Republished as generation {}".format(owner.generation))
+
+    for _ in workers:
+        pid, attach_time, lookup_time, ids, first_generation, generation, first_id, rss = queue.get()
+        if ids != expected:
+            raise Exception("Worker {} lookups disagree with the owner's ZoneManager".format(pid))
+        print("  worker {}: attach {:.4f}s, lookup {:.2f} us/op, generation {} -> {}, RSS {} KB ({} KB shared)".format(
+            pid, attach_time, lookup_time, first_generation, generation, rss.get("VmRSS"), rss.get("RssShmem")
+        ))
+    for process in workers:
+        process.join()
+
+    build_queue = multiprocessing.Queue()
+    builder = multiprocessing.Process(target=build_worker, args=(zones, trace, build_queue))
+    builder.start()
+    worker_build_time, rss = build_queue.get()
+    builder.join()
+    print("For comparison, a worker building its own ZoneManager: {:.3f}s, RSS {} KB".format(worker_build_time, rss.get("VmRSS")))
+
+    # An owner that dies without closing leaves segments behind until someone cleans them up
+    orphan_name = name + "_orphan"
+    process = multiprocessing.Process(target=orphan, args=(manager, orphan_name))
+    process.start()
+    process.join()
+    print("Stale index left by a dead owner cleaned up: {!r}".format(SharedZoneIndex.cleanup_stale(orphan_name)))
+
+    # A reader that read the control block just before a republish can still open that generation
+    seen_generation = owner.generation
+    owner.republish(manager)
+    reader = SharedZoneIndex.attach(name)
+    if reader.generation != owner.generation:
+        raise Exception("Attached to generation {} instead of {}".format(reader.generation, owner.generation))
+    old_segment = shared_memory.SharedMemory(name=SharedZoneIndex.segment_name(name, seen_generation))
+    old_segment.close()
+    owner.republish(manager)
+    if not reader.refresh():
+        raise Exception("Reader did not pick up generation {}".format(owner.generation))
+    reader.close()
+    print("Previous generation kept for one republish")
+
+    # Float positions, through the lattice path and the tree; the plots are kept clear of
+    # the region's zones, so they are found as a lattice
+    plot_zones = plot_grid_zones(100, origin=[max_corner[0] + 64, 96, min_corner[2]]) + zones
+    float_manager = ZoneManager(plot_zones)
+    if not float_manager.lattices:
+        raise Exception("Plots were not found as a lattice")
+    owner.republish(float_manager)
+    reader = SharedZoneIndex.attach(name)
+    plot_min, plot_max = config_bounds(plot_zones)
+    float_trace = [[coord + 0.5 for coord in pos] for pos in uniform_trace(plot_min, plot_max, 5000)]
+    expected = [getattr(zone, "original_id", -1) for zone in float_manager.get_zones(float_trace)]
+    if [reader.get_zone_id(pos) for pos in float_trace] != expected:
+        raise Exception("Float lookups disagree with the owner's ZoneManager")
+    reader.close()
+    print("Float positions agree, {} of them in plots".format(sum(1 for zone_id in expected if 0 <= zone_id < 100)))
+
+    owner.close()
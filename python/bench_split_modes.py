@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+
+import json
+import time
+from lib.synthetic import random_zones
+from lib.zone_manager import ZoneManager
+
+worlds = []
+for path in ("../config/region_1.json", "../config/region_2.json"):
+    with open(path, "r") as fp:
+        worlds.append((path.split("/")[-1], json.load(fp)["locationBounds"]))
+
+# Heavily overlapping random zones, where the axis order sometimes matters
+for seed in range(3):
+    worlds.append(("random seed={}".format(seed), random_zones(40, [0, 0, 0], [300, 255, 300], [10, 10, 10], [120, 120, 120], seed=seed)))
+
+print("{:<24} {:<6} {:>10} {:>10} {:>10} {:>10}".format("World", "Mode", "Fragments", "Ave depth", "Max depth", "Build (s)"))
+for name, zones in worlds:
+    for split_mode in ("fixed", "best"):
+        start = time.perf_counter()
+        manager = ZoneManager(zones, split_mode=split_mode)
+        elapsed = time.perf_counter() - start
+        tree = manager.tree
+
+        print("{:<24} {:<6} {:>10} {:>10.2f} {:>10} {:>10.3f}".format(
+            name, split_mode, len(tree), tree.average_depth(), tree.max_depth(), elapsed
+        ))
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import sys
+import sysconfig
+import time
+from concurrent.futures import ThreadPoolExecutor
+from lib.synthetic import config_bounds, uniform_trace
+from lib.zone_manager import ZoneManager
+
+def gil_status():
+    """Describe whether this interpreter has a GIL."""
+    free_threaded_build = bool(sysconfig.get_config_var("Py_GIL_DISABLED"))
+    if not free_threaded_build:
+        return "standard build, GIL enabled"
+    if sys._is_gil_enabled():
+        return "free-threaded build, GIL re-enabled (PYTHON_GIL=1 or an extension needed it)"
+    return "free-threaded build, GIL disabled"
+
+print("Python {} ({}), {} CPUs".format(sys.version.split()[0], gil_status(), os.cpu_count()))
+
+with open("../config/region_1.json", "r") as fp:
+    zones = json.load(fp)["locationBounds"]
+min_corner, max_corner = config_bounds(zones)
+trace = uniform_trace(min_corner, max_corner, 100000)
+max_threads = max(4, os.cpu_count() or 1)
+
+for engine in ("tree", "grid", "compressed"):
+    manager = ZoneManager(zones, engine=engine)
+    manager.freeze()
+
+    start = time.perf_counter()
+    expected = manager.get_zones(trace)
+    single_time = time.perf_counter() - start
+    print("{:<10} get_zones: {:.0f} lookups/s".format(engine, len(trace) / single_time))
+
+    threads = 1
+    while threads <= max_threads:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            start = time.perf_counter()
+            result = manager.get_zones_parallel(trace, threads, executor)
+            parallel_time = time.perf_counter() - start
+        if result != expected:
+            raise Exception("{} threads disagree with get_zones()".format(threads))
+        print("{:<10} {:>2} threads: {:.0f} lookups/s, {:.2f}x".format(
+            engine, threads, len(trace) / parallel_time, single_time / parallel_time
+        ))
+        threads *= 2
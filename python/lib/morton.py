@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+"""Z-order (Morton) keys, to put nearby positions next to each other when sorted."""
+
+from math import floor
+
+# Bits kept per axis; coordinates are offset so -2**20 to 2**20 - 1 sort correctly
+MORTON_BITS = 21
+MORTON_OFFSET = 1 << (MORTON_BITS - 1)
+MORTON_MASK = (1 << MORTON_BITS) - 1
+
+def _spread_3(value):
+    """Spread the low 21 bits of value out to every third bit."""
+    value &= MORTON_MASK
+    value = (value | value << 32) & 0x1f00000000ffff
+    value = (value | value << 16) & 0x1f0000ff0000ff
+    value = (value | value << 8) & 0x100f00f00f00f00f
+    value = (value | value << 4) & 0x10c30c30c30c30c3
+    value = (value | value << 2) & 0x1249249249249249
+    return value
+
+def morton_key(pos):
+    """Returns the Morton key of a position, interleaving the bits of every axis.
+
+    Float coordinates are floored to the block they are in. Coordinates outside
+    of MORTON_BITS bits wrap around, which only costs locality.
+    """
+    if len(pos) == 3:
+        return (
+            _spread_3(floor(pos[0]) + MORTON_OFFSET)
+            | _spread_3(floor(pos[1]) + MORTON_OFFSET) << 1
+            | _spread_3(floor(pos[2]) + MORTON_OFFSET) << 2
+        )
+
+    num_axes = len(pos)
+    values = [(floor(pos[axis]) + MORTON_OFFSET) & MORTON_MASK for axis in range(num_axes)]
+    result = 0
+    for bit in range(MORTON_BITS):
+        for axis in range(num_axes):
+            result |= ((values[axis] >> bit) & 1) << (bit * num_axes + axis)
+    return result
+
+def morton_order(positions):
+    """Returns the indexes of a list of positions, sorted by Morton key."""
+    keys = [morton_key(pos) for pos in positions]
+    return sorted(range(len(positions)), key=keys.__getitem__)
+
+def morton_sorted(positions):
+    """Returns a list of positions sorted by Morton key."""
+    return sorted(positions, key=morton_key)
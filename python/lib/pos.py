@@ -1,11 +1,9 @@
 #!/usr/bin/env python3
 
-from copy import deepcopy
-
 class Pos(object):
     def __init__(self, other):
         if isinstance(other, type(self)):
-            self.list = deepcopy(other.list)
+            self.list = list(other.list)
         elif isinstance(other, str):
             self.list = []
             for coord_str in other.split():
@@ -72,7 +70,7 @@ class Pos(object):
 
 
     def min_corner(self, others):
-        result = deepcopy(self.list)
+        result = list(self.list)
         if isinstance(others, type(self)):
             others = [others]
         for other in others:
@@ -81,7 +79,7 @@ class Pos(object):
         return Pos(result)
 
     def max_corner(self, others):
-        result = deepcopy(self.list)
+        result = list(self.list)
         if isinstance(others, type(self)):
             others = [others]
         for other in others:
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+
+"""Zone occupancy and transition statistics from player position logs.
+
+A position log is a text file (optionally gzipped) with one sample per line:
+
+    time,player,x,y,z
+
+time is in seconds and increases for each player; lines starting with # are skipped.
+Coordinates may be fractional, and are floored to the block they are in.
+"""
+
+import gzip
+import json
+import time
+from math import floor
+from concurrent.futures import ProcessPoolExecutor
+
+def open_log(path):
+    """Open a position log for reading text, gzipped or not."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt")
+    return open(path, "r")
+
+def read_chunks(fp, chunk_size=65536):
+    """Yield (times, players, positions) lists of up to chunk_size samples at a time."""
+    times = []
+    players = []
+    positions = []
+    for line in fp:
+        if not line.strip() or line.startswith("#"):
+            continue
+        fields = line.split(",")
+        if len(fields) != 5:
+            raise ValueError("Expected time,player,x,y,z in position log, got {!r}".format(line.rstrip("\n")))
+        times.append(float(fields[0]))
+        players.append(fields[1])
+        positions.append((floor(float(fields[2])), floor(float(fields[3])), floor(float(fields[4]))))
+        if len(times) >= chunk_size:
+            yield (times, players, positions)
+            times = []
+            players = []
+            positions = []
+    if times:
+        yield (times, players, positions)
+
+class PositionLogStats(object):
+    """Per-zone dwell time, enter/exit counts, and samples, keyed on the zone's original_id.
+
+    Zone names are only kept for display, since several zones may share one.
+    Positions outside every zone are counted under None. Memory grows with the
+    number of zones and players, not the length of the logs.
+
+    Dwell time is the time between a player's consecutive samples, credited to
+    the zone of the earlier sample. A player moving from one zone to another
+    between samples exits the first and enters the second.
+    """
+    def __init__(self):
+        self.samples = 0
+        self.dwell = {}
+        self.enters = {}
+        self.exits = {}
+        self.zone_samples = {}
+        # original_id: zone name
+        self.names = {}
+        # player: (time, zone id) of their last sample; reset for each log file
+        self._players = {}
+
+    def add_chunk(self, manager, times, players, positions):
+        """Look up a chunk of samples with one batch lookup and count them."""
+        zones = manager.get_zones(positions)
+        last = self._players
+        dwell = self.dwell
+        zone_samples = self.zone_samples
+        names = self.names
+        for i, zone in enumerate(zones):
+            if zone is None:
+                zone_id = None
+            else:
+                zone_id = zone.original_id
+                if zone_id not in names:
+                    names[zone_id] = zone.name
+            zone_samples[zone_id] = zone_samples.get(zone_id, 0) + 1
+
+            player = players[i]
+            now = times[i]
+            previous = last.get(player)
+            if previous is not None:
+                previous_time, previous_id = previous
+                dwell[previous_id] = dwell.get(previous_id, 0.0) + (now - previous_time)
+                if previous_id != zone_id:
+                    self.exits[previous_id] = self.exits.get(previous_id, 0) + 1
+                    self.enters[zone_id] = self.enters.get(zone_id, 0) + 1
+            last[player] = (now, zone_id)
+        self.samples += len(zones)
+
+    def end_log(self):
+        """Forget every player's last sample, so the next log file starts fresh."""
+        self._players = {}
+
+    def merge(self, other):
+        """Add another PositionLogStats' counts to this one."""
+        self.samples += other.samples
+        for mine, theirs in (
+            (self.dwell, other.dwell),
+            (self.enters, other.enters),
+            (self.exits, other.exits),
+            (self.zone_samples, other.zone_samples),
+        ):
+            for key, value in theirs.items():
+                mine[key] = mine.get(key, 0) + value
+        self.names.update(other.names)
+
+    def rows(self):
+        """Returns [zone id, zone name, samples, dwell, enters, exits] per zone, most dwell time first.
+
+        Positions outside every zone have None for both the id and the name.
+        """
+        zone_ids = set(self.zone_samples) | set(self.dwell) | set(self.enters) | set(self.exits)
+        result = [
+            [
+                zone_id, self.names.get(zone_id), self.zone_samples.get(zone_id, 0), self.dwell.get(zone_id, 0.0),
+                self.enters.get(zone_id, 0), self.exits.get(zone_id, 0)
+            ]
+            for zone_id in zone_ids
+        ]
+        result.sort(key=lambda row: (-row[3], -row[2], -1 if row[0] is None else row[0]))
+        return result
+
+def analyze_log(manager, path, chunk_size=65536, stats=None):
+    """Count one position log file into stats (a new PositionLogStats if None), and return it."""
+    if stats is None:
+        stats = PositionLogStats()
+    with open_log(path) as fp:
+        for times, players, positions in read_chunks(fp, chunk_size):
+            stats.add_chunk(manager, times, players, positions)
+    stats.end_log()
+    return stats
+
+def analyze_logs(config_path, paths, workers=None, chunk_size=65536, manager_options={}):
+    """Analyze several position logs in parallel worker processes, and merge the results.
+
+    Each worker builds its own ZoneManager from the zone config once, then takes log files
+    one at a time. Returns (stats, seconds taken). With workers=0 everything runs in this process.
+    """
+    start = time.perf_counter()
+    stats = PositionLogStats()
+    if workers == 0:
+        _init_worker(config_path, manager_options)
+        for path in paths:
+            analyze_log(_worker_manager, path, chunk_size, stats)
+        return (stats, time.perf_counter() - start)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(config_path, manager_options)) as executor:
+        for result in executor.map(_analyze_in_worker, paths, [chunk_size] * len(paths)):
+            stats.merge(result)
+    return (stats, time.perf_counter() - start)
+
+# The ZoneManager of a worker process, built once by _init_worker()
+_worker_manager = None
+
+def _init_worker(config_path, manager_options):
+    """Worker process initializer for analyze_logs()."""
+    global _worker_manager
+    from lib.zone_manager import ZoneManager
+    with open(config_path, "r") as fp:
+        zones = json.load(fp)["locationBounds"]
+    _worker_manager = ZoneManager(zones, **manager_options)
+
+def _analyze_in_worker(path, chunk_size):
+    """Worker process entry point for analyze_logs()."""
+    return analyze_log(_worker_manager, path, chunk_size)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+
+"""Synthetic worlds and position traces for benchmarks and testing."""
+
+import random
+
+def config_bounds(zones):
+    """Returns (min_corner, max_corner) lists covering every zone config dict, inclusive."""
+    from lib.pos import Pos
+
+    min_corner = None
+    max_corner = None
+    for zone in zones:
+        for key in ("pos1", "pos2"):
+            pos = Pos(zone[key])
+            min_corner = pos if min_corner is None else min_corner.min_corner(pos)
+            max_corner = pos if max_corner is None else max_corner.max_corner(pos)
+    return (list(min_corner.list), list(max_corner.list))
+
+def zone_centers(zones, count=None):
+    """Returns the middle block (a tuple) of each of the first count zone config dicts, or all of them.
+
+    Handy as start points for random_walk_trace(), so players wander in and out of zones.
+    """
+    from lib.pos import Pos
+
+    result = []
+    for zone in zones[:count]:
+        a = Pos(zone["pos1"]).list
+        b = Pos(zone["pos2"]).list
+        result.append(tuple(min(a[axis], b[axis]) + (abs(b[axis] - a[axis]) + 1) // 2 for axis in range(len(a))))
+    return result
+
+def uniform_trace(min_corner, max_corner, count, seed=0):
+    """Returns count positions (tuples) uniformly spread over an inclusive box."""
+    rng = random.Random(seed)
+    num_axes = len(min_corner)
+    return [
+        tuple(rng.randint(min_corner[axis], max_corner[axis]) for axis in range(num_axes))
+        for _ in range(count)
+    ]
+
+def random_walk_trace(start_points, count, step=1, y_range=(0, 255), seed=0):
+    """Returns count positions (tuples) of players wandering around start_points.
+
+    Each player takes a short walk from a random start point, moving at most
+    step blocks along x and z per position, and occasionally jumping or falling.
+    """
+    rng = random.Random(seed)
+    result = []
+    while len(result) < count:
+        x, y, z = start_points[rng.randrange(len(start_points))]
+        for _ in range(min(count - len(result), rng.randint(100, 1000))):
+            x += rng.randint(-step, step)
+            z += rng.randint(-step, step)
+            if rng.random() < 0.05:
+                y = min(y_range[1], max(y_range[0], y + rng.randint(-3, 3)))
+            result.append((x, y, z))
+    return result
+
+def random_zones(count, min_corner, max_corner, min_size, max_size, types=("SafeZone", "AdventureZone"), seed=0):
+    """Returns count zone config dicts of random sizes placed randomly inside an inclusive box."""
+    rng = random.Random(seed)
+    num_axes = len(min_corner)
+    result = []
+    for i in range(count):
+        pos1 = []
+        pos2 = []
+        for axis in range(num_axes):
+            size = rng.randint(min_size[axis], max_size[axis])
+            start = rng.randint(min_corner[axis], max(min_corner[axis], max_corner[axis] - size + 1))
+            pos1.append(start)
+            pos2.append(start + size - 1)
+        result.append({
+            "name": "Zone {}".format(i),
+            "type": types[rng.randrange(len(types))],
+            "pos1": pos1,
+            "pos2": pos2,
+        })
+    return result
+
+def plot_grid_zones(num_plots, plot_size=[31, 160, 31], stride=[32, 0, 32], origin=[0, 96, 0], ztype="SafeZone"):
+    """Returns zone config dicts for player plots laid out on a regular lattice.
+
+    Plots fill a square grid along the axes with a non-zero stride.
+    """
+    num_axes = len(origin)
+    grid_axes = [axis for axis in range(num_axes) if stride[axis] != 0]
+    side = 1
+    while side ** len(grid_axes) < num_plots:
+        side += 1
+
+    result = []
+    for i in range(num_plots):
+        pos1 = list(origin)
+        index = i
+        for axis in grid_axes:
+            pos1[axis] += (index % side) * stride[axis]
+            index //= side
+        pos2 = [pos1[axis] + plot_size[axis] - 1 for axis in range(num_axes)]
+        result.append({
+            "name": "Plot {}".format(i),
+            "type": ztype,
+            "pos1": pos1,
+            "pos2": pos2,
+        })
+    return result
+
+def write_position_log(fp, start_points, num_players, count, interval=1.0, start_time=0.0, seed=0):
+    """Write count samples of num_players wandering players as a position log (time,player,x,y,z).
+
+    Every player is sampled once per interval seconds, like a server logging all online players.
+    """
+    rng = random.Random(seed)
+    players = []
+    for i in range(num_players):
+        x, y, z = start_points[rng.randrange(len(start_points))]
+        players.append(["player{}".format(i), x, y, z])
+
+    written = 0
+    now = start_time
+    while written < count:
+        lines = []
+        for player in players[:count - written]:
+            player[1] += rng.randint(-4, 4)
+            player[3] += rng.randint(-4, 4)
+            if rng.random() < 0.05:
+                player[2] = min(255, max(0, player[2] + rng.randint(-3, 3)))
+            lines.append("{:.1f},{},{},{},{}\n".format(now, player[0], player[1], player[2], player[3]))
+        fp.write("".join(lines))
+        written += len(lines)
+        now += interval
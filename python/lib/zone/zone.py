@@ -16,6 +16,8 @@ class Zone(ZoneBase):
         self.original_id = None
         self.fragments = []
         self.eclipsed_fragments = []
+        # Rule flags for this zone's type, set by ZoneManager
+        self.flags = 0
 
         # Order to process axes, such as [0, 2, 1]
         if axis_order is None:
@@ -25,6 +27,7 @@ class Zone(ZoneBase):
             self.name = other.name
             self.type = other.type
             self.original_id = other.original_id
+            self.flags = other.flags
             self.fragments = list(other.fragments)
             self.eclipsed_fragments = list(other.eclipsed_fragments)
 
@@ -57,6 +60,35 @@ class Zone(ZoneBase):
 
         self.fragments = new_fragments
 
+    def best_split_by_overlaps(self, overlaps, axis_orders):
+        """Split by several overlapping zones, trying each axis order given.
+
+        Each axis order is used to split and defragment a fresh copy of the fragments,
+        and the result with the fewest fragments is kept (the earliest order wins ties).
+        Fragments are defragmented when this returns. Returns the axis order chosen.
+        """
+        original_fragments = self.fragments
+        best_order = None
+        best_fragments = None
+
+        for axis_order in axis_orders:
+            self.fragments = []
+            for fragment in original_fragments:
+                trial_fragment = ZoneFragment(fragment)
+                trial_fragment.axis_order = list(axis_order)
+                self.fragments.append(trial_fragment)
+
+            for overlap in overlaps:
+                self.split_by_overlap(overlap)
+            self.defragment()
+
+            if best_fragments is None or len(self.fragments) < len(best_fragments):
+                best_order = list(axis_order)
+                best_fragments = self.fragments
+
+        self.fragments = best_fragments
+        return best_order
+
     def defragment(self):
         """Minimize the number of uneclipsed fragments.
 
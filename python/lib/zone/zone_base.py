@@ -1,6 +1,5 @@
 #!/usr/bin/env python3
 
-from copy import deepcopy
 from lib.pos import Pos
 
 class ZoneBase(object):
@@ -26,8 +25,8 @@ class ZoneBase(object):
             raise TypeError("Expected ZoneBase to be initialized with a dict or another ZoneBase")
 
     def _init_from_zone(self, other):
-        self._pos = deepcopy(other._pos)
-        self._size = deepcopy(other._size)
+        self._pos = Pos(other._pos)
+        self._size = Pos(other._size)
 
     def _init_from_config(self, other):
         a = Pos(other["pos1"])
@@ -1,6 +1,5 @@
 #!/usr/bin/env python3
 
-from copy import deepcopy
 from lib.pos import Pos
 from lib.zone.zone_base import ZoneBase
 # Circular dependency workaround for Python; can be a normal import for Java
@@ -16,11 +15,13 @@ class ZoneFragment(ZoneBase):
 
         if isinstance(other, ZoneFragment):
             self.parent = other.parent
-            self.axis_order = deepcopy(other.axis_order)
+            self.axis_order = list(other.axis_order)
+            self.flags = other.flags
 
         elif isinstance(other, zone.Zone):
             self.parent = other
             self.axis_order = axis_order
+            self.flags = other.flags
 
         else:
             raise TypeError("Expected ZoneFragment to be initialized with a Zone or another ZoneFragment")
@@ -88,10 +89,11 @@ class ZoneFragment(ZoneBase):
 
         Returns the merged ZoneFragment or None.
         """
-        a_min = self.min_corner
-        b_min = other.min_corner
-        a_size = self.size()
-        b_size = other.size()
+        # Plain lists; most pairs can't merge, and are rejected without creating a Pos
+        a_min = self._pos.list
+        b_min = other._pos.list
+        a_size = self._size.list
+        b_size = other._size.list
 
         # Confirm the ZoneFragments can be merged without extending outside their bounds
         different_axis = -1
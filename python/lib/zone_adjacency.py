@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+
+from operator import itemgetter
+from lib.zone_broad_phase import overlapping_pairs
+
+# Most pairs of nodes on either side of a face to compare directly, rather than with the broad phase
+_FACE_PAIRS_LIMIT = 256
+
+class ZoneAdjacency(object):
+    """Which zone fragments, and which gaps between them, share a face.
+
+    The space around the fragments (within their bounds, plus a block of margin)
+    is cut into gap boxes, so every position in the bounds is in exactly one node:
+    a fragment, or a gap with no zone. Nodes are numbered, fragments first.
+
+    An entity that leaves a node nearly always enters one of its neighbours, so
+    walk() starts from the node a previous lookup returned and steps across the
+    faces the position is past, before giving up after max_steps and locating
+    the node from scratch with a coarse grid.
+    """
+    def __init__(self, fragments=[], axis_order=None, locator_cell_size=64):
+        """Build the gaps, the adjacency graph, and the fallback locator. Zone fragments must not overlap."""
+        self.num_fragments = len(fragments)
+        # Node i covers [self._mins[i], self._maxs[i]); zones[i] is None for gaps
+        self._mins = [tuple(fragment.min_corner.list) for fragment in fragments]
+        self._maxs = [tuple(fragment.true_max_corner.list) for fragment in fragments]
+        self.zones = [fragment.parent for fragment in fragments]
+        self.num_axes = len(self._mins[0]) if fragments else 0
+        if not fragments:
+            self.bounds = ((), ())
+            self.neighbors = []
+            return
+
+        num_axes = self.num_axes
+        if axis_order is None:
+            axis_order = list(range(num_axes))
+        self.bounds = (
+            tuple(min(box_min[axis] for box_min in self._mins) - 1 for axis in range(num_axes)),
+            tuple(max(box_max[axis] for box_max in self._maxs) + 1 for axis in range(num_axes)),
+        )
+
+        for box_min, box_max in self._find_gaps(axis_order):
+            self._mins.append(box_min)
+            self._maxs.append(box_max)
+            self.zones.append(None)
+
+        self.neighbors = self._find_neighbors()
+        self._build_locator(locator_cell_size)
+
+    def _find_gaps(self, axis_order):
+        """Returns (min, max) boxes covering the bounds where no fragment is, merged where possible."""
+        gaps = _gaps_in(self.bounds, list(zip(self._mins, self._maxs)), axis_order)
+
+        # Merge gaps that share an entire face, one axis at a time, until nothing changes.
+        # Only gaps with the same extent along the other axes can merge, so they are grouped on that.
+        merged = True
+        while merged:
+            merged = False
+            for axis in range(self.num_axes):
+                others = itemgetter(*[other for other in range(self.num_axes) if other != axis])
+                groups = {}
+                for gap in gaps:
+                    key = (others(gap[0]), others(gap[1]))
+                    group = groups.get(key)
+                    if group is None:
+                        groups[key] = [gap]
+                    else:
+                        group.append(gap)
+                result = []
+                for group in groups.values():
+                    if len(group) == 1:
+                        result.append(group[0])
+                        continue
+                    group.sort(key=lambda gap: gap[0][axis])
+                    last = group[0]
+                    for gap in group[1:]:
+                        if last[1][axis] == gap[0][axis]:
+                            new_max = list(last[1])
+                            new_max[axis] = gap[1][axis]
+                            last = (last[0], tuple(new_max))
+                            merged = True
+                        else:
+                            result.append(last)
+                            last = gap
+                    result.append(last)
+                gaps = result
+        return gaps
+
+    def _find_neighbors(self):
+        """Returns the neighbouring node ids of each node, per face.
+
+        neighbors[node][2 * axis] are the nodes past its min face along axis,
+        and neighbors[node][2 * axis + 1] the nodes past its max face.
+
+        Nodes meeting at a plane are compared by their faces on that plane. Nodes on one
+        side of a plane never overlap each other, so for big planes the broad phase finds
+        exactly the overlapping faces.
+        """
+        mins = self._mins
+        maxs = self._maxs
+        num_nodes = len(mins)
+        neighbors = [[[] for _ in range(2 * self.num_axes)] for _ in range(num_nodes)]
+        for axis in range(self.num_axes):
+            others = [other for other in range(self.num_axes) if other != axis]
+            ending = {}
+            starting = {}
+            for node in range(num_nodes):
+                ending.setdefault(maxs[node][axis], []).append(node)
+                starting.setdefault(mins[node][axis], []).append(node)
+            for face, lower_nodes in ending.items():
+                upper_nodes = starting.get(face, ())
+                if len(lower_nodes) * len(upper_nodes) <= _FACE_PAIRS_LIMIT:
+                    pairs = [
+                        (a, b) for a in lower_nodes for b in upper_nodes
+                        if all(mins[a][o] < maxs[b][o] and mins[b][o] < maxs[a][o] for o in others)
+                    ]
+                else:
+                    # Lower nodes first, so each overlapping pair is an upper node and an earlier lower node
+                    face_nodes = lower_nodes + upper_nodes
+                    face_mins = [mins[node][o] for node in face_nodes for o in others]
+                    face_maxs = [maxs[node][o] for node in face_nodes for o in others]
+                    earlier = overlapping_pairs(face_mins, face_maxs, len(others))
+                    pairs = [
+                        (face_nodes[i], face_nodes[j]) for j in range(len(lower_nodes), len(face_nodes)) for i in earlier[j]
+                    ]
+                for a, b in pairs:
+                    neighbors[a][2 * axis + 1].append(b)
+                    neighbors[b][2 * axis].append(a)
+        return neighbors
+
+    def _build_locator(self, cell_size):
+        """A coarse uniform grid of node ids, used when walking gives up."""
+        self._cell_size = cell_size
+        self._cells = {}
+        for node in range(len(self._mins)):
+            box_min = self._mins[node]
+            box_max = self._maxs[node]
+            keys = [()]
+            for axis in range(self.num_axes):
+                cells = range(box_min[axis] // cell_size, (box_max[axis] - 1) // cell_size + 1)
+                keys = [key + (cell,) for key in keys for cell in cells]
+            for key in keys:
+                self._cells.setdefault(key, []).append(node)
+
+    def box(self, node):
+        """Returns (min corner, max corner) of a node as tuples, with the max corner exclusive."""
+        return (self._mins[node], self._maxs[node])
+
+    def contains(self, node, pos):
+        """Check if a node contains a position."""
+        box_min = self._mins[node]
+        box_max = self._maxs[node]
+        for axis in range(self.num_axes):
+            if pos[axis] < box_min[axis] or box_max[axis] <= pos[axis]:
+                return False
+        return True
+
+    def locate(self, pos):
+        """Returns (node, nodes checked) for a position from scratch; node is -1 outside the bounds."""
+        if not self.num_axes:
+            return (-1, 0)
+        key = tuple(pos[axis] // self._cell_size for axis in range(self.num_axes))
+        checked = 0
+        for node in self._cells.get(key, ()):
+            checked += 1
+            if self.contains(node, pos):
+                return (node, checked)
+        return (-1, checked)
+
+    def walk(self, pos, start=-1, max_steps=4):
+        """Returns (node, nodes checked) for a position, starting from the node of a previous lookup.
+
+        Each step crosses one face of the current node that the position is past, into
+        the neighbour on the other side in line with the position. After max_steps steps,
+        or with no start node, the node is located from scratch. node is -1 outside the bounds.
+        """
+        if start < 0:
+            return self.locate(pos)
+
+        num_axes = self.num_axes
+        bounds_min, bounds_max = self.bounds
+        for axis in range(num_axes):
+            if pos[axis] < bounds_min[axis] or bounds_max[axis] <= pos[axis]:
+                return (-1, 0)
+
+        mins = self._mins
+        maxs = self._maxs
+        current = start
+        checked = 1
+        for _ in range(max_steps + 1):
+            box_min = mins[current]
+            box_max = maxs[current]
+            face = -1
+            for axis in range(num_axes):
+                if pos[axis] < box_min[axis]:
+                    face = 2 * axis
+                    break
+                if box_max[axis] <= pos[axis]:
+                    face = 2 * axis + 1
+                    break
+            if face < 0:
+                return (current, checked)
+
+            # The neighbour across the face at the position, clamped onto the face
+            crossing = face // 2
+            next_node = -1
+            for node in self.neighbors[current][face]:
+                checked += 1
+                next_min = mins[node]
+                next_max = maxs[node]
+                for axis in range(num_axes):
+                    if axis == crossing:
+                        continue
+                    value = min(max(pos[axis], box_min[axis]), box_max[axis] - 1)
+                    if value < next_min[axis] or next_max[axis] <= value:
+                        break
+                else:
+                    next_node = node
+                    break
+            if next_node < 0:
+                break
+            current = next_node
+
+        node, located_checked = self.locate(pos)
+        return (node, checked + located_checked)
+
+    def get_zone(self, pos, start=-1, max_steps=4):
+        """Returns (zone or None, node) for a position; pass node back in as start for the next lookup."""
+        node, checked = self.walk(pos, start, max_steps)
+        if node < 0:
+            return (None, node)
+        return (self.zones[node], node)
+
+    def __len__(self):
+        return len(self._mins)
+
+########################################################################################################################
+# Only needed for debug and statistics:
+
+    def stats(self):
+        """Debug info only."""
+        num_edges = sum(len(face) for node_neighbors in self.neighbors for face in node_neighbors) // 2
+        return {
+            "fragments": self.num_fragments,
+            "gaps": len(self._mins) - self.num_fragments,
+            "edges": num_edges,
+            "locator_cells": len(self._cells) if self.num_axes else 0,
+        }
+
+# Most boxes to subtract from a region one by one, rather than splitting it further
+_GAPS_LEAF_SIZE = 8
+
+def _gaps_in(region, boxes, axis_order):
+    """Returns (min, max) boxes covering a region where none of a list of (min, max) boxes are.
+
+    The region is split in two at a box face near the middle of its longest axis, and each
+    half only has the boxes that reach into it subtracted from it, so each box is only cut
+    out of the gaps near it instead of every gap. The halves are joined up again by merging.
+    """
+    region_min, region_max = region
+    num_axes = len(region_min)
+    if len(boxes) > _GAPS_LEAF_SIZE:
+        axis = max(range(num_axes), key=lambda axis: region_max[axis] - region_min[axis])
+        faces = sorted(
+            face for box_min, box_max in boxes for face in (box_min[axis], box_max[axis])
+            if region_min[axis] < face < region_max[axis]
+        )
+        if faces:
+            split = faces[len(faces) // 2]
+            below = [box for box in boxes if box[0][axis] < split]
+            above = [box for box in boxes if split < box[1][axis]]
+            # Boxes crossing the split go to both halves; only split if that leaves each half with less
+            if len(below) < len(boxes) or len(above) < len(boxes):
+                below_max = list(region_max)
+                below_max[axis] = split
+                above_min = list(region_min)
+                above_min[axis] = split
+                return (
+                    _gaps_in((region_min, tuple(below_max)), below, axis_order)
+                    + _gaps_in((tuple(above_min), region_max), above, axis_order)
+                )
+
+    gaps = [region]
+    for box_min, box_max in boxes:
+        new_gaps = []
+        for gap in gaps:
+            new_gaps += _subtract_box(gap, box_min, box_max, axis_order)
+        gaps = new_gaps
+    return gaps
+
+def _subtract_box(box, cut_min, cut_max, axis_order):
+    """Returns the (min, max) boxes left of a box once another box is cut out of it."""
+    box_min, box_max = box
+    for axis in range(len(box_min)):
+        if cut_max[axis] <= box_min[axis] or box_max[axis] <= cut_min[axis]:
+            return [box]
+
+    result = []
+    remaining_min = list(box_min)
+    remaining_max = list(box_max)
+    for axis in axis_order:
+        if remaining_min[axis] < cut_min[axis]:
+            piece_max = list(remaining_max)
+            piece_max[axis] = cut_min[axis]
+            result.append((tuple(remaining_min), tuple(piece_max)))
+            remaining_min[axis] = cut_min[axis]
+        if cut_max[axis] < remaining_max[axis]:
+            piece_min = list(remaining_min)
+            piece_min[axis] = cut_max[axis]
+            result.append((tuple(piece_min), tuple(remaining_max)))
+            remaining_max[axis] = cut_max[axis]
+    return result
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+"""Broad phase overlap detection: which boxes might overlap, without comparing every pair."""
+
+def box_arrays(zones):
+    """Returns flat (min_corners, max_corners) lists for ZoneBases, with max corners exclusive."""
+    min_corners = []
+    max_corners = []
+    for zone in zones:
+        pos = zone._pos.list
+        size = zone._size.list
+        min_corners += pos
+        max_corners += [pos[axis] + size[axis] for axis in range(len(pos))]
+    return (min_corners, max_corners)
+
+def overlapping_pairs(min_corners, max_corners, num_axes=3, cell_size=None):
+    """Returns a list with, for each box, the sorted indexes of earlier boxes overlapping it.
+
+    min_corners and max_corners are flat sequences of num_axes ints per box, with max
+    corners exclusive. Boxes are hashed into a uniform grid, and only boxes sharing a cell
+    are compared; each pair is only checked in the cell holding the min corner of its
+    overlap, so no pair is found twice. cell_size is a list with one size per axis,
+    defaulting to twice the average box size.
+    """
+    num_boxes = len(min_corners) // num_axes
+    result = [[] for _ in range(num_boxes)]
+    if num_boxes < 2:
+        return result
+
+    if cell_size is None:
+        cell_size = []
+        for axis in range(num_axes):
+            total = 0
+            for start in range(axis, num_boxes * num_axes, num_axes):
+                total += max_corners[start] - min_corners[start]
+            cell_size.append(max(1, 2 * total // num_boxes))
+
+    # Cell ranges per box, then the boxes in each cell
+    cells = {}
+    for i in range(num_boxes):
+        start = i * num_axes
+        keys = [()]
+        for axis in range(num_axes):
+            size = cell_size[axis]
+            axis_cells = range(min_corners[start + axis] // size, (max_corners[start + axis] - 1) // size + 1)
+            keys = [key + (cell,) for key in keys for cell in axis_cells]
+        for key in keys:
+            boxes = cells.get(key)
+            if boxes is None:
+                cells[key] = [i]
+            else:
+                boxes.append(i)
+
+    for key, boxes in cells.items():
+        if len(boxes) < 2:
+            continue
+        for index, j in enumerate(boxes):
+            j_start = j * num_axes
+            for i in boxes[:index]:
+                i_start = i * num_axes
+                for axis in range(num_axes):
+                    low = max(min_corners[i_start + axis], min_corners[j_start + axis])
+                    if low >= min(max_corners[i_start + axis], max_corners[j_start + axis]):
+                        break
+                    if low // cell_size[axis] != key[axis]:
+                        # Found in another cell instead
+                        break
+                else:
+                    result[j].append(i)
+
+    for earlier in result:
+        earlier.sort()
+    return result
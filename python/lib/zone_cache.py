@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+from collections import OrderedDict
+from math import floor
+
+class ZoneCache(object):
+    """A bounded least recently used cache of lookup results by block position.
+
+    Positions are packed into one 64-bit int for the key, instead of hashing a tuple
+    or Pos: 26 bits each for x and z, and 12 bits for y. Positions outside of that
+    range (or without 3 axes) aren't cached. Float positions are cached by the block
+    they are in, which is always in the same zones since zone corners are whole blocks.
+
+    Results must be dropped with clear() whenever the index they came from changes.
+    Safe to share between threads; the statistics may miss a count or two when they do.
+    """
+    XZ_BITS = 26
+    Y_BITS = 12
+    XZ_OFFSET = 1 << (XZ_BITS - 1)
+    Y_OFFSET = 1 << (Y_BITS - 1)
+    XZ_LIMIT = 1 << XZ_BITS
+    Y_LIMIT = 1 << Y_BITS
+
+    # Returned by get() for positions not in the cache
+    MISS = object()
+
+    @staticmethod
+    def pack(pos):
+        """Returns a position packed into a 64-bit int, or None if it can't be."""
+        if len(pos) != 3:
+            return None
+        x = floor(pos[0]) + ZoneCache.XZ_OFFSET
+        y = floor(pos[1]) + ZoneCache.Y_OFFSET
+        z = floor(pos[2]) + ZoneCache.XZ_OFFSET
+        if not (0 <= x < ZoneCache.XZ_LIMIT and 0 <= y < ZoneCache.Y_LIMIT and 0 <= z < ZoneCache.XZ_LIMIT):
+            return None
+        return (x << (ZoneCache.XZ_BITS + ZoneCache.Y_BITS)) | (z << ZoneCache.Y_BITS) | y
+
+    @staticmethod
+    def unpack(key):
+        """Returns the position a packed key came from."""
+        y = (key & (ZoneCache.Y_LIMIT - 1)) - ZoneCache.Y_OFFSET
+        z = ((key >> ZoneCache.Y_BITS) & (ZoneCache.XZ_LIMIT - 1)) - ZoneCache.XZ_OFFSET
+        x = (key >> (ZoneCache.XZ_BITS + ZoneCache.Y_BITS)) - ZoneCache.XZ_OFFSET
+        return (x, y, z)
+
+    def __init__(self, max_size=4096):
+        if max_size < 1:
+            raise ValueError("ZoneCache max_size must be at least 1, got {!r}".format(max_size))
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.clears = 0
+
+    def get(self, key):
+        """Returns the cached result for a packed position, or ZoneCache.MISS."""
+        entries = self._entries
+        result = entries.get(key, ZoneCache.MISS)
+        if result is ZoneCache.MISS:
+            self.misses += 1
+            return result
+        try:
+            entries.move_to_end(key)
+        except KeyError:
+            # Evicted by another thread in the meantime
+            pass
+        self.hits += 1
+        return result
+
+    def put(self, key, value):
+        """Cache the result for a packed position, evicting the least recently used if full."""
+        entries = self._entries
+        entries[key] = value
+        if len(entries) > self.max_size:
+            try:
+                entries.popitem(last=False)
+                self.evictions += 1
+            except KeyError:
+                # Emptied by another thread in the meantime
+                pass
+
+    def clear(self):
+        """Forget every cached result, such as after the index is rebuilt."""
+        self._entries.clear()
+        self.clears += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+########################################################################################################################
+# Only needed for debug and statistics:
+
+    def hit_rate(self):
+        """Debug info only. The fraction of lookups answered from the cache."""
+        total = self.hits + self.misses
+        if total == 0:
+            return 0.0
+        return self.hits / total
+
+    def stats(self):
+        """Debug info only."""
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate(),
+            "evictions": self.evictions,
+            "clears": self.clears,
+        }
+
+    def reset_stats(self):
+        """Debug info only. Start counting hits and misses again."""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.clears = 0
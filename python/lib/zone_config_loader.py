@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+
+import json
+from array import array
+
+# Keys every zone entry must have
+ZONE_KEYS = ("name", "type", "pos1", "pos2")
+
+class ZoneConfigLoader(object):
+    """Streams zone definitions out of a region config file.
+
+    Only the "locationBounds" list is kept; every other top level value is
+    decoded one at a time and discarded. Zone entries are decoded one at a time
+    from a small rolling buffer, and their corners are parsed in bulk into flat
+    integer arrays (num_axes values per zone) once the list has been read.
+    """
+    def __init__(self, num_axes=3, chunk_size=64*1024, key="locationBounds"):
+        self.num_axes = num_axes
+        self.chunk_size = chunk_size
+        self.key = key
+
+        self._decoder = json.JSONDecoder()
+
+    def load(self, fp):
+        """Returns (names, types, pos1, pos2) from an open config file.
+
+        pos1 and pos2 are flat arrays of ints, num_axes values per zone,
+        in the same order as names and types.
+        """
+        names = []
+        types = []
+        pos1_strs = []
+        pos2_strs = []
+
+        for entry in self.iter_location_bounds(fp):
+            names.append(entry["name"])
+            types.append(entry["type"])
+            pos1_strs.append(entry["pos1"])
+            pos2_strs.append(entry["pos2"])
+
+        pos1 = self.parse_coordinates(pos1_strs, "pos1")
+        pos2 = self.parse_coordinates(pos2_strs, "pos2")
+
+        return (names, types, pos1, pos2)
+
+    def load_path(self, path):
+        """Same as load(), but opens the file for you."""
+        with open(path, "r") as fp:
+            return self.load(fp)
+
+    def iter_location_bounds(self, fp):
+        """Yields each zone dict in the config's location bounds list, in order.
+
+        Raises a ValueError if the list is missing, or for the first entry that isn't
+        an object with a name, type, pos1, and pos2.
+        """
+        stream = _JsonStream(fp, self._decoder, self.chunk_size)
+
+        stream.expect("{")
+        found = False
+        if stream.peek() == "}":
+            stream.expect("}")
+        else:
+            while True:
+                key = stream.decode_value()
+                stream.expect(":")
+
+                if key == self.key:
+                    found = True
+                    stream.expect("[")
+                    if stream.peek() == "]":
+                        stream.expect("]")
+                    else:
+                        i = 0
+                        while True:
+                            entry = stream.decode_value()
+                            if not isinstance(entry, dict):
+                                raise ValueError("{} #{}: expected an object, got {!r}".format(self.key, i, entry))
+                            missing = [name for name in ZONE_KEYS if name not in entry]
+                            if missing:
+                                raise ValueError("{} #{}: missing {}".format(self.key, i, ", ".join(missing)))
+                            yield entry
+                            i += 1
+
+                            if stream.expect(",]") == "]":
+                                break
+                else:
+                    # Not interested; decode it on its own and let it go.
+                    stream.decode_value()
+
+                if stream.expect(",}") == "}":
+                    break
+
+        if not found:
+            raise ValueError("No {!r} list in config".format(self.key))
+
+    def parse_coordinates(self, coords, label="pos"):
+        """Parse a list of coordinates into one flat array of ints.
+
+        Each coordinate is a string such as "-966 90 -124" or a list such as [-966, 90, -124].
+        The whole list is split and converted in one pass; entries are only looked at
+        one by one to report which of them is malformed.
+        """
+        num_axes = self.num_axes
+        parts = []
+        for coord in coords:
+            if isinstance(coord, str):
+                parts.append(coord)
+            elif isinstance(coord, (list, tuple)):
+                parts.append(" ".join([str(value) for value in coord]))
+            else:
+                raise ValueError("{} #{}: expected a string or list, got {!r}".format(label, len(parts), coord))
+
+        # Separators land on every (num_axes + 1)th token if every entry has num_axes values.
+        tokens = " , ".join(parts).split()
+        if (
+            len(tokens) != max(0, len(parts) * (num_axes + 1) - 1)
+            or tokens[num_axes::num_axes + 1].count(",") != max(0, len(parts) - 1)
+        ):
+            self._raise_bad_coordinate(parts, label)
+
+        del tokens[num_axes::num_axes + 1]
+        try:
+            return array("q", map(int, tokens))
+        except ValueError:
+            self._raise_bad_coordinate(parts, label)
+
+    def _raise_bad_coordinate(self, parts, label):
+        """Find the first malformed coordinate and raise a ValueError naming it."""
+        for i, part in enumerate(parts):
+            values = part.split()
+            if len(values) != self.num_axes:
+                raise ValueError("{} #{}: expected {} axes, got {!r}".format(label, i, self.num_axes, part))
+            for value in values:
+                try:
+                    int(value)
+                except ValueError:
+                    raise ValueError("{} #{}: expected integer coordinates, got {!r}".format(label, i, part))
+        raise ValueError("{}: malformed coordinates".format(label))
+
+class _JsonStream(object):
+    """A rolling buffer over a file for decoding one JSON value at a time."""
+    def __init__(self, fp, decoder, chunk_size):
+        self._fp = fp
+        self._decoder = decoder
+        self._chunk_size = chunk_size
+        self._buffer = ""
+        self._offset = 0
+        self._eof = False
+
+    def _fill(self):
+        """Read another chunk, dropping whatever has been consumed already."""
+        if self._eof:
+            return False
+        chunk = self._fp.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._offset:] + chunk
+        self._offset = 0
+        return True
+
+    def peek(self):
+        """Returns the next non-whitespace character without consuming it, or "" at the end."""
+        while True:
+            while self._offset < len(self._buffer) and self._buffer[self._offset] in " \t\r\n":
+                self._offset += 1
+            if self._offset < len(self._buffer):
+                return self._buffer[self._offset]
+            if not self._fill():
+                return ""
+
+    def expect(self, allowed):
+        """Consume one of the allowed punctuation characters and return it."""
+        char = self.peek()
+        if char == "" or char not in allowed:
+            raise ValueError("Expected one of {!r} in config, got {!r}".format(allowed, char))
+        self._offset += 1
+        return char
+
+    def decode_value(self):
+        """Decode and consume the next JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._offset)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+
+            # A number or literal at the end of the buffer may continue in the next chunk
+            if end == len(self._buffer) and self._fill():
+                continue
+
+            self._offset = end
+            return value
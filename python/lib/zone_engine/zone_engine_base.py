@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+# Engines are imported when created to avoid Python's circular dependency issues; Java does not require this.
+
+class ZoneEngineBase(object):
+    """The base class of a spatial index over non-overlapping zone fragments.
+
+    Every engine answers the same queries, and must agree with ZoneEngineScan.
+    """
+    ENGINE_NAMES = ("tree", "rtree", "grid", "kdtree", "compiled", "compressed", "column", "scan")
+
+    @staticmethod
+    def CreateZoneEngine(engine="tree", fragments=[], **options):
+        """Create the named engine over a list of zone fragments."""
+        if engine == "tree":
+            from lib.zone_engine.zone_engine_tree import ZoneEngineTree
+            return ZoneEngineTree(fragments, **options)
+        elif engine == "rtree":
+            from lib.zone_engine.zone_engine_rtree import ZoneEngineRTree
+            return ZoneEngineRTree(fragments, **options)
+        elif engine == "grid":
+            from lib.zone_engine.zone_engine_grid import ZoneEngineGrid
+            return ZoneEngineGrid(fragments, **options)
+        elif engine == "kdtree":
+            from lib.zone_engine.zone_engine_kd import ZoneEngineKd
+            return ZoneEngineKd(fragments, **options)
+        elif engine == "compiled":
+            from lib.zone_engine.zone_engine_compiled import ZoneEngineCompiled
+            return ZoneEngineCompiled(fragments, **options)
+        elif engine == "compressed":
+            from lib.zone_engine.zone_engine_compressed import ZoneEngineCompressed
+            return ZoneEngineCompressed(fragments, **options)
+        elif engine == "column":
+            from lib.zone_engine.zone_engine_column import ZoneEngineColumn
+            return ZoneEngineColumn(fragments, **options)
+        elif engine == "scan":
+            from lib.zone_engine.zone_engine_scan import ZoneEngineScan
+            return ZoneEngineScan(fragments, **options)
+        else:
+            raise ValueError("Unknown zone engine {!r}, expected one of {!r}".format(engine, ZoneEngineBase.ENGINE_NAMES))
+
+    @staticmethod
+    def fragment_boxes(fragments):
+        """Returns a list of (min_corner, max_corner, fragment) tuples, with max_corner exclusive.
+
+        Corners are plain tuples, so engines don't need to touch Pos objects during lookups.
+        """
+        result = []
+        for fragment in fragments:
+            result.append((tuple(fragment.min_corner.list), tuple(fragment.true_max_corner.list), fragment))
+        return result
+
+    @staticmethod
+    def zones_by_id(fragments):
+        """Returns a list of the fragments' zones indexed by original_id.
+
+        The list has one extra None at the end, so an id of -1 means no zone.
+        """
+        max_id = -1
+        for fragment in fragments:
+            max_id = max(max_id, fragment.parent.original_id)
+        result = [None] * (max_id + 2)
+        for fragment in fragments:
+            result[fragment.parent.original_id] = fragment.parent
+        return result
+
+    @staticmethod
+    def box_contains(box_min, box_max, pos):
+        """Check if a position is inside a box with an exclusive max corner."""
+        for axis in range(len(box_min)):
+            if pos[axis] < box_min[axis] or box_max[axis] <= pos[axis]:
+                return False
+        return True
+
+    @staticmethod
+    def boxes_overlap(a_min, a_max, b_min, b_max):
+        """Check if two boxes with exclusive max corners overlap."""
+        for axis in range(len(a_min)):
+            if a_max[axis] <= b_min[axis] or b_max[axis] <= a_min[axis]:
+                return False
+        return True
+
+    def __init__(self, fragments=[]):
+        """Create the engine. Zone fragments must not overlap to load."""
+        pass
+
+    def get_zone(self, pos):
+        """Get the zone a position is in, or None."""
+        pass
+
+    def get_zones(self, positions):
+        """Get the zone of each position in a list, as a list."""
+        get_zone = self.get_zone
+        return [get_zone(pos) for pos in positions]
+
+    def get_flags(self, pos):
+        """Get the flags of the zone a position is in, or None if it isn't in one."""
+        zone = self.get_zone(pos)
+        if zone is None:
+            return None
+        return zone.flags
+
+    def get_fragments_in_box(self, box):
+        """Get a list of the zone fragments overlapping a ZoneBase."""
+        pass
+
+    def get_zones_in_box(self, box):
+        """Get a list of the zones with any fragment overlapping a ZoneBase, in priority order."""
+        zones = {}
+        for fragment in self.get_fragments_in_box(box):
+            zones[id(fragment.parent)] = fragment.parent
+        return sorted(zones.values(), key=lambda zone: zone.original_id)
+
+    def freeze(self):
+        """Finish any lazy work, so lookups never modify the engine. Most engines have none."""
+        pass
+
+    def stats(self):
+        """Returns a dict of statistics about the engine."""
+        pass
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+from lib.pos import Pos
+from lib.zone.zone_fragment import ZoneFragment
+from lib.zone_engine.zone_engine_base import ZoneEngineBase
+from lib.zone_tree.zone_tree_base import ZoneTreeBase
+
+class ZoneEngineColumn(ZoneEngineBase):
+    """Full height fragments in a tree without the height axis, and the rest in a regular tree.
+
+    Many zones span the whole build height, so for them the height is never worth
+    splitting on. Fragments covering column_min to column_max along column_axis are
+    flattened into a tree over the other axes; any part of them outside that range,
+    and every other fragment, goes into a tree over all axes.
+
+    A lookup within the column range checks the flat tree first, and only falls back
+    to the full tree if the position isn't in a full height fragment.
+    """
+    def __init__(self, fragments=[], column_axis=1, column_min=0, column_max=256):
+        """Create the engine. Zone fragments must not overlap to load."""
+        self._boxes = ZoneEngineBase.fragment_boxes(fragments)
+        self.column_axis = column_axis
+        self.column_min = column_min
+        self.column_max = column_max
+        num_axes = len(self._boxes[0][0]) if self._boxes else 0
+        self._flat_axes = [axis for axis in range(num_axes) if axis != column_axis]
+
+        flat_fragments = []
+        height_fragments = []
+        for box_min, box_max, fragment in self._boxes:
+            if num_axes <= column_axis or box_min[column_axis] > column_min or box_max[column_axis] < column_max:
+                height_fragments.append(fragment)
+                continue
+
+            # The parts above and below the column range still need the height axis
+            lower, rest = fragment.split_axis(self._column_pos(column_min, num_axes), column_axis)
+            column, upper = rest.split_axis(self._column_pos(column_max, num_axes), column_axis)
+            for piece in (lower, upper):
+                if piece:
+                    height_fragments.append(piece)
+
+            flat = ZoneFragment(fragment)
+            flat._pos = Pos([fragment.min_corner[axis] for axis in self._flat_axes])
+            flat._size = Pos([fragment.size()[axis] for axis in self._flat_axes])
+            flat_fragments.append(flat)
+
+        self.column_tree = ZoneTreeBase.CreateZoneTree(flat_fragments)
+        self.height_tree = ZoneTreeBase.CreateZoneTree(height_fragments)
+
+    def _column_pos(self, value, num_axes):
+        """A position for split_axis() along the column axis."""
+        pos = [0] * num_axes
+        pos[self.column_axis] = value
+        return pos
+
+    def _flat_pos(self, pos):
+        """A position with the column axis left out."""
+        return [pos[axis] for axis in self._flat_axes]
+
+    def get_zone(self, pos):
+        """Get the zone a position is in, or None."""
+        if self.column_min <= pos[self.column_axis] < self.column_max:
+            if len(self._flat_axes) == 2:
+                result = self.column_tree.get_zone((pos[self._flat_axes[0]], pos[self._flat_axes[1]]))
+            else:
+                result = self.column_tree.get_zone(self._flat_pos(pos))
+            if result is not None:
+                return result
+        return self.height_tree.get_zone(pos)
+
+    def get_fragments_in_box(self, box):
+        """Get a list of the zone fragments overlapping a ZoneBase."""
+        query_min = tuple(box.min_corner.list)
+        query_max = tuple(box.true_max_corner.list)
+        return [
+            fragment for box_min, box_max, fragment in self._boxes
+            if ZoneEngineBase.boxes_overlap(box_min, box_max, query_min, query_max)
+        ]
+
+    def stats(self):
+        """Returns a dict of statistics about the engine."""
+        return {
+            "engine": "column",
+            "fragments": len(self._boxes),
+            "nodes": self.column_tree.node_count() + self.height_tree.node_count(),
+            "max_depth": max(self.column_tree.max_depth(), self.height_tree.max_depth()),
+            "column_fragments": len(self.column_tree),
+            "height_fragments": len(self.height_tree),
+        }
+
+########################################################################################################################
+# Only needed for debug and statistics:
+
+    def nodes_visited(self, pos):
+        """Debug info only. The number of tree nodes get_zone(pos) looks at."""
+        result = 0
+        if self.column_min <= pos[self.column_axis] < self.column_max:
+            flat_pos = self._flat_pos(pos)
+            result += self.column_tree.nodes_visited(flat_pos)
+            if self.column_tree.get_zone(flat_pos) is not None:
+                return result
+        return result + self.height_tree.nodes_visited(pos)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+import hashlib
+import os
+from lib.zone_engine.zone_engine_base import ZoneEngineBase
+from lib.zone_tree.zone_tree_base import ZoneTreeBase
+
+class ZoneEngineCompiled(ZoneEngineBase):
+    """The zone tree, unrolled into generated Python source and compiled.
+
+    The generated module defines lookup(x, y, z), which is nothing but nested
+    integer comparisons, and returns the original_id of the zone or -1.
+    If cache_path is given, the source is saved there, and reused on later
+    startups with the same fragments instead of building the tree again.
+    """
+    def __init__(self, fragments=[], cache_path=None):
+        """Create the engine. Zone fragments must not overlap to load."""
+        self._boxes = ZoneEngineBase.fragment_boxes(fragments)
+        self._num_axes = len(self._boxes[0][0]) if self._boxes else 0
+        self.cache_path = cache_path
+        self.loaded_from_cache = False
+
+        self._zones = ZoneEngineBase.zones_by_id(fragments)
+
+        fragments_hash = self.fragments_hash()
+        source = None
+        if cache_path is not None and os.path.exists(cache_path):
+            with open(cache_path, "r") as fp:
+                source = fp.read()
+            if not source.startswith(self._header(fragments_hash)):
+                source = None
+            else:
+                self.loaded_from_cache = True
+
+        if source is None:
+            source = self.generate_source(ZoneTreeBase.CreateZoneTree(fragments), fragments_hash)
+            if cache_path is not None:
+                with open(cache_path, "w") as fp:
+                    fp.write(source)
+
+        self.source = source
+        namespace = {}
+        exec(compile(source, cache_path or "<zone lookup>", "exec"), namespace)
+        self._lookup = namespace["lookup"]
+
+    def axis_names(self):
+        """The argument names of the generated lookup function."""
+        if self._num_axes <= 3:
+            return ["x", "y", "z"][:self._num_axes]
+        return ["a{}".format(axis) for axis in range(self._num_axes)]
+
+    def fragments_hash(self):
+        """A hash of every fragment and its zone, to tell if cached source still applies."""
+        sha = hashlib.sha1()
+        for box_min, box_max, fragment in self._boxes:
+            sha.update(repr((box_min, box_max, fragment.parent.original_id)).encode("utf-8"))
+        return sha.hexdigest()
+
+    @staticmethod
+    def _header(fragments_hash):
+        return "# Generated by ZoneEngineCompiled; fragments hash {}\n".format(fragments_hash)
+
+    def generate_source(self, tree, fragments_hash):
+        """Returns the source of a module with the tree unrolled into lookup()."""
+        axis_names = self.axis_names()
+        lines = [
+            self._header(fragments_hash).rstrip("\n"),
+            "",
+            "def lookup({}):".format(", ".join(axis_names)),
+        ]
+        tree.write_lookup_source(lines, "    ", axis_names)
+        lines.append("    return -1")
+        lines.append("")
+        return "\n".join(lines)
+
+    def get_zone(self, pos):
+        """Get the zone a position is in, or None."""
+        if self._num_axes == 3:
+            return self._zones[self._lookup(pos[0], pos[1], pos[2])]
+        return self._zones[self._lookup(*[pos[axis] for axis in range(self._num_axes)])]
+
+    def get_zones(self, positions):
+        """Get the zone of each position in a list, as a list."""
+        if self._num_axes != 3:
+            return ZoneEngineBase.get_zones(self, positions)
+        zones = self._zones
+        lookup = self._lookup
+        return [zones[lookup(pos[0], pos[1], pos[2])] for pos in positions]
+
+    def get_fragments_in_box(self, box):
+        """Get a list of the zone fragments overlapping a ZoneBase."""
+        query_min = tuple(box.min_corner.list)
+        query_max = tuple(box.true_max_corner.list)
+        return [
+            fragment for box_min, box_max, fragment in self._boxes
+            if ZoneEngineBase.boxes_overlap(box_min, box_max, query_min, query_max)
+        ]
+
+    def stats(self):
+        """Returns a dict of statistics about the engine."""
+        return {
+            "engine": "compiled",
+            "fragments": len(self._boxes),
+            "nodes": 1,
+            "max_depth": 1,
+            "source_lines": self.source.count("\n"),
+            "loaded_from_cache": self.loaded_from_cache,
+        }
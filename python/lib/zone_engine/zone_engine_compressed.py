@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+
+from array import array
+from bisect import bisect_left, bisect_right
+from lib.zone_engine.zone_engine_base import ZoneEngineBase
+
+class ZoneEngineCompressed(ZoneEngineBase):
+    """A coordinate-compressed grid.
+
+    Every distinct fragment boundary on an axis starts a new cell along that axis,
+    so each compressed cell is covered by exactly one zone or by none. A lookup is
+    one binary search per axis and one array read of the zone's original_id (-1 for none).
+
+    Up to max_dense_cells, cell ids are stored in one dense array. Past that, each row
+    of cells along run_axis is stored as runs of equal ids instead, which costs one
+    more binary search per lookup.
+    """
+    def __init__(self, fragments=[], max_dense_cells=4*1024*1024, run_axis=None):
+        """Create the engine. Zone fragments must not overlap to load."""
+        self._boxes = ZoneEngineBase.fragment_boxes(fragments)
+        self._zones = ZoneEngineBase.zones_by_id(fragments)
+        self._num_axes = len(self._boxes[0][0]) if self._boxes else 0
+
+        # Sorted distinct boundaries per axis; cell i on an axis covers [bounds[i], bounds[i + 1])
+        self._bounds = []
+        for axis in range(self._num_axes):
+            values = set()
+            for box_min, box_max, fragment in self._boxes:
+                values.add(box_min[axis])
+                values.add(box_max[axis])
+            self._bounds.append(array("q", sorted(values)))
+
+        self._shape = [max(0, len(bounds) - 1) for bounds in self._bounds]
+        self.num_cells = 1 if self._num_axes else 0
+        for length in self._shape:
+            self.num_cells *= length
+
+        if run_axis is None:
+            # Full height zones make long runs along y
+            run_axis = 1 if self._num_axes == 3 else self._num_axes - 1
+        self._run_axis = run_axis
+        # Strides for every axis but the run axis, in axis order
+        self._row_axes = [axis for axis in range(self._num_axes) if axis != run_axis]
+
+        if self.num_cells <= max_dense_cells:
+            self.mode = "dense"
+            self._build_dense()
+        else:
+            self.mode = "runs"
+            self._build_runs()
+
+    def _cell_range(self, box_min, box_max, axis):
+        """The range of cell indices a box covers along one axis."""
+        bounds = self._bounds[axis]
+        return range(bisect_left(bounds, box_min[axis]), bisect_left(bounds, box_max[axis]))
+
+    def _build_dense(self):
+        """Fill one id per cell, with the last axis contiguous."""
+        num_axes = self._num_axes
+        strides = [1] * num_axes
+        for axis in range(num_axes - 2, -1, -1):
+            strides[axis] = strides[axis + 1] * self._shape[axis + 1]
+        self._strides = strides
+
+        self._cells = array("i", [-1]) * self.num_cells
+        for box_min, box_max, fragment in self._boxes:
+            zone_id = fragment.parent.original_id
+            ranges = [self._cell_range(box_min, box_max, axis) for axis in range(num_axes)]
+            last = ranges[-1]
+            run = array("i", [zone_id]) * len(last)
+
+            # Walk every row along the last axis and fill it with one slice assignment
+            starts = [0]
+            for axis in range(num_axes - 1):
+                starts = [start + index * strides[axis] for start in starts for index in ranges[axis]]
+            for start in starts:
+                self._cells[start + last.start:start + last.stop] = run
+
+    def _build_runs(self):
+        """Store each row of cells along the run axis as (start cell, id) runs."""
+        run_axis = self._run_axis
+        row_axes = self._row_axes
+        row_strides = [1] * len(row_axes)
+        for i in range(len(row_axes) - 2, -1, -1):
+            row_strides[i] = row_strides[i + 1] * self._shape[row_axes[i + 1]]
+        self._row_strides = row_strides
+
+        num_rows = 1
+        for axis in row_axes:
+            num_rows *= self._shape[axis]
+
+        rows = {}
+        for box_min, box_max, fragment in self._boxes:
+            zone_id = fragment.parent.original_id
+            run = self._cell_range(box_min, box_max, run_axis)
+            row_keys = [0]
+            for i, axis in enumerate(row_axes):
+                row_keys = [key + index * row_strides[i] for key in row_keys for index in self._cell_range(box_min, box_max, axis)]
+            for key in row_keys:
+                rows.setdefault(key, []).append((run.start, run.stop, zone_id))
+
+        # Row r's runs are run_starts/run_ids[row_offsets[r]:row_offsets[r + 1]]
+        self._row_offsets = array("q", [0]) * (num_rows + 1)
+        self._run_starts = array("i")
+        self._run_ids = array("i")
+        for key in range(num_rows):
+            self._row_offsets[key] = len(self._run_starts)
+            end = 0
+            for start, stop, zone_id in sorted(rows.get(key, ())):
+                if start != end:
+                    self._run_starts.append(end)
+                    self._run_ids.append(-1)
+                self._run_starts.append(start)
+                self._run_ids.append(zone_id)
+                end = stop
+            self._run_starts.append(end)
+            self._run_ids.append(-1)
+        self._row_offsets[num_rows] = len(self._run_starts)
+
+    def get_zone_id(self, pos):
+        """Get the original_id of the zone a position is in, or -1."""
+        if self.num_cells == 0:
+            return -1
+        bounds = self._bounds
+        if self.mode == "dense":
+            index = 0
+            strides = self._strides
+            for axis in range(self._num_axes):
+                axis_bounds = bounds[axis]
+                cell = bisect_right(axis_bounds, pos[axis]) - 1
+                if cell < 0 or cell >= len(axis_bounds) - 1:
+                    return -1
+                index += cell * strides[axis]
+            return self._cells[index]
+
+        row = 0
+        row_strides = self._row_strides
+        for i, axis in enumerate(self._row_axes):
+            axis_bounds = bounds[axis]
+            cell = bisect_right(axis_bounds, pos[axis]) - 1
+            if cell < 0 or cell >= len(axis_bounds) - 1:
+                return -1
+            row += cell * row_strides[i]
+
+        axis_bounds = bounds[self._run_axis]
+        cell = bisect_right(axis_bounds, pos[self._run_axis]) - 1
+        if cell < 0 or cell >= len(axis_bounds) - 1:
+            return -1
+        first = self._row_offsets[row]
+        last = self._row_offsets[row + 1]
+        return self._run_ids[bisect_right(self._run_starts, cell, first, last) - 1]
+
+    def get_zone(self, pos):
+        """Get the zone a position is in, or None."""
+        return self._zones[self.get_zone_id(pos)]
+
+    def get_zone_ids(self, positions):
+        """Get the original_id of each position's zone (-1 for none), as an array."""
+        if self.mode != "dense" or self._num_axes != 3:
+            return array("i", [self.get_zone_id(pos) for pos in positions])
+
+        # Unrolled for the common 3D case
+        bx, by, bz = self._bounds
+        nx, ny, nz = len(bx) - 1, len(by) - 1, len(bz) - 1
+        sx, sy, sz = self._strides
+        cells = self._cells
+        result = array("i", [-1]) * len(positions)
+        for i, pos in enumerate(positions):
+            cx = bisect_right(bx, pos[0]) - 1
+            if cx < 0 or cx >= nx:
+                continue
+            cy = bisect_right(by, pos[1]) - 1
+            if cy < 0 or cy >= ny:
+                continue
+            cz = bisect_right(bz, pos[2]) - 1
+            if cz < 0 or cz >= nz:
+                continue
+            result[i] = cells[cx*sx + cy*sy + cz*sz]
+        return result
+
+    def get_zones(self, positions):
+        """Get the zone of each position in a list, as a list."""
+        zones = self._zones
+        return [zones[zone_id] for zone_id in self.get_zone_ids(positions)]
+
+    def get_fragments_in_box(self, box):
+        """Get a list of the zone fragments overlapping a ZoneBase."""
+        query_min = tuple(box.min_corner.list)
+        query_max = tuple(box.true_max_corner.list)
+        return [
+            fragment for box_min, box_max, fragment in self._boxes
+            if ZoneEngineBase.boxes_overlap(box_min, box_max, query_min, query_max)
+        ]
+
+    def memory_bytes(self):
+        """Bytes used by the cell arrays and boundaries."""
+        result = 0
+        for bounds in self._bounds:
+            result += bounds.itemsize * len(bounds)
+        if self.mode == "dense":
+            result += self._cells.itemsize * len(self._cells)
+        else:
+            for values in (self._row_offsets, self._run_starts, self._run_ids):
+                result += values.itemsize * len(values)
+        return result
+
+    def stats(self):
+        """Returns a dict of statistics about the engine."""
+        return {
+            "engine": "compressed",
+            "fragments": len(self._boxes),
+            "nodes": self.num_cells,
+            "max_depth": 1,
+            "mode": self.mode,
+            "shape": list(self._shape),
+            "memory_bytes": self.memory_bytes(),
+        }
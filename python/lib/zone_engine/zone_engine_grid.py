@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+from itertools import product
+from lib.zone_engine.zone_engine_base import ZoneEngineBase
+
+class ZoneEngineGrid(ZoneEngineBase):
+    """A uniform grid spatial hash.
+
+    The world is cut into cells of cell_size blocks per axis, and each non-empty
+    cell maps to the fragments that overlap it. Lookups check only their own cell.
+    """
+    def __init__(self, fragments=[], cell_size=None):
+        """Create the engine. Zone fragments must not overlap to load.
+
+        cell_size may be a number for all axes, or a list with one size per axis.
+        The default is 32 blocks, or [32, 64, 32] in 3D.
+        """
+        self._boxes = ZoneEngineBase.fragment_boxes(fragments)
+        self._cells = {}
+
+        if len(self._boxes) == 0:
+            self._cell_size = ()
+            return
+
+        num_axes = len(self._boxes[0][0])
+        if cell_size is None:
+            cell_size = [32, 64, 32] if num_axes == 3 else 32
+        if isinstance(cell_size, int):
+            cell_size = [cell_size] * num_axes
+        self._cell_size = tuple(cell_size)
+
+        for entry in self._boxes:
+            for key in self._cell_keys(entry[0], entry[1]):
+                cell = self._cells.get(key)
+                if cell is None:
+                    self._cells[key] = [entry]
+                else:
+                    cell.append(entry)
+
+    def _cell_keys(self, box_min, box_max):
+        """Iterate over the keys of every cell a box (exclusive max) touches."""
+        cell_size = self._cell_size
+        ranges = [
+            range(box_min[axis] // cell_size[axis], (box_max[axis] - 1) // cell_size[axis] + 1)
+            for axis in range(len(cell_size))
+        ]
+        return product(*ranges)
+
+    def get_zone(self, pos):
+        """Get the zone a position is in, or None."""
+        cell_size = self._cell_size
+        cell = self._cells.get(tuple(pos[axis] // cell_size[axis] for axis in range(len(cell_size))))
+        if cell is None:
+            return None
+
+        box_contains = ZoneEngineBase.box_contains
+        for box_min, box_max, fragment in cell:
+            if box_contains(box_min, box_max, pos):
+                return fragment.parent
+        return None
+
+    def get_fragments_in_box(self, box):
+        """Get a list of the zone fragments overlapping a ZoneBase."""
+        query_min = tuple(box.min_corner.list)
+        query_max = tuple(box.true_max_corner.list)
+        boxes_overlap = ZoneEngineBase.boxes_overlap
+
+        if len(self._boxes) == 0:
+            return []
+
+        num_cells = 1
+        for axis in range(len(self._cell_size)):
+            num_cells *= (query_max[axis] - 1) // self._cell_size[axis] - query_min[axis] // self._cell_size[axis] + 1
+        if num_cells > len(self._boxes):
+            # Cheaper to check everything than to visit every cell
+            candidates = self._boxes
+        else:
+            candidates = {}
+            for key in self._cell_keys(query_min, query_max):
+                for entry in self._cells.get(key, ()):
+                    candidates[id(entry)] = entry
+            candidates = candidates.values()
+
+        return [
+            fragment for box_min, box_max, fragment in candidates
+            if boxes_overlap(box_min, box_max, query_min, query_max)
+        ]
+
+    def stats(self):
+        """Returns a dict of statistics about the engine."""
+        entries = 0
+        largest = 0
+        for cell in self._cells.values():
+            entries += len(cell)
+            largest = max(largest, len(cell))
+        return {
+            "engine": "grid",
+            "fragments": len(self._boxes),
+            "nodes": len(self._cells),
+            "max_depth": 1,
+            "cell_size": list(self._cell_size),
+            "cell_entries": entries,
+            "largest_cell": largest,
+        }
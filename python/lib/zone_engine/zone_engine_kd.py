@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+from lib.zone_engine.zone_engine_base import ZoneEngineBase
+
+class ZoneEngineKd(ZoneEngineBase):
+    """A k-d tree over fragment boxes.
+
+    Each node splits on the axis where fragment centers are most spread out, at the median.
+    Fragments entirely below the split go low, entirely above go high, and the rest
+    stay at the node and are checked on the way down. Nodes are lists of
+    [axis, split, straddling, low, high], and leaves are plain lists of fragment boxes.
+    """
+    def __init__(self, fragments=[], leaf_size=4):
+        """Create the engine. Zone fragments must not overlap to load."""
+        self._leaf_size = leaf_size
+        self._num_fragments = len(fragments)
+        self._num_nodes = 0
+        self._depth = 0
+        self._root = self._build(ZoneEngineBase.fragment_boxes(fragments), 1)
+
+    def _build(self, entries, depth):
+        """Build a subtree for a list of fragment boxes."""
+        self._num_nodes += 1
+        self._depth = max(self._depth, depth)
+        if len(entries) <= self._leaf_size:
+            return entries
+
+        num_axes = len(entries[0][0])
+        best_axis = 0
+        best_spread = -1
+        for axis in range(num_axes):
+            centers = [entry[0][axis] + entry[1][axis] for entry in entries]
+            spread = max(centers) - min(centers)
+            if spread > best_spread:
+                best_axis = axis
+                best_spread = spread
+        axis = best_axis
+
+        centers = sorted(entry[0][axis] + entry[1][axis] for entry in entries)
+        split = centers[len(centers) // 2] // 2
+
+        low = []
+        straddling = []
+        high = []
+        for entry in entries:
+            if entry[1][axis] <= split:
+                low.append(entry)
+            elif entry[0][axis] >= split:
+                high.append(entry)
+            else:
+                straddling.append(entry)
+
+        if max(len(low), len(straddling), len(high)) == len(entries):
+            # This split makes no progress; check them all here
+            return entries
+
+        return [axis, split, straddling, self._build(low, depth + 1), self._build(high, depth + 1)]
+
+    def get_zone(self, pos):
+        """Get the zone a position is in, or None."""
+        box_contains = ZoneEngineBase.box_contains
+        node = self._root
+        while True:
+            if len(node) == 0 or not isinstance(node[0], int):
+                # Leaf
+                for box_min, box_max, fragment in node:
+                    if box_contains(box_min, box_max, pos):
+                        return fragment.parent
+                return None
+
+            axis, split, straddling, low, high = node
+            for box_min, box_max, fragment in straddling:
+                if box_contains(box_min, box_max, pos):
+                    return fragment.parent
+            node = low if pos[axis] < split else high
+
+    def get_fragments_in_box(self, box):
+        """Get a list of the zone fragments overlapping a ZoneBase."""
+        query_min = tuple(box.min_corner.list)
+        query_max = tuple(box.true_max_corner.list)
+        boxes_overlap = ZoneEngineBase.boxes_overlap
+
+        result = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if len(node) == 0 or not isinstance(node[0], int):
+                candidates = node
+            else:
+                axis, split, candidates, low, high = node
+                if query_min[axis] < split:
+                    stack.append(low)
+                if query_max[axis] > split:
+                    stack.append(high)
+
+            for box_min, box_max, fragment in candidates:
+                if boxes_overlap(box_min, box_max, query_min, query_max):
+                    result.append(fragment)
+        return result
+
+    def stats(self):
+        """Returns a dict of statistics about the engine."""
+        return {
+            "engine": "kdtree",
+            "fragments": self._num_fragments,
+            "nodes": self._num_nodes,
+            "max_depth": self._depth,
+            "leaf_size": self._leaf_size,
+        }
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+import math
+from lib.zone_engine.zone_engine_base import ZoneEngineBase
+
+class ZoneEngineRTree(ZoneEngineBase):
+    """An R-tree bulk loaded with Sort-Tile-Recursive packing.
+
+    Every node is a tuple of (min_corner, max_corner, children, is_leaf), with max_corner exclusive.
+    Leaf children are fragment boxes as from ZoneEngineBase.fragment_boxes().
+    """
+    def __init__(self, fragments=[], node_capacity=8):
+        """Create the engine. Zone fragments must not overlap to load."""
+        self._node_capacity = node_capacity
+        self._num_fragments = len(fragments)
+        self._num_nodes = 0
+        self._depth = 0
+
+        entries = ZoneEngineBase.fragment_boxes(fragments)
+        if len(entries) == 0:
+            self._root = None
+            return
+
+        num_axes = len(entries[0][0])
+        is_leaf = True
+        while True:
+            nodes = []
+            for group in self._str_groups(entries, num_axes, 0):
+                nodes.append(self._make_node(group, is_leaf))
+            self._num_nodes += len(nodes)
+            self._depth += 1
+
+            if len(nodes) == 1:
+                self._root = nodes[0]
+                return
+            entries = nodes
+            is_leaf = False
+
+    def _str_groups(self, entries, num_axes, axis):
+        """Tile entries into groups of at most node_capacity, sorting by box center one axis at a time."""
+        capacity = self._node_capacity
+        entries = sorted(entries, key=lambda entry: entry[0][axis] + entry[1][axis])
+
+        if axis == num_axes - 1:
+            return [entries[start:start + capacity] for start in range(0, len(entries), capacity)]
+
+        num_groups = int(math.ceil(len(entries) / capacity))
+        num_slabs = int(math.ceil(num_groups ** (1.0 / (num_axes - axis))))
+        slab_size = capacity * int(math.ceil(num_groups / num_slabs))
+
+        result = []
+        for start in range(0, len(entries), slab_size):
+            result += self._str_groups(entries[start:start + slab_size], num_axes, axis + 1)
+        return result
+
+    @staticmethod
+    def _make_node(children, is_leaf):
+        """Create a node holding children, with a box that bounds all of them."""
+        num_axes = len(children[0][0])
+        node_min = tuple(min(child[0][axis] for child in children) for axis in range(num_axes))
+        node_max = tuple(max(child[1][axis] for child in children) for axis in range(num_axes))
+        return (node_min, node_max, children, is_leaf)
+
+    def get_zone(self, pos):
+        """Get the zone a position is in, or None."""
+        if self._root is None:
+            return None
+        box_contains = ZoneEngineBase.box_contains
+
+        if not box_contains(self._root[0], self._root[1], pos):
+            return None
+        stack = [self._root]
+        while stack:
+            node_min, node_max, children, is_leaf = stack.pop()
+            if is_leaf:
+                for box_min, box_max, fragment in children:
+                    if box_contains(box_min, box_max, pos):
+                        return fragment.parent
+            else:
+                for child in children:
+                    if box_contains(child[0], child[1], pos):
+                        stack.append(child)
+        return None
+
+    def get_fragments_in_box(self, box):
+        """Get a list of the zone fragments overlapping a ZoneBase."""
+        if self._root is None:
+            return []
+        query_min = tuple(box.min_corner.list)
+        query_max = tuple(box.true_max_corner.list)
+        boxes_overlap = ZoneEngineBase.boxes_overlap
+
+        result = []
+        stack = [self._root]
+        while stack:
+            node_min, node_max, children, is_leaf = stack.pop()
+            if not boxes_overlap(node_min, node_max, query_min, query_max):
+                continue
+            if is_leaf:
+                for box_min, box_max, fragment in children:
+                    if boxes_overlap(box_min, box_max, query_min, query_max):
+                        result.append(fragment)
+            else:
+                stack += children
+        return result
+
+    def stats(self):
+        """Returns a dict of statistics about the engine."""
+        return {
+            "engine": "rtree",
+            "fragments": self._num_fragments,
+            "nodes": self._num_nodes,
+            "max_depth": self._depth,
+            "node_capacity": self._node_capacity,
+        }
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+
+from lib.zone_engine.zone_engine_base import ZoneEngineBase
+
+class ZoneEngineScan(ZoneEngineBase):
+    """Checks every fragment in order. The reference the other engines are tested against."""
+    def __init__(self, fragments=[]):
+        """Create the engine. Zone fragments must not overlap to load."""
+        self._boxes = ZoneEngineBase.fragment_boxes(fragments)
+
+    def get_zone(self, pos):
+        """Get the zone a position is in, or None."""
+        box_contains = ZoneEngineBase.box_contains
+        for box_min, box_max, fragment in self._boxes:
+            if box_contains(box_min, box_max, pos):
+                return fragment.parent
+        return None
+
+    def get_fragments_in_box(self, box):
+        """Get a list of the zone fragments overlapping a ZoneBase."""
+        query_min = tuple(box.min_corner.list)
+        query_max = tuple(box.true_max_corner.list)
+        return [
+            fragment for box_min, box_max, fragment in self._boxes
+            if ZoneEngineBase.boxes_overlap(box_min, box_max, query_min, query_max)
+        ]
+
+    def stats(self):
+        """Returns a dict of statistics about the engine."""
+        return {
+            "engine": "scan",
+            "fragments": len(self._boxes),
+            "nodes": 1,
+            "max_depth": 1,
+        }
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+from lib.zone_engine.zone_engine_base import ZoneEngineBase
+from lib.zone_tree.zone_tree_base import ZoneTreeBase
+
+class ZoneEngineTree(ZoneEngineBase):
+    """The ternary zone tree (ZoneTreeParent and friends) as an engine."""
+    def __init__(self, fragments=[], lazy=False, optimize=False, bucket_size=4, quick=False):
+        """Create the engine. Zone fragments must not overlap to load.
+
+        If optimize is set, the tree is passed through optimize(bucket_size) once built,
+        which also builds it right away even if lazy is set.
+        If quick is set, the tree picks cheaper but worse splits.
+        """
+        self.tree = ZoneTreeBase.CreateZoneTree(fragments, lazy=lazy, quick=quick)
+        if optimize:
+            self.tree = self.tree.optimize(bucket_size)
+
+    def get_zone(self, pos):
+        """Get the zone a position is in, or None."""
+        return self.tree.get_zone(pos)
+
+    def get_zones(self, positions):
+        """Get the zone of each position in a list, as a list."""
+        get_zone = self.tree.get_zone
+        return [get_zone(pos) for pos in positions]
+
+    def get_flags(self, pos):
+        """Get the flags of the zone a position is in, or None if it isn't in one."""
+        return self.tree.get_flags(pos)
+
+    def get_fragments_in_box(self, box):
+        """Get a list of the zone fragments overlapping a ZoneBase."""
+        return self.tree.get_fragments_in_box(box)
+
+    def freeze(self):
+        """Finish any lazy work, so lookups never modify the engine."""
+        self.tree.freeze()
+
+    def stats(self):
+        """Returns a dict of statistics about the engine."""
+        return {
+            "engine": "tree",
+            "fragments": len(self.tree),
+            "nodes": self.tree.node_count(),
+            "max_depth": self.tree.max_depth(),
+            "average_depth": self.tree.average_depth(),
+        }
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+
+from math import gcd
+
+class ZoneLattice(object):
+    """Identically sized zones of one type laid out on a regular grid, such as player plots.
+
+    A position is resolved with integer division instead of a tree search:
+    which lattice cell it is in, whether it is past the zone inside that cell,
+    and which zone (if any) occupies the cell.
+
+    Lattices never overlap zones outside of them; FindLattices() leaves any
+    conflicting zones to the regular overlap removal and spatial index.
+    """
+    @staticmethod
+    def FindLattices(zones, min_count=64, min_fill=0.5):
+        """Returns (lattices, other_zones) for a list of Zones in priority order.
+
+        Groups of at least min_count zones with the same type and size become lattices
+        if their min corners fall on a constant stride per axis, at least min_fill of the
+        lattice cells are used, and the zones in the group don't overlap each other.
+        other_zones keeps the priority order of the zones that were not placed in a lattice.
+        """
+        groups = {}
+        for zone in zones:
+            key = (zone.type, tuple(zone.size()))
+            groups.setdefault(key, []).append(zone)
+
+        lattices = []
+        for (ztype, size), members in groups.items():
+            if len(members) < min_count or 0 in size:
+                continue
+            lattice = ZoneLattice._from_group(members, list(size), min_fill)
+            if lattice is None:
+                continue
+            lattices.append(lattice)
+
+        if len(lattices) == 0:
+            return ([], list(zones))
+
+        # Zones that overlap a lattice cell take that cell (and its zone) back out of the lattice
+        for lattice in lattices:
+            for zone in zones:
+                if lattice.owns(zone):
+                    continue
+                for member in lattice.get_zones_in_box(zone):
+                    lattice.remove(member)
+
+        # Lattices that shrank too much go back to the regular path entirely
+        result_lattices = []
+        lattice_zone_ids = set()
+        for lattice in lattices:
+            if lattice.zone_count < min_count:
+                continue
+            result_lattices.append(lattice)
+            for zone in lattice:
+                lattice_zone_ids.add(id(zone))
+
+        other_zones = [zone for zone in zones if id(zone) not in lattice_zone_ids]
+        return (result_lattices, other_zones)
+
+    @staticmethod
+    def _from_group(members, size, min_fill):
+        """Create a lattice from one group of same sized zones, or return None if they aren't regular."""
+        num_axes = len(size)
+        origin = []
+        stride = []
+        count = []
+        for axis in range(num_axes):
+            values = sorted(set(zone.min_corner[axis] for zone in members))
+            axis_stride = 0
+            for i in range(1, len(values)):
+                axis_stride = gcd(axis_stride, values[i] - values[i - 1])
+            if axis_stride != 0 and axis_stride < size[axis]:
+                # Neighbors would overlap
+                return None
+            origin.append(values[0])
+            stride.append(axis_stride)
+            count.append(1 if axis_stride == 0 else (values[-1] - values[0]) // axis_stride + 1)
+
+        num_cells = 1
+        for axis_count in count:
+            num_cells *= axis_count
+        if len(members) < min_fill * num_cells:
+            return None
+
+        lattice = ZoneLattice(origin, size, stride, count)
+        for zone in members:
+            index = lattice._cell_index(zone.min_corner)
+            if lattice._cells[index] is None:
+                lattice._cells[index] = zone
+                lattice.zone_count += 1
+        return lattice
+
+    def __init__(self, origin, size, stride, count):
+        self.origin = list(origin)
+        self.size = list(size)
+        self.stride = list(stride)
+        self.count = list(count)
+        self.zone_count = 0
+
+        # Row-major cell strides, last axis contiguous
+        self._cell_strides = [1] * len(count)
+        for axis in range(len(count) - 2, -1, -1):
+            self._cell_strides[axis] = self._cell_strides[axis + 1] * count[axis + 1]
+        num_cells = 1
+        for axis_count in count:
+            num_cells *= axis_count
+        self._cells = [None] * num_cells
+
+    def _cell_index(self, pos):
+        """Index of the cell a lattice zone's min corner is at."""
+        index = 0
+        for axis in range(len(self.origin)):
+            if self.stride[axis]:
+                index += (pos[axis] - self.origin[axis]) // self.stride[axis] * self._cell_strides[axis]
+        return index
+
+    def owns(self, zone):
+        """Check if a zone is in this lattice."""
+        return self.get_zone(zone.min_corner) is zone
+
+    def remove(self, zone):
+        """Take a zone back out of the lattice, leaving its cell empty."""
+        index = self._cell_index(zone.min_corner)
+        if self._cells[index] is zone:
+            self._cells[index] = None
+            self.zone_count -= 1
+
+    def get_zone(self, pos):
+        """Get the zone a position is in, or None."""
+        index = 0
+        origin = self.origin
+        stride = self.stride
+        size = self.size
+        count = self.count
+        cell_strides = self._cell_strides
+        for axis in range(len(origin)):
+            offset = pos[axis] - origin[axis]
+            if offset < 0:
+                return None
+            axis_stride = stride[axis]
+            if axis_stride:
+                cell = int(offset // axis_stride)
+                if cell >= count[axis]:
+                    return None
+                offset -= cell * axis_stride
+                index += cell * cell_strides[axis]
+            if offset >= size[axis]:
+                return None
+        return self._cells[index]
+
+    def get_zones_in_box(self, box):
+        """Get a list of the lattice's zones overlapping a ZoneBase."""
+        box_min = box.min_corner
+        box_max = box.true_max_corner
+        ranges = []
+        for axis in range(len(self.origin)):
+            axis_stride = self.stride[axis] or 1
+            # First cell whose zone ends after box_min, last cell whose zone starts before box_max
+            first = max(0, (box_min[axis] - self.origin[axis] - self.size[axis]) // axis_stride + 1)
+            last = min(self.count[axis] - 1, (box_max[axis] - 1 - self.origin[axis]) // axis_stride)
+            if last < first:
+                return []
+            ranges.append(range(first, last + 1))
+
+        indexes = [0]
+        for axis, cells in enumerate(ranges):
+            indexes = [index + cell * self._cell_strides[axis] for index in indexes for cell in cells]
+
+        result = []
+        for index in indexes:
+            zone = self._cells[index]
+            if zone is not None:
+                result.append(zone)
+        return result
+
+    def __iter__(self):
+        for zone in self._cells:
+            if zone is not None:
+                yield zone
+
+    def __len__(self):
+        return self.zone_count
+
+########################################################################################################################
+# Only needed for debug and statistics:
+
+    def __repr__(self):
+        return "ZoneLattice(origin={!r}, size={!r}, stride={!r}, count={!r}, zone_count={!r})".format(
+            self.origin, self.size, self.stride, self.count, self.zone_count
+        )
@@ -3,26 +3,194 @@
 # For interactive shell
 import readline
 import code
+import threading
 
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
+from itertools import permutations
+from lib.morton import morton_key, morton_order
 from lib.pos import Pos
 from lib.zone.zone import Zone
-from lib.zone_tree.zone_tree_base import ZoneTreeBase
+from lib.zone.zone_base import ZoneBase
+from lib.zone.zone_fragment import ZoneFragment
+from lib.zone_adjacency import ZoneAdjacency
+from lib.zone_broad_phase import box_arrays, overlapping_pairs
+from lib.zone_cache import ZoneCache
+from lib.zone_engine.zone_engine_base import ZoneEngineBase
+from lib.zone_lattice import ZoneLattice
+from lib.zone_occupancy import ZoneOccupancy
 
 class ZoneManager(object):
-    def __init__(self, zones=[], axis_order=[0, 2, 1]):
+    def __init__(self, zones=[], axis_order=[0, 2, 1], lazy=False, split_mode="fixed", engine="tree", engine_options={}, lattice_min_count=64, type_flags=None, adjacency=False, cache_size=0, morton_order=False, occupancy_cell_size=None, anytime=False):
         # axis_order is the order axes are processed, such as [0, 2, 1]
+        # lazy builds subtrees of the zone tree on first lookup instead of right away
+        # split_mode is "fixed" to always split overlaps along axis_order,
+        # or "best" to pick the axis order per zone that leaves the fewest fragments
+        # engine is the spatial index to use (see ZoneEngineBase.ENGINE_NAMES), with engine_options passed to it
+        # lattice_min_count is the fewest same sized zones on a regular grid to answer with a ZoneLattice; None to disable
+        # type_flags maps zone types to a bitmask of rule flags for get_flags(), with the None key used outside of zones
+        # adjacency builds the fragment adjacency graph used by get_zone_near()
+        # cache_size is the most get_zone() results to keep in a ZoneCache; 0 for no cache
+        # morton_order copies the fragments in Z-order of their min corners before indexing them
+        # occupancy_cell_size builds a ZoneOccupancy bitmap with cells this size (16 for chunks) to skip lookups in the wilderness
+        # anytime serves lookups from a quick tree right after overlap removal, while a background thread
+        # defragments and builds the requested engine, then swaps it in; see wait_refined()
+        if split_mode not in ("fixed", "best"):
+            raise ValueError("Unknown split_mode {!r}".format(split_mode))
+        # Kept for reload()
+        self._options = {
+            "axis_order": axis_order,
+            "lazy": lazy,
+            "split_mode": split_mode,
+            "engine": engine,
+            "engine_options": engine_options,
+            "lattice_min_count": lattice_min_count,
+            "type_flags": type_flags,
+            "adjacency": adjacency,
+            "cache_size": cache_size,
+            "morton_order": morton_order,
+            "occupancy_cell_size": occupancy_cell_size,
+            "anytime": anytime,
+        }
         self.axis_order = axis_order
+        self.split_mode = split_mode
         self.zones = []
         for i, zone in enumerate(zones):
-            self.zones.append(Zone(zone, axis_order=axis_order, original_id=i))
+            if isinstance(zone, Zone):
+                # Already built for us, such as by from_arrays()
+                self.zones.append(zone)
+            else:
+                self.zones.append(Zone(zone, axis_order=axis_order, original_id=i))
+
+        # Zones in a lattice skip overlap removal and the engine entirely
+        if lattice_min_count:
+            self.lattices, self.indexed_zones = ZoneLattice.FindLattices(self.zones, min_count=lattice_min_count)
+        else:
+            self.lattices, self.indexed_zones = [], list(self.zones)
+
         self._remove_overlaps()
-        self._defragment()
+        self._resolve_flags(type_flags)
+        self.cache = ZoneCache(cache_size) if cache_size else None
+        # Only set for anytime builds, so other managers hold no locks and can be pickled
+        self._refined = None
+        self._refine_error = None
 
         fragments = []
-        for zone in self.zones:
+        for zone in self.indexed_zones:
             fragments += zone.fragments
-        self.tree = ZoneTreeBase.CreateZoneTree(fragments)
+        if anytime:
+            # Fragments cover the same blocks before and after defragmenting, so the
+            # coarse index gives the same zones; only its lookups are slower
+            self.engine = ZoneEngineBase.CreateZoneEngine("tree", fragments, lazy=True, quick=True)
+            self.tree = None
+            self.adjacency = None
+        else:
+            self._refine()
+
+        # Also the same before and after defragmenting
+        self.occupancy = None
+        if occupancy_cell_size:
+            boxes = [(fragment.min_corner.list, fragment.true_max_corner.list) for fragment in fragments]
+            for lattice in self.lattices:
+                for zone in lattice:
+                    boxes.append((zone.min_corner.list, zone.true_max_corner.list))
+            self.occupancy = ZoneOccupancy(boxes, occupancy_cell_size)
+
+        if anytime:
+            self._refined = threading.Event()
+            self._refine_thread = threading.Thread(target=self._refine_in_background, name="ZoneManager refine", daemon=True)
+            self._refine_thread.start()
+
+    @classmethod
+    def from_arrays(cls, names, types, pos1, pos2, num_axes=3, axis_order=[0, 2, 1], **kwargs):
+        """Create a ZoneManager from parallel arrays, such as from ZoneConfigLoader.
+
+        pos1 and pos2 are flat sequences of ints, num_axes values per zone,
+        and are inclusive like the config files. Other options are passed to ZoneManager().
+        """
+        zones = cls.zones_from_arrays(names, types, pos1, pos2, num_axes, axis_order)
+        return cls(zones, axis_order=axis_order, **kwargs)
+
+    @classmethod
+    def auto_tune(cls, zones, queries=None, cache_path=None, **kwargs):
+        """Create a ZoneManager with axis_order and split_mode picked by ZoneTuner.
+
+        The parameters chosen are stored in the tuned_params attribute,
+        and in cache_path if given so the next startup can reuse them.
+        """
+        from lib.zone_tuner import ZoneTuner
+        return ZoneTuner(zones, queries=queries, cache_path=cache_path, **kwargs).tune()
+
+    @staticmethod
+    def zones_from_arrays(names, types, pos1, pos2, num_axes=3, axis_order=[0, 2, 1]):
+        """Create the Zones for from_arrays(), without parsing coordinate strings.
+
+        Corners are worked out from the flat arrays directly, so the only Pos objects made
+        are the ones each Zone and its fragment keep, not the intermediate ones a config dict
+        goes through. Zones still hold Pos objects, since the rest of the library uses them.
+        """
+        if not (len(names) == len(types) and len(pos1) == len(pos2) == len(names) * num_axes):
+            raise ValueError("Expected names, types, and {} coordinates per zone for pos1 and pos2".format(num_axes))
+
+        zones = []
+        for i in range(len(names)):
+            start = i * num_axes
+            a = pos1[start:start + num_axes]
+            b = pos2[start:start + num_axes]
+
+            pos = [min(a[axis], b[axis]) for axis in range(num_axes)]
+            size = [max(a[axis], b[axis]) + 1 - pos[axis] for axis in range(num_axes)]
+
+            zones.append(Zone(pos=pos, size=size, name=names[i], ztype=types[i], original_id=i, axis_order=axis_order))
+        return zones
+
+    def wait_refined(self, timeout=None):
+        """Wait for an anytime build to swap in its final index, returning True once it has.
+
+        Returns False if timeout seconds pass first. Raises the error the background build hit, if any.
+        Managers not built with anytime=True are always refined.
+        """
+        refined = self._refined
+        if refined is not None and not refined.wait(timeout):
+            return False
+        if self._refine_error is not None:
+            raise self._refine_error
+        return True
+
+    def freeze(self):
+        """Finish any lazy work, and make the manager read-only from here on.
+
+        A frozen manager is never modified by lookups (apart from its cache, if any),
+        so it can be shared between threads; see get_zones_parallel().
+        Setting attributes or calling reload() raises AttributeError afterwards.
+        """
+        self.wait_refined()
+        self.engine.freeze()
+        self.frozen = True
+
+    def __getstate__(self):
+        """Pickle the final index, without the background build's thread and event."""
+        self.wait_refined()
+        state = dict(self.__dict__)
+        state["_refined"] = None
+        state.pop("_refine_thread", None)
+        return state
+
+    def __setattr__(self, name, value):
+        if self.__dict__.get("frozen"):
+            raise AttributeError("ZoneManager is frozen; create a new one instead of changing {!r}".format(name))
+        object.__setattr__(self, name, value)
+
+    def reload(self, zones):
+        """Rebuild from a new list of zones with the same options, and drop any cached results."""
+        cache = self.cache
+        self.wait_refined()
+        self.__init__(zones, **self._options)
+        if cache is not None:
+            # Keep the same cache so its statistics carry on
+            cache.clear()
+            self.cache = cache
 
     def __len__(self):
         return len(self.zones)
@@ -30,6 +198,144 @@ class ZoneManager(object):
     def __getitem__(self, key):
         return self.zones[key]
 
+    def get_zone(self, pos):
+        """Get the zone a position is in, or None."""
+        cache = self.cache
+        if cache is not None:
+            key = ZoneCache.pack(pos)
+            if key is not None:
+                result = cache.get(key)
+                if result is ZoneCache.MISS:
+                    result = self._get_zone(pos)
+                    cache.put(key, result)
+                return result
+        return self._get_zone(pos)
+
+    def _get_zone(self, pos):
+        """Get the zone a position is in, or None, without the cache."""
+        occupancy = self.occupancy
+        if occupancy is not None and not occupancy.maybe_occupied(pos):
+            return None
+        for lattice in self.lattices:
+            result = lattice.get_zone(pos)
+            if result is not None:
+                return result
+        return self.engine.get_zone(pos)
+
+    def get_zone_near(self, pos, node=-1):
+        """Returns (zone or None, node) for a position, walking from the node of the previous lookup.
+
+        Meant for tracking a moving entity: keep the node returned and pass it to the next call.
+        Needs the ZoneManager to be created with adjacency=True. Anytime builds
+        wait for the background build, which is when the adjacency graph is made.
+        """
+        for lattice in self.lattices:
+            result = lattice.get_zone(pos)
+            if result is not None:
+                return (result, node)
+        if self.adjacency is None:
+            self.wait_refined()
+            if self.adjacency is None:
+                raise ValueError("Create the ZoneManager with adjacency=True to use get_zone_near()")
+        return self.adjacency.get_zone(pos, node)
+
+    def get_zones(self, positions, sort=False):
+        """Get the zone of each position in a list, as a list.
+
+        If sort is set, positions are looked up in Morton order, so nearby positions
+        are looked up one after another; results are still in the order given.
+        """
+        if sort:
+            order = morton_order(positions)
+            zones = self.get_zones([positions[i] for i in order])
+            result = [None] * len(positions)
+            for i, zone in zip(order, zones):
+                result[i] = zone
+            return result
+
+        if len(self.lattices) == 0 and self.cache is None:
+            if self.occupancy is None:
+                return self.engine.get_zones(positions)
+
+            # Only look up the positions that might be in a zone
+            maybe_occupied = self.occupancy.maybe_occupied
+            indexes = [i for i, pos in enumerate(positions) if maybe_occupied(pos)]
+            result = [None] * len(positions)
+            for i, zone in zip(indexes, self.engine.get_zones([positions[i] for i in indexes])):
+                result[i] = zone
+            return result
+        return [self.get_zone(pos) for pos in positions]
+
+    def get_flags(self, pos):
+        """Get the rule flags of the zone type a position is in, as one int."""
+        occupancy = self.occupancy
+        if occupancy is not None and not occupancy.maybe_occupied(pos):
+            return self.none_flags
+        for lattice in self.lattices:
+            zone = lattice.get_zone(pos)
+            if zone is not None:
+                return zone.flags
+        result = self.engine.get_flags(pos)
+        if result is None:
+            return self.none_flags
+        return result
+
+    def get_flags_array(self, positions):
+        """Get the rule flags of each position in a list, as an array of ints."""
+        if len(self.lattices) != 0:
+            return array("q", [self.get_flags(pos) for pos in positions])
+
+        get_flags = self.engine.get_flags
+        none_flags = self.none_flags
+        result = array("q", [none_flags]) * len(positions)
+        occupancy = self.occupancy
+        for i, pos in enumerate(positions):
+            if occupancy is not None and not occupancy.maybe_occupied(pos):
+                continue
+            flags = get_flags(pos)
+            if flags is not None:
+                result[i] = flags
+        return result
+
+    def get_zones_parallel(self, positions, threads=4, executor=None):
+        """Get the zone of each position in a list, as a list, split over a thread pool.
+
+        The manager must be frozen first. Pass a ThreadPoolExecutor to reuse its threads,
+        or one with the given number of threads is created for this call. The cache isn't used.
+        Threads only run lookups at the same time on interpreters without a GIL.
+        """
+        if not self.__dict__.get("frozen"):
+            raise ValueError("Call freeze() before get_zones_parallel()")
+        if len(positions) == 0:
+            return []
+
+        if executor is None:
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                return self.get_zones_parallel(positions, threads, executor)
+
+        chunk_size = -(-len(positions) // threads)
+        chunks = [positions[start:start + chunk_size] for start in range(0, len(positions), chunk_size)]
+        result = []
+        for chunk_result in executor.map(self._get_zones_uncached, chunks):
+            result += chunk_result
+        return result
+
+    def _get_zones_uncached(self, positions):
+        """Get the zone of each position in a list, as a list, without the cache."""
+        if len(self.lattices) == 0:
+            return self.engine.get_zones(positions)
+        return [self._get_zone(pos) for pos in positions]
+
+    def get_zones_in_box(self, pos1, pos2):
+        """Get a list of the zones overlapping a box, in priority order. pos2 is inclusive."""
+        box = ZoneBase({"pos1": pos1, "pos2": pos2})
+        result = self.engine.get_zones_in_box(box)
+        if len(self.lattices) == 0:
+            return result
+        for lattice in self.lattices:
+            result += lattice.get_zones_in_box(box)
+        return sorted(result, key=lambda zone: zone.original_id)
+
     def min_corner(self):
         result = self.zones[0].min_corner()
         for zone in self.zones[1:]:
@@ -49,22 +355,124 @@ class ZoneManager(object):
                 if overlap:
                     yield overlap
 
+    def _overlap_candidates(self):
+        """Returns, for each indexed zone, the indexes of earlier indexed zones that overlap it."""
+        if len(self.indexed_zones) == 0:
+            return []
+        min_corners, max_corners = box_arrays(self.indexed_zones)
+        return overlapping_pairs(min_corners, max_corners, len(self.indexed_zones[0]._pos))
+
     def _remove_overlaps(self):
-        for i, outer in enumerate(self.zones):
-            for inner in self.zones[i+1:]:
+        if self.split_mode == "best":
+            self._remove_overlaps_best()
+            return
+
+        # Each zone is split by the earlier zones overlapping it, in order;
+        # the broad phase finds those without checking every pair
+        for j, earlier in enumerate(self._overlap_candidates()):
+            inner = self.indexed_zones[j]
+            for i in earlier:
+                outer = self.indexed_zones[i]
                 overlap = outer.overlaping_zone(inner)
                 if overlap is not None:
                     inner.split_by_overlap(overlap)
                     if len(inner.fragments) == 0:
                         print("WARNING: TOTAL ECLIPSE of {} by {}!".format(inner, outer))
 
+    def _remove_overlaps_best(self):
+        """Remove overlaps one zone at a time, using the axis order that leaves the fewest fragments.
+
+        Zones are defragmented as part of this.
+        """
+        # Try the requested order first so it is kept on ties
+        axis_orders = [list(self.axis_order)]
+        for axis_order in permutations(range(len(self.axis_order))):
+            if list(axis_order) != axis_orders[0]:
+                axis_orders.append(list(axis_order))
+
+        for i, earlier in enumerate(self._overlap_candidates()):
+            inner = self.indexed_zones[i]
+            overlaps = []
+            last_outer = None
+            for outer in [self.indexed_zones[j] for j in earlier]:
+                overlap = outer.overlaping_zone(inner)
+                if overlap is not None:
+                    overlaps.append(overlap)
+                    last_outer = outer
+
+            if len(overlaps) == 0:
+                continue
+
+            inner.best_split_by_overlaps(overlaps, axis_orders)
+            if len(inner.fragments) == 0:
+                print("WARNING: TOTAL ECLIPSE of {} by {}!".format(inner, last_outer))
+
+    def _resolve_flags(self, type_flags):
+        """Copy each zone type's flags onto its zone and fragments, so lookups don't need the type."""
+        if type_flags is None:
+            type_flags = {}
+        self.type_flags = dict(type_flags)
+        self.none_flags = self.type_flags.get(None, 0)
+        for zone in self.zones:
+            zone.flags = self.type_flags.get(zone.type, 0)
+            for fragment in zone.fragments:
+                fragment.flags = zone.flags
+
+    def _morton_fragments(self, fragments):
+        """Returns copies of the fragments in Morton order of their min corners, and gives them to their zones.
+
+        The copies are created in that order, so fragments near each other in space
+        are also allocated near each other, and the index is built from them in that order.
+        """
+        result = [ZoneFragment(fragment) for fragment in sorted(fragments, key=lambda fragment: morton_key(fragment.min_corner.list))]
+        for zone in self.indexed_zones:
+            zone.fragments = []
+        for fragment in result:
+            fragment.parent.fragments.append(fragment)
+        return result
+
+    def _refine(self):
+        """Defragment, then build the engine and adjacency graph with the options given, and start using them."""
+        options = self._options
+        self._defragment()
+
+        fragments = []
+        for zone in self.indexed_zones:
+            fragments += zone.fragments
+        if options["morton_order"]:
+            fragments = self._morton_fragments(fragments)
+        engine_options = options["engine_options"]
+        if options["engine"] == "tree":
+            engine_options = dict(engine_options, lazy=options["lazy"])
+        engine = ZoneEngineBase.CreateZoneEngine(options["engine"], fragments, **engine_options)
+
+        self.adjacency = ZoneAdjacency(fragments, self.axis_order) if options["adjacency"] else None
+        # The zone tree, if that is the engine in use
+        self.tree = getattr(engine, "tree", None)
+        # Lookups read self.engine once each, so they use either the old engine or the new one
+        self.engine = engine
+        if self._refined is not None:
+            self._refined.set()
+
+    def _refine_in_background(self):
+        """Run _refine(), keeping any error for wait_refined() to raise."""
+        try:
+            self._refine()
+        except Exception as e:
+            self._refine_error = e
+            self._refined.set()
+
     def _defragment(self):
         """Merge zone fragments to speed up searches later.
 
         Must remove overlaps before running, or this is pointless!
         """
+        if self.split_mode == "best":
+            # Already defragmented while removing overlaps
+            return
+
         # First zone is never fragmented
-        for zone in self.zones[1:]:
+        for zone in self.indexed_zones[1:]:
             zone.defragment()
 
     ########################################################################################################################
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+class ZoneOccupancy(object):
+    """A coarse bitmap of which cells any zone touches, to answer "no zone here" with one bit test.
+
+    Cells are cell_size blocks along each of the given axes, and unlimited along the
+    others; in 3D the default is 16x16 block chunk columns over x and z. A clear bit means
+    no zone is anywhere in that cell; a set bit only means one might be.
+    """
+    def __init__(self, boxes=[], cell_size=16, axes=None):
+        """Create the bitmap from (min_corner, max_corner) pairs, with max_corner exclusive."""
+        boxes = list(boxes)
+        num_axes = len(boxes[0][0]) if boxes else 0
+        if axes is None:
+            axes = [0, 2] if num_axes == 3 else list(range(num_axes))
+        self.axes = list(axes)
+        self.cell_size = cell_size
+
+        if not boxes:
+            self.origin = []
+            self.shape = []
+            self._bits = bytearray()
+            return
+
+        # Cell index ranges along each mapped axis
+        self.origin = [min(box_min[axis] for box_min, box_max in boxes) // cell_size for axis in self.axes]
+        last = [(max(box_max[axis] for box_min, box_max in boxes) - 1) // cell_size for axis in self.axes]
+        self.shape = [last[i] - self.origin[i] + 1 for i in range(len(self.axes))]
+        num_cells = 1
+        for length in self.shape:
+            num_cells *= length
+
+        # Row-major, last mapped axis contiguous
+        self._strides = [1] * len(self.axes)
+        for i in range(len(self.axes) - 2, -1, -1):
+            self._strides[i] = self._strides[i + 1] * self.shape[i + 1]
+
+        self._bits = bytearray((num_cells + 7) // 8)
+        for box_min, box_max in boxes:
+            indexes = [0]
+            for i, axis in enumerate(self.axes):
+                cells = range(box_min[axis] // cell_size - self.origin[i], (box_max[axis] - 1) // cell_size - self.origin[i] + 1)
+                indexes = [index + cell * self._strides[i] for index in indexes for cell in cells]
+            for index in indexes:
+                self._bits[index >> 3] |= 1 << (index & 7)
+
+    def maybe_occupied(self, pos):
+        """Check if a zone might be at a position; False means there definitely is none."""
+        if len(self.axes) == 2:
+            a, b = self.axes
+            cell_size = self.cell_size
+            ca = int(pos[a] // cell_size) - self.origin[0]
+            if ca < 0 or ca >= self.shape[0]:
+                return False
+            cb = int(pos[b] // cell_size) - self.origin[1]
+            if cb < 0 or cb >= self.shape[1]:
+                return False
+            index = ca * self._strides[0] + cb
+            return (self._bits[index >> 3] >> (index & 7)) & 1 == 1
+
+        if not self.shape:
+            return False
+        index = 0
+        for i, axis in enumerate(self.axes):
+            cell = int(pos[axis] // self.cell_size) - self.origin[i]
+            if cell < 0 or cell >= self.shape[i]:
+                return False
+            index += cell * self._strides[i]
+        return (self._bits[index >> 3] >> (index & 7)) & 1 == 1
+
+########################################################################################################################
+# Only needed for debug and statistics:
+
+    def fill_ratio(self):
+        """Debug info only. The fraction of cells that might hold a zone."""
+        num_cells = 1
+        for length in self.shape:
+            num_cells *= length
+        if not self.shape or num_cells == 0:
+            return 0.0
+        return sum(bin(byte).count("1") for byte in self._bits) / num_cells
+
+    def stats(self):
+        """Debug info only."""
+        return {
+            "cell_size": self.cell_size,
+            "shape": list(self.shape),
+            "bytes": len(self._bits),
+            "fill_ratio": self.fill_ratio(),
+        }
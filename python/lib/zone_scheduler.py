@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+
+import heapq
+from math import ceil, floor
+
+# Taken off before rounding, so float error can't schedule a lookup a tick late
+_EPSILON = 1e-9
+
+class ZoneScheduler(object):
+    """Decides which entities need a zone lookup on each tick, from how fast they can move.
+
+    After a lookup, an entity is in a box where its zone can't change: its node in the
+    manager's ZoneAdjacency (a fragment, or a gap between fragments), or its lattice zone.
+    Moving at most speed blocks per tick along each axis, it can't leave that box for a
+    number of ticks, so it is queued to be looked up again only then. Each tick() pops the
+    entities that are due from a priority queue, and looks them up with one get_zones() call.
+
+    Stationary entities (speed 0) are never looked up again, until set_speed() or recheck().
+    """
+    def __init__(self, manager, position_of):
+        """Schedule lookups against a ZoneManager created with adjacency=True.
+
+        position_of(entity) returns an entity's current position; it is only called when that entity is due.
+        """
+        if manager.adjacency is None:
+            manager.wait_refined()
+        if manager.adjacency is None:
+            raise ValueError("ZoneScheduler needs a ZoneManager created with adjacency=True")
+        self.manager = manager
+        self.adjacency = manager.adjacency
+        self.position_of = position_of
+        self.current_tick = 0
+        # entity: [zone, node, box_min, box_max, speed, sequence, near lattices]; sequence is that of its live queue entry,
+        # and near lattices is set when it is in an adjacency gap or outside of the graph, where lattice zones may be
+        self._entities = {}
+        # (due tick, sequence, entity); entries with an old sequence are skipped
+        self._queue = []
+        self._sequence = 0
+
+        # Lattice zones are gaps to the adjacency graph, so an entity can't be sure
+        # of its zone anywhere inside the span of a lattice without a lookup
+        self._lattice_spans = []
+        # original_ids of the zones answered by a lattice
+        self._lattice_zone_ids = set()
+        for lattice in manager.lattices:
+            for zone in lattice:
+                self._lattice_zone_ids.add(zone.original_id)
+            span_max = [
+                lattice.origin[axis] + lattice.stride[axis] * (lattice.count[axis] - 1) + lattice.size[axis]
+                for axis in range(len(lattice.origin))
+            ]
+            self._lattice_spans.append((tuple(lattice.origin), tuple(span_max)))
+
+        # Statistics
+        self.lookups = 0
+        self.last_tick_lookups = 0
+
+    def add(self, entity, speed=0):
+        """Start tracking an entity, looking it up right away. Returns its zone."""
+        self._entities[entity] = [None, -1, None, None, speed, -1, False]
+        self._resolve([entity])
+        return self._entities[entity][0]
+
+    def remove(self, entity):
+        """Stop tracking an entity; its queue entry is skipped when it comes up."""
+        del self._entities[entity]
+
+    def zone_of(self, entity):
+        """The zone of an entity as of the last tick, without a lookup."""
+        return self._entities[entity][0]
+
+    def set_speed(self, entity, speed):
+        """Change the most blocks per tick an entity may move along any axis from now on.
+
+        A faster entity may leave its box sooner than planned, so it is rescheduled from where it is now.
+        """
+        state = self._entities[entity]
+        old_speed = state[4]
+        state[4] = speed
+        if speed > old_speed:
+            self._schedule(entity, state, self.position_of(entity))
+
+    def recheck(self, entity):
+        """Look an entity up on the next tick, such as after a teleport."""
+        state = self._entities[entity]
+        self._push(entity, state, self.current_tick + 1)
+
+    def tick(self):
+        """Advance one tick, and look up every entity that is due as one batch.
+
+        Call it after entities have moved. Returns a list of (entity, old zone, new zone)
+        for the entities whose zone changed.
+        """
+        self.current_tick += 1
+        queue = self._queue
+        entities = self._entities
+        due = []
+        while queue and queue[0][0] <= self.current_tick:
+            due_tick, sequence, entity = heapq.heappop(queue)
+            state = entities.get(entity)
+            if state is not None and state[5] == sequence:
+                due.append(entity)
+        return self._resolve(due)
+
+    def _resolve(self, due):
+        """Look up a batch of entities, reschedule them, and return their zone changes."""
+        adjacency = self.adjacency
+        lattice_zone_ids = self._lattice_zone_ids
+        positions = [self.position_of(entity) for entity in due]
+        zones = self.manager.get_zones(positions)
+        changes = []
+        for entity, pos, zone in zip(due, positions, zones):
+            state = self._entities[entity]
+            if zone is not None and zone.original_id in lattice_zone_ids:
+                # Lattice zones never overlap other zones, so the whole zone is the box
+                state[2] = tuple(zone.min_corner.list)
+                state[3] = tuple(zone.true_max_corner.list)
+                state[6] = False
+            else:
+                # The zone is known; the adjacency node, found from the last one, is only needed for its box
+                node, checked = adjacency.walk(pos, state[1])
+                state[1] = node
+                if node < 0:
+                    state[2] = None
+                    state[3] = None
+                else:
+                    state[2], state[3] = adjacency.box(node)
+                state[6] = zone is None
+
+            if zone is not state[0]:
+                changes.append((entity, state[0], zone))
+                state[0] = zone
+            self._schedule(entity, state, pos)
+
+        self.lookups += len(due)
+        self.last_tick_lookups = len(due)
+        return changes
+
+    def _schedule(self, entity, state, pos):
+        """Queue an entity for the first tick it could be in another zone."""
+        speed = state[4]
+        if speed <= 0:
+            # Never, unless its speed changes; drop any queued entry
+            state[5] = -1
+            return
+
+        if state[2] is not None:
+            ticks = _ticks_to_leave(pos, state[2], state[3], speed)
+        elif self.adjacency.num_axes:
+            # Outside of the adjacency graph's bounds, until it enters them
+            ticks = _ticks_to_enter(pos, self.adjacency.bounds[0], self.adjacency.bounds[1], speed)
+        else:
+            ticks = None
+        if state[6]:
+            for span_min, span_max in self._lattice_spans:
+                lattice_ticks = _ticks_to_enter(pos, span_min, span_max, speed)
+                ticks = lattice_ticks if ticks is None else min(ticks, lattice_ticks)
+        if ticks is None:
+            state[5] = -1
+            return
+
+        self._push(entity, state, self.current_tick + max(1, ticks))
+
+    def _push(self, entity, state, due_tick):
+        """Queue an entity for a tick, replacing its previous entry."""
+        self._sequence += 1
+        state[5] = self._sequence
+        heapq.heappush(self._queue, (due_tick, self._sequence, entity))
+
+########################################################################################################################
+# Only needed for debug and statistics:
+
+    def __len__(self):
+        return len(self._entities)
+
+    def stats(self):
+        """Debug info only."""
+        return {
+            "entities": len(self._entities),
+            "ticks": self.current_tick,
+            "lookups": self.lookups,
+            "lookups_per_tick": self.lookups / self.current_tick if self.current_tick else 0.0,
+            "queue_entries": len(self._queue),
+        }
+
+def _ticks_to_leave(pos, box_min, box_max, speed):
+    """The fewest ticks moving speed blocks per tick takes to leave [box_min, box_max) along any axis."""
+    result = None
+    for axis in range(len(box_min)):
+        # Past the min face means moving more than pos - min; past the max face, at least max - pos
+        below = floor((pos[axis] - box_min[axis]) / speed - _EPSILON) + 1
+        above = ceil((box_max[axis] - pos[axis]) / speed - _EPSILON)
+        ticks = min(below, above)
+        if result is None or ticks < result:
+            result = ticks
+    return result
+
+def _ticks_to_enter(pos, box_min, box_max, speed):
+    """The fewest ticks moving speed blocks per tick takes to get inside [box_min, box_max) on every axis."""
+    result = 0
+    for axis in range(len(box_min)):
+        if pos[axis] < box_min[axis]:
+            ticks = ceil((box_min[axis] - pos[axis]) / speed - _EPSILON)
+        elif box_max[axis] <= pos[axis]:
+            ticks = floor((pos[axis] - box_max[axis]) / speed - _EPSILON) + 1
+        else:
+            continue
+        result = max(result, ticks)
+    return result
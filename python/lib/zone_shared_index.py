@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import struct
+from multiprocessing import resource_tracker, shared_memory
+from lib.zone.zone import Zone
+from lib.zone_cache import ZoneCache
+from lib.zone_tree.zone_tree_base import ZoneTreeBase
+
+class SharedZoneIndex(object):
+    """A ZoneManager's index, flattened into shared memory for other processes.
+
+    One process builds a ZoneManager and calls publish(). Other processes on the
+    same host call attach() with the same name, and look zones up straight from the
+    shared arrays, read-only, without copying them or building anything.
+
+    Two kinds of segment are used:
+    - "<name>", a small control block holding the current generation and owner pid.
+    - "<name>_g<generation>", the flattened index for one generation.
+
+    republish() (after a rebuild) writes a new generation and switches the control
+    block over to it; attached readers pick it up on refresh(). The previous generation
+    is only unlinked on the republish after that, so a reader that read the control
+    block just before the switch can still open it. Readers already mapped to an old
+    generation keep working until they refresh.
+    If the owner dies without cleaning up, cleanup_stale() unlinks what it left behind.
+    """
+    MAGIC = 0x5a4f4e45 # "ZONE"
+    VERSION = 1
+    CONTROL_SIZE = 4096
+    # Times to re-read the control block when its generation is gone before it can be opened
+    OPEN_RETRIES = 3
+
+    # Header of a data segment, in int64s
+    HEADER_FIELDS = (
+        "magic", "version", "generation", "owner_pid", "num_axes",
+        "node_count", "fragment_count", "lattice_count", "lattice_cell_count", "meta_bytes",
+    )
+    NODE_FIELDS = 8
+
+    @classmethod
+    def publish(cls, manager, name):
+        """Publish a ZoneManager as the next generation of a shared index. Returns the owner's SharedZoneIndex."""
+        control = _open_segment(name)
+        if control is None:
+            control = _create_segment(name, cls.CONTROL_SIZE)
+        segment = cls._write_generation(manager, name, control)
+        return cls(name, control, segment, owner=True)
+
+    def republish(self, manager):
+        """Owner only. Publish a rebuilt ZoneManager as the next generation, and switch to it."""
+        if not self.owner:
+            raise ValueError("Only the owner of a shared zone index can republish it")
+        segment = self._write_generation(manager, self.name, self._control)
+
+        self._release_views()
+        self._segment.close()
+        self._segment = segment
+        self._zones = {}
+        self._map(segment)
+        if self.cache is not None:
+            self.cache.clear()
+
+    @classmethod
+    def _write_generation(cls, manager, name, control):
+        """Write a new data segment, point the control block at it, and unlink the one before the previous one."""
+        old_generation = _read_control(control)[0]
+        generation = old_generation + 1
+
+        data = cls._flatten(manager, generation)
+        segment = _create_segment(cls.segment_name(name, generation), len(data))
+        segment.buf[:len(data)] = data
+
+        # The generation is written last, so readers never see a half written segment.
+        struct.pack_into("<q", control.buf, 8, os.getpid())
+        struct.pack_into("<q", control.buf, 0, generation)
+
+        # The previous generation stays for readers that already have its name
+        if old_generation > 1:
+            cls._unlink_generation(name, old_generation - 1)
+        return segment
+
+    @classmethod
+    def _unlink_generation(cls, name, generation):
+        """Unlink the data segment of a generation, if it is still there."""
+        segment = _open_segment(cls.segment_name(name, generation))
+        if segment is not None:
+            _unlink_segment(segment)
+
+    @classmethod
+    def _open_generation(cls, name, control):
+        """Returns (generation, segment) for the current generation, or (generation, None) if it is gone.
+
+        The control block is read again if it moved on while the segment was being opened.
+        """
+        generation = _read_control(control)[0]
+        for _ in range(cls.OPEN_RETRIES):
+            segment = _open_segment(cls.segment_name(name, generation))
+            if segment is not None:
+                return (generation, segment)
+            new_generation = _read_control(control)[0]
+            if new_generation == generation:
+                break
+            generation = new_generation
+        return (generation, None)
+
+    @classmethod
+    def attach(cls, name, cache_size=0):
+        """Attach read-only to the current generation of a shared index.
+
+        cache_size is the most get_zone_id() results to keep in a ZoneCache; 0 for no cache.
+        """
+        control = _open_segment(name)
+        if control is None:
+            raise FileNotFoundError("No shared zone index named {!r}".format(name))
+        generation, segment = cls._open_generation(name, control)
+        if segment is None:
+            control.close()
+            raise FileNotFoundError("Shared zone index {!r} generation {} is gone".format(name, generation))
+        return cls(name, control, segment, owner=False, cache_size=cache_size)
+
+    @classmethod
+    def cleanup_stale(cls, name):
+        """Unlink a shared index whose owner process is gone. Returns True if anything was removed."""
+        control = _open_segment(name)
+        if control is None:
+            return False
+        generation, owner_pid = _read_control(control)
+        if _pid_alive(owner_pid):
+            control.close()
+            return False
+
+        cls._unlink_generation(name, generation)
+        if generation > 1:
+            cls._unlink_generation(name, generation - 1)
+        _unlink_segment(control)
+        return True
+
+    @staticmethod
+    def segment_name(name, generation):
+        return "{}_g{}".format(name, generation)
+
+    @classmethod
+    def _flatten(cls, manager, generation):
+        """Returns the bytes of a data segment for a ZoneManager."""
+        tree = manager.tree
+        if tree is None:
+            fragments = []
+            for zone in manager.indexed_zones:
+                fragments += zone.fragments
+            tree = ZoneTreeBase.CreateZoneTree(fragments)
+
+        nodes = []
+        fragments = []
+        tree.flatten(nodes, fragments)
+        num_axes = len(fragments[0].min_corner) if fragments else len(manager.lattices[0].origin) if manager.lattices else 0
+
+        values = []
+        for node in nodes:
+            values += node
+        for fragment in fragments:
+            values += fragment.min_corner.list
+            values += fragment.true_max_corner.list
+            values.append(fragment.parent.original_id)
+
+        lattice_cell_count = 0
+        for lattice in manager.lattices:
+            values += lattice.origin + lattice.size + lattice.stride + lattice.count
+            values.append(lattice_cell_count)
+            lattice_cell_count += len(lattice._cells)
+        for lattice in manager.lattices:
+            values += [-1 if zone is None else zone.original_id for zone in lattice._cells]
+
+        meta = json.dumps([
+            [zone.name, zone.type, zone.pos1.list, zone.pos2.list] for zone in manager.zones
+        ]).encode("utf-8")
+
+        header = [
+            cls.MAGIC, cls.VERSION, generation, os.getpid(), num_axes,
+            len(nodes), len(fragments), len(manager.lattices), lattice_cell_count, len(meta),
+        ]
+        return struct.pack("<{}q".format(len(header) + len(values)), *(header + values)) + meta
+
+    def __init__(self, name, control, segment, owner, cache_size=0):
+        """Use publish() or attach() rather than creating this directly."""
+        self.name = name
+        self.owner = owner
+        self.cache = ZoneCache(cache_size) if cache_size else None
+        self._control = control
+        self._segment = segment
+        self._zones = {}
+        self._map(segment)
+
+    def _map(self, segment):
+        """Set up read-only views of a data segment."""
+        header_size = len(self.HEADER_FIELDS)
+        view = segment.buf.toreadonly()
+        # The metadata at the end leaves a partial int64, and the segment may be padded
+        int_view = view[:len(view) // 8 * 8]
+        ints = int_view.cast("q")
+        # Every view of the segment has to be released before it can be closed
+        self._views = [view, int_view, ints]
+        header = dict(zip(self.HEADER_FIELDS, ints[:header_size]))
+        if header["magic"] != self.MAGIC or header["version"] != self.VERSION:
+            raise ValueError("Shared memory segment {!r} is not a zone index".format(segment.name))
+
+        self.generation = header["generation"]
+        self.owner_pid = header["owner_pid"]
+        num_axes = self.num_axes = header["num_axes"]
+
+        offset = header_size
+        self._nodes = ints[offset:offset + header["node_count"] * self.NODE_FIELDS]
+        offset += len(self._nodes)
+
+        self._fragment_stride = 2 * num_axes + 1
+        self._fragments = ints[offset:offset + header["fragment_count"] * self._fragment_stride]
+        offset += len(self._fragments)
+
+        # Each lattice is origin, size, stride, count, and an offset into the lattice cells
+        self._lattices = []
+        for _ in range(header["lattice_count"]):
+            fields = list(ints[offset:offset + 4 * num_axes + 1])
+            origin, size, stride, count = [fields[i * num_axes:(i + 1) * num_axes] for i in range(4)]
+            cell_strides = [1] * num_axes
+            for axis in range(num_axes - 2, -1, -1):
+                cell_strides[axis] = cell_strides[axis + 1] * count[axis + 1]
+            self._lattices.append((origin, size, stride, count, cell_strides, fields[-1]))
+            offset += 4 * num_axes + 1
+        self._lattice_cells = ints[offset:offset + header["lattice_cell_count"]]
+        offset += header["lattice_cell_count"]
+        self._views += [self._nodes, self._fragments, self._lattice_cells]
+
+        meta_start = offset * 8
+        self._meta = bytes(view[meta_start:meta_start + header["meta_bytes"]])
+        self._zone_info = None
+
+    def refresh(self):
+        """Switch to the newest generation if the index was republished. Returns True if it changed."""
+        if _read_control(self._control)[0] == self.generation:
+            return False
+        generation, segment = self._open_generation(self.name, self._control)
+        if segment is None:
+            return False
+        if generation == self.generation:
+            segment.close()
+            return False
+
+        self._release_views()
+        self._segment.close()
+        self._segment = segment
+        self._zones = {}
+        self._map(segment)
+        if self.cache is not None:
+            self.cache.clear()
+        return True
+
+    def owner_alive(self):
+        """Check if the process that published this generation is still running."""
+        return _pid_alive(self.owner_pid)
+
+    def get_zone_id(self, pos):
+        """Get the original_id of the zone a position is in, or -1."""
+        cache = self.cache
+        if cache is not None:
+            key = ZoneCache.pack(pos)
+            if key is not None:
+                result = cache.get(key)
+                if result is ZoneCache.MISS:
+                    result = self._get_zone_id(pos)
+                    cache.put(key, result)
+                return result
+        return self._get_zone_id(pos)
+
+    def _get_zone_id(self, pos):
+        """Get the original_id of the zone a position is in, or -1, without the cache."""
+        for origin, size, stride, count, cell_strides, cells_offset in self._lattices:
+            index = cells_offset
+            for axis in range(self.num_axes):
+                offset = pos[axis] - origin[axis]
+                if offset < 0:
+                    break
+                if stride[axis]:
+                    cell = int(offset // stride[axis])
+                    if cell >= count[axis]:
+                        break
+                    offset -= cell * stride[axis]
+                    index += cell * cell_strides[axis]
+                if offset >= size[axis]:
+                    break
+            else:
+                zone_id = self._lattice_cells[index]
+                if zone_id != -1:
+                    return zone_id
+
+        if len(self._nodes) == 0:
+            return -1
+        return self._node_zone_id(0, pos)
+
+    def _node_zone_id(self, node, pos):
+        """Same as ZoneTreeParent.get_zone(), over the flat node array."""
+        nodes = self._nodes
+        base = node * self.NODE_FIELDS
+        kind = nodes[base]
+
+        if kind == ZoneTreeBase.NODE_PARENT:
+            value = pos[nodes[base + 1]]
+            if value > nodes[base + 2]:
+                result = self._node_zone_id(nodes[base + 7], pos)
+            else:
+                result = self._node_zone_id(nodes[base + 5], pos)
+            if result != -1:
+                return result
+            if nodes[base + 3] <= value < nodes[base + 4]:
+                return self._node_zone_id(nodes[base + 6], pos)
+            return -1
+
+        if kind == ZoneTreeBase.NODE_LEAF:
+            fragments = self._fragments
+            num_axes = self.num_axes
+            start = nodes[base + 5] * self._fragment_stride
+            for axis in range(num_axes):
+                if pos[axis] < fragments[start + axis] or fragments[start + num_axes + axis] <= pos[axis]:
+                    return -1
+            return fragments[start + 2 * num_axes]
+
+        return -1
+
+    def zone_info(self, zone_id):
+        """Returns [name, type, pos1, pos2] for a zone id, with pos2 inclusive."""
+        if self._zone_info is None:
+            self._zone_info = json.loads(self._meta.decode("utf-8"))
+        return self._zone_info[zone_id]
+
+    def get_zone(self, pos):
+        """Get the zone a position is in, or None.
+
+        Zones are recreated from the shared metadata the first time each one is found.
+        """
+        zone_id = self.get_zone_id(pos)
+        if zone_id == -1:
+            return None
+        zone = self._zones.get(zone_id)
+        if zone is None:
+            name, ztype, pos1, pos2 = self.zone_info(zone_id)
+            zone = Zone({"name": name, "type": ztype, "pos1": pos1, "pos2": pos2}, original_id=zone_id)
+            self._zones[zone_id] = zone
+        return zone
+
+    def get_zones(self, positions):
+        """Get the zone of each position in a list, as a list."""
+        return [self.get_zone(pos) for pos in positions]
+
+    def _release_views(self):
+        """Drop the memoryviews so the segment can be closed."""
+        self._nodes = self._fragments = self._lattice_cells = None
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+
+    def __del__(self):
+        # The segments can't be closed (even by their own __del__) while views of them exist
+        if getattr(self, "_views", None):
+            self._release_views()
+
+    def close(self):
+        """Detach from shared memory. The owner also unlinks the index, so nobody else can attach."""
+        self._release_views()
+        if self.owner:
+            _unlink_segment(self._segment)
+            if self.generation > 1:
+                self._unlink_generation(self.name, self.generation - 1)
+            _unlink_segment(self._control)
+        else:
+            self._segment.close()
+            self._control.close()
+
+# Segments are kept away from multiprocessing's resource tracker. Processes started with
+# multiprocessing share one tracker, so one process dropping a segment would drop it for
+# all of them, and the tracker would unlink the index as soon as its owner exited.
+# Instead, the owner unlinks in close(), and cleanup_stale() handles owners that died.
+
+def _create_segment(name, size):
+    """Create a new shared memory segment."""
+    segment = shared_memory.SharedMemory(name=name, create=True, size=max(1, size))
+    resource_tracker.unregister(segment._name, "shared_memory")
+    return segment
+
+def _open_segment(name):
+    """Open an existing shared memory segment, or return None."""
+    try:
+        segment = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return None
+    resource_tracker.unregister(segment._name, "shared_memory")
+    return segment
+
+def _unlink_segment(segment):
+    """Close and unlink a segment opened with _create_segment() or _open_segment()."""
+    segment.close()
+    # unlink() unregisters the segment from the tracker, so it has to be registered first
+    resource_tracker.register(segment._name, "shared_memory")
+    segment.unlink()
+
+def _read_control(control):
+    """Returns (generation, owner_pid) from a control segment."""
+    return struct.unpack_from("<qq", control.buf, 0)
+
+def _pid_alive(pid):
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
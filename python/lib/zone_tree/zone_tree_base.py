@@ -5,11 +5,25 @@ from lib.zone.zone import Zone
 #from lib.zone_tree.zone_tree_empty import ZoneTreeEmpty
 #from lib.zone_tree.zone_tree_leaf import ZoneTreeLeaf
 #from lib.zone_tree.zone_tree_parent import ZoneTreeParent
+#from lib.zone_tree.zone_tree_bucket import ZoneTreeBucket
 
 class ZoneTreeBase(Zone):
     """The base class of a tree of zones for fast search."""
+    # Node kinds for flatten()
+    NODE_EMPTY = 0
+    NODE_LEAF = 1
+    NODE_PARENT = 2
+
+    # The ZoneTreeEmpty that optimize() uses for every empty branch
+    _shared_empty = None
+
     @staticmethod
-    def CreateZoneTree(zones=[]):
+    def CreateZoneTree(zones=[], lazy=False, quick=False):
+        """Create the best tree node type for these zone fragments.
+
+        If lazy is set, parent nodes build their subtrees on first lookup instead of right away.
+        If quick is set, parent nodes only try splitting at median corners (see ZoneTreeParent).
+        """
         if len(zones) == 0:
             from lib.zone_tree.zone_tree_empty import ZoneTreeEmpty
             return ZoneTreeEmpty()
@@ -18,7 +32,15 @@ class ZoneTreeBase(Zone):
             return ZoneTreeLeaf(zones)
         else:
             from lib.zone_tree.zone_tree_parent import ZoneTreeParent
-            return ZoneTreeParent(zones)
+            return ZoneTreeParent(zones, lazy=lazy, quick=quick)
+
+    @staticmethod
+    def SharedEmpty():
+        """The one empty node shared by optimized trees."""
+        if ZoneTreeBase._shared_empty is None:
+            from lib.zone_tree.zone_tree_empty import ZoneTreeEmpty
+            ZoneTreeBase._shared_empty = ZoneTreeEmpty()
+        return ZoneTreeBase._shared_empty
 
     def __init__(self, zones=[]):
         """Create a zone tree. Zone fragments must not overlap to load."""
@@ -28,6 +50,43 @@ class ZoneTreeBase(Zone):
         """Get the zone a position is in."""
         pass
 
+    def get_flags(self, pos):
+        """Get the flags of the fragment a position is in, or None if it isn't in one."""
+        pass
+
+    def get_fragments_in_box(self, box):
+        """Get a list of the zone fragments overlapping a ZoneBase."""
+        pass
+
+    def write_lookup_source(self, lines, indent, axis_names):
+        """Append Python source lines that do what get_zone does, without objects or recursion.
+
+        The lines return the zone's original_id when found, and fall through otherwise.
+        axis_names are the variable names holding each coordinate, such as ["x", "y", "z"].
+        """
+        pass
+
+    def freeze(self):
+        """Build anything still pending, so the tree is never modified by later lookups."""
+        pass
+
+    def optimize(self, bucket_size=4):
+        """Returns an equivalent subtree that is cheaper to search, reusing this one's nodes.
+
+        Empty branches share one node, parents with only one non-empty child are
+        replaced by that child, and subtrees of at most bucket_size fragments become
+        a ZoneTreeBucket. Lazy subtrees are built first. Run once, right after building.
+        """
+        pass
+
+    def flatten(self, nodes, fragments):
+        """Append this subtree to flat lists and return the index of its node.
+
+        Each node is [kind, axis, pivot, mid_min, mid_max, less, mid, more],
+        where kind is NODE_EMPTY, NODE_LEAF (less is an index into fragments), or NODE_PARENT.
+        """
+        pass
+
 ########################################################################################################################
 # Only needed for debug and statistics:
 
@@ -37,6 +96,14 @@ class ZoneTreeBase(Zone):
     def __len__(self):
         pass
 
+    def node_count(self):
+        """Debug info only."""
+        pass
+
+    def nodes_visited(self, pos):
+        """Debug info only. The number of nodes get_zone(pos) looks at."""
+        pass
+
     def max_depth(self):
         """Debug info only."""
         pass
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+from lib.zone_tree.zone_tree_base import ZoneTreeBase
+
+class ZoneTreeBucket(ZoneTreeBase):
+    """A few zone fragments, checked one after another instead of split further.
+
+    Created by optimize() for small subtrees, where one loop over plain tuples
+    is cheaper than walking more nodes.
+    """
+    def __init__(self, zones=[]):
+        """Create a zone tree. Zone fragments must not overlap to load."""
+        self.fragments = list(zones)
+        self._num_axes = len(zones[0].min_corner) if zones else 0
+        # (min corner..., max corner..., fragment) per fragment, max corner exclusive
+        self._entries = [
+            tuple(fragment.min_corner.list) + tuple(fragment.true_max_corner.list) + (fragment,)
+            for fragment in zones
+        ]
+
+    def _find(self, pos):
+        """Returns the fragment a position is in, or None."""
+        if self._num_axes == 3:
+            x, y, z = pos[0], pos[1], pos[2]
+            for x0, y0, z0, x1, y1, z1, fragment in self._entries:
+                if x0 <= x < x1 and y0 <= y < y1 and z0 <= z < z1:
+                    return fragment
+            return None
+
+        num_axes = self._num_axes
+        for entry in self._entries:
+            for axis in range(num_axes):
+                if pos[axis] < entry[axis] or entry[num_axes + axis] <= pos[axis]:
+                    break
+            else:
+                return entry[-1]
+        return None
+
+    def get_zone(self, pos):
+        """Get the zone a position is in."""
+        fragment = self._find(pos)
+        if fragment is None:
+            return None
+        return fragment.parent
+
+    def get_flags(self, pos):
+        """Get the flags of the fragment a position is in, or None if it isn't in one."""
+        fragment = self._find(pos)
+        if fragment is None:
+            return None
+        return fragment.flags
+
+    def get_fragments_in_box(self, box):
+        """Get a list of the zone fragments overlapping a ZoneBase."""
+        return [fragment for fragment in self.fragments if fragment.overlaping_zone(box) is not None]
+
+    def write_lookup_source(self, lines, indent, axis_names):
+        """Append Python source lines that do what get_zone does, without objects or recursion."""
+        for fragment in self.fragments:
+            ZoneTreeBase.CreateZoneTree([fragment]).write_lookup_source(lines, indent, axis_names)
+
+    def flatten(self, nodes, fragments):
+        """Append this subtree to flat lists and return the index of its node.
+
+        The flat format has no buckets, so the fragments are flattened as a regular subtree.
+        """
+        return ZoneTreeBase.CreateZoneTree(self.fragments).flatten(nodes, fragments)
+
+    def optimize(self, bucket_size=4):
+        """Returns this node; buckets are already optimized."""
+        return self
+
+########################################################################################################################
+# Only needed for debug and statistics:
+
+    def __iter__(self):
+        return iter(self.fragments)
+
+    def __len__(self):
+        return len(self.fragments)
+
+    def node_count(self):
+        """Debug info only."""
+        return 1
+
+    def nodes_visited(self, pos):
+        """Debug info only."""
+        return 1
+
+    def max_depth(self):
+        """Debug info only."""
+        return 1
+
+    def all_leaf_depths(self):
+        """Debug info only."""
+        return [1] * len(self.fragments)
+
+    def total_leaf_depth(self):
+        """Debug info only."""
+        return len(self.fragments)
+
+    def average_depth(self):
+        """Debug info only."""
+        return 1
+
+    def show_tree(self, header="─", prefix=""):
+        """Print the tree structure to stdout for debugging."""
+        if header:
+            prefix = header
+
+        print(prefix + "╴bucket of {}: {!r}".format(len(self.fragments), self.fragments))
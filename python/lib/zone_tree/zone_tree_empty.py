@@ -12,15 +12,44 @@ class ZoneTreeEmpty(ZoneTreeBase):
         """Get the zone a position is in."""
         return None
 
+    def get_flags(self, pos):
+        """Get the flags of the fragment a position is in, or None if it isn't in one."""
+        return None
+
+    def get_fragments_in_box(self, box):
+        """Get a list of the zone fragments overlapping a ZoneBase."""
+        return []
+
+    def write_lookup_source(self, lines, indent, axis_names):
+        """Append Python source lines that do what get_zone does, without objects or recursion."""
+        lines.append(indent + "pass")
+
+    def optimize(self, bucket_size=4):
+        """Returns the shared empty node."""
+        return ZoneTreeBase.SharedEmpty()
+
+    def flatten(self, nodes, fragments):
+        """Append this subtree to flat lists and return the index of its node."""
+        nodes.append([ZoneTreeBase.NODE_EMPTY, 0, 0, 0, 0, -1, -1, -1])
+        return len(nodes) - 1
+
 ########################################################################################################################
 # Only needed for debug and statistics:
 
     def __iter__(self):
-        raise StopIteration
+        return iter(())
 
     def __len__(self):
         return 0
 
+    def node_count(self):
+        """Debug info only."""
+        return 1
+
+    def nodes_visited(self, pos):
+        """Debug info only."""
+        return 1
+
     def max_depth(self):
         """Debug info only."""
         return 0
@@ -16,6 +16,39 @@ class ZoneTreeLeaf(ZoneTreeBase):
         else:
             return None
 
+    def get_flags(self, pos):
+        """Get the flags of the fragment a position is in, or None if it isn't in one."""
+        if self.here.within(pos):
+            return self.here.flags
+        else:
+            return None
+
+    def get_fragments_in_box(self, box):
+        """Get a list of the zone fragments overlapping a ZoneBase."""
+        if self.here.overlaping_zone(box) is None:
+            return []
+        return [self.here]
+
+    def write_lookup_source(self, lines, indent, axis_names):
+        """Append Python source lines that do what get_zone does, without objects or recursion."""
+        min_corner = self.here.min_corner
+        max_corner = self.here.true_max_corner
+        checks = []
+        for axis, name in enumerate(axis_names):
+            checks.append("{} <= {} < {}".format(min_corner[axis], name, max_corner[axis]))
+        lines.append(indent + "if " + " and ".join(checks) + ":")
+        lines.append(indent + "    return {}".format(self.here.parent.original_id))
+
+    def optimize(self, bucket_size=4):
+        """Returns this node; leaves are already optimal."""
+        return self
+
+    def flatten(self, nodes, fragments):
+        """Append this subtree to flat lists and return the index of its node."""
+        fragments.append(self.here)
+        nodes.append([ZoneTreeBase.NODE_LEAF, 0, 0, 0, 0, len(fragments) - 1, -1, -1])
+        return len(nodes) - 1
+
 ########################################################################################################################
 # Only needed for debug and statistics:
 
@@ -25,6 +58,14 @@ class ZoneTreeLeaf(ZoneTreeBase):
     def __len__(self):
         return 1
 
+    def node_count(self):
+        """Debug info only."""
+        return 1
+
+    def nodes_visited(self, pos):
+        """Debug info only."""
+        return 1
+
     def max_depth(self):
         """Debug info only."""
         return 1
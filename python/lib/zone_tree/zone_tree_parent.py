@@ -1,17 +1,25 @@
 #!/usr/bin/env python3
 
+import threading
+from bisect import bisect_right
 from lib.zone.zone import Zone
 from lib.zone_tree.zone_tree_base import ZoneTreeBase
 
 class ZoneTreeParent(ZoneTreeBase):
     """A tree of zones for fast search."""
-    def __init__(self, zones=[]):
+    def __init__(self, zones=[], lazy=False, quick=False):
         """Create a zone tree. Zone fragments must not overlap to load.
 
         Determine which way to split the undivided zones.
 
         Best split results having the lowest maximum of
         the less, mid, and more groups.
+
+        If lazy is set, the less, mid, and more subtrees are only built
+        the first time a lookup needs them.
+
+        If quick is set, only the median min and max corners along each axis
+        are tried as pivots, rather than every corner of every zone.
         """
         num_axes = len(zones[0].max_corner)
 
@@ -31,42 +39,77 @@ class ZoneTreeParent(ZoneTreeBase):
         }
         best_split = worst_case
 
-        for pivot_zone in zones:
+        # Corners as plain lists, read once instead of once per pivot tried
+        min_corners = [zone.min_corner.list for zone in zones]
+        max_corners = [
+            [low + size for low, size in zip(min_corner, zone.size())]
+            for min_corner, zone in zip(min_corners, zones)
+        ]
+        num_zones = len(zones)
+
+        # Counting zones on each side of a pivot by bisecting sorted corners picks
+        # the same split as partitioning every zone for every pivot, in O(n log(n))
+        sorted_mins = [sorted(corner[axis] for corner in min_corners) for axis in range(num_axes)]
+        sorted_maxes = [sorted(corner[axis] for corner in max_corners) for axis in range(num_axes)]
+        best_priority = best_split["priority"]
+        best_axis_pivot = None
+
+        # Only this node falls back to trying every corner; children stay quick
+        try_every_corner = not quick
+        if quick:
             for axis in range(num_axes):
-                for pivot in (pivot_zone.min_corner[axis], pivot_zone.true_max_corner[axis]):
-                    less = []
-                    mid_min = pivot
-                    mid = []
-                    mid_max = pivot
-                    more = []
-
-                    for zone in zones:
-                        if pivot >= zone.true_max_corner[axis]:
-                            less.append(zone)
-                        elif pivot >= zone.min_corner[axis]:
-                            mid_min = min(mid_min, zone.min_corner[axis])
-                            mid_max = max(mid_max, zone.true_max_corner[axis])
-                            mid.append(zone)
-                        else:
-                            more.append(zone)
-
-                    test_split = {
-                        "priority": max(len(less), len(mid), len(more)),
-                        "axis": axis,
-
-                        "pivot": pivot,
-                        "mid_min": mid_min,
-                        "mid_max": mid_max,
-
-                        "less": less,
-                        "mid": mid,
-                        "more": more,
-                    }
-
-                    if test_split["priority"] >= best_split["priority"]:
-                        continue
-
-                    best_split = test_split
+                for pivot in (sorted_mins[axis][num_zones // 2], sorted_maxes[axis][num_zones // 2]):
+                    num_less = bisect_right(sorted_maxes[axis], pivot)
+                    num_more = num_zones - bisect_right(sorted_mins[axis], pivot)
+                    priority = max(num_less, num_zones - num_less - num_more, num_more)
+                    if priority < best_priority:
+                        best_priority = priority
+                        best_axis_pivot = (axis, pivot)
+            if best_priority >= num_zones:
+                # No median splits anything off; try every corner after all
+                try_every_corner = True
+
+        if try_every_corner:
+            for i in range(num_zones):
+                for axis in range(num_axes):
+                    for pivot in (min_corners[i][axis], max_corners[i][axis]):
+                        num_less = bisect_right(sorted_maxes[axis], pivot)
+                        num_more = num_zones - bisect_right(sorted_mins[axis], pivot)
+                        priority = max(num_less, num_zones - num_less - num_more, num_more)
+                        if priority < best_priority:
+                            best_priority = priority
+                            best_axis_pivot = (axis, pivot)
+
+        if best_axis_pivot is not None:
+            axis, pivot = best_axis_pivot
+            less = []
+            mid_min = pivot
+            mid = []
+            mid_max = pivot
+            more = []
+
+            for i, zone in enumerate(zones):
+                if pivot >= max_corners[i][axis]:
+                    less.append(zone)
+                elif pivot >= min_corners[i][axis]:
+                    mid_min = min(mid_min, min_corners[i][axis])
+                    mid_max = max(mid_max, max_corners[i][axis])
+                    mid.append(zone)
+                else:
+                    more.append(zone)
+
+            best_split = {
+                "priority": best_priority,
+                "axis": axis,
+
+                "pivot": pivot,
+                "mid_min": mid_min,
+                "mid_max": mid_max,
+
+                "less": less,
+                "mid": mid,
+                "more": more,
+            }
 
         # Ok good, this is the answer we want. Copy values to self.
         self._axis = best_split["axis"]
@@ -75,36 +118,173 @@ class ZoneTreeParent(ZoneTreeBase):
         self._mid_min = best_split["mid_min"]
         self._mid_max = best_split["mid_max"]
 
-        self._less = ZoneTreeBase.CreateZoneTree(best_split["less"])
-        self._mid = ZoneTreeBase.CreateZoneTree(best_split["mid"])
-        self._more = ZoneTreeBase.CreateZoneTree(best_split["more"])
+        if lazy:
+            # Subtrees are built by _materialize() when first needed.
+            self._lock = threading.Lock()
+            self._quick = quick
+            self._pending = {
+                "_less": best_split["less"],
+                "_mid": best_split["mid"],
+                "_more": best_split["more"],
+            }
+            self._less = None
+            self._mid = None
+            self._more = None
+            return
+
+        self._lock = None
+        self._pending = None
+        self._less = ZoneTreeBase.CreateZoneTree(best_split["less"], quick=quick)
+        self._mid = ZoneTreeBase.CreateZoneTree(best_split["mid"], quick=quick)
+        self._more = ZoneTreeBase.CreateZoneTree(best_split["more"], quick=quick)
         return
 
+    def _materialize(self, child_name):
+        """Build a lazy subtree ("_less", "_mid", or "_more") and return it.
+
+        Lookups from other threads wait for the subtree rather than building it twice.
+        """
+        with self._lock:
+            child = getattr(self, child_name)
+            if child is None:
+                child = ZoneTreeBase.CreateZoneTree(self._pending.pop(child_name), lazy=True, quick=self._quick)
+                setattr(self, child_name, child)
+            return child
+
     def get_zone(self, pos):
         """Get the zone a position is in."""
         result = None
         if pos[self._axis] > self._pivot:
-            result = self._more.get_zone(pos)
+            more = self._more
+            if more is None:
+                more = self._materialize("_more")
+            result = more.get_zone(pos)
             if result is not None:
                 return result
         else:
-            result = self._less.get_zone(pos)
+            less = self._less
+            if less is None:
+                less = self._materialize("_less")
+            result = less.get_zone(pos)
             if result is not None:
                 return result
 
         # The result could be in the middle tree; search there if possible, and give up if it's not there.
         if self._mid_min <= pos[self._axis] and pos[self._axis] < self._mid_max:
-            result = self._mid.get_zone(pos)
+            mid = self._mid
+            if mid is None:
+                mid = self._materialize("_mid")
+            result = mid.get_zone(pos)
             # If we find no zone, we're out of places to look - that's the result.
             # Ancestor nodes may find something in their mid trees, though.
             return result
 
         return result
 
+    def get_flags(self, pos):
+        """Get the flags of the fragment a position is in, or None if it isn't in one.
+
+        Same search as get_zone().
+        """
+        if pos[self._axis] > self._pivot:
+            more = self._more
+            if more is None:
+                more = self._materialize("_more")
+            result = more.get_flags(pos)
+        else:
+            less = self._less
+            if less is None:
+                less = self._materialize("_less")
+            result = less.get_flags(pos)
+        if result is not None:
+            return result
+
+        if self._mid_min <= pos[self._axis] and pos[self._axis] < self._mid_max:
+            mid = self._mid
+            if mid is None:
+                mid = self._materialize("_mid")
+            return mid.get_flags(pos)
+        return None
+
+    def get_fragments_in_box(self, box):
+        """Get a list of the zone fragments overlapping a ZoneBase."""
+        self._materialize_all()
+        box_min = box.min_corner[self._axis]
+        box_max = box.true_max_corner[self._axis]
+
+        result = []
+        # Less fragments end at or before the pivot, more fragments start after it.
+        if box_min < self._pivot:
+            result += self._less.get_fragments_in_box(box)
+        if box_max > self._pivot + 1:
+            result += self._more.get_fragments_in_box(box)
+        if box_min < self._mid_max and self._mid_min < box_max:
+            result += self._mid.get_fragments_in_box(box)
+        return result
+
+    def write_lookup_source(self, lines, indent, axis_names):
+        """Append Python source lines that do what get_zone does, without objects or recursion."""
+        self._materialize_all()
+        name = axis_names[self._axis]
+
+        lines.append(indent + "if {} > {}:".format(name, self._pivot))
+        self._more.write_lookup_source(lines, indent + "    ", axis_names)
+        lines.append(indent + "else:")
+        self._less.write_lookup_source(lines, indent + "    ", axis_names)
+
+        # Misses above fall through to here, just like a None result in get_zone()
+        lines.append(indent + "if {} <= {} < {}:".format(self._mid_min, name, self._mid_max))
+        self._mid.write_lookup_source(lines, indent + "    ", axis_names)
+
+    def freeze(self):
+        """Build anything still pending, so the tree is never modified by later lookups."""
+        self._materialize_all()
+        self._lock = None
+        self._pending = None
+        self._less.freeze()
+        self._mid.freeze()
+        self._more.freeze()
+
+    def optimize(self, bucket_size=4):
+        """Returns an equivalent subtree that is cheaper to search, reusing this one's nodes."""
+        self.freeze()
+        if len(self) <= bucket_size:
+            from lib.zone_tree.zone_tree_bucket import ZoneTreeBucket
+            return ZoneTreeBucket(list(self))
+
+        self._less = self._less.optimize(bucket_size)
+        self._mid = self._mid.optimize(bucket_size)
+        self._more = self._more.optimize(bucket_size)
+
+        # Each child only holds fragments inside the range it is searched for, so a lone child works alone
+        children = [child for child in (self._less, self._mid, self._more) if len(child) != 0]
+        if len(children) == 1:
+            return children[0]
+        return self
+
+    def flatten(self, nodes, fragments):
+        """Append this subtree to flat lists and return the index of its node."""
+        self._materialize_all()
+        node = [ZoneTreeBase.NODE_PARENT, self._axis, self._pivot, self._mid_min, self._mid_max, -1, -1, -1]
+        nodes.append(node)
+        index = len(nodes) - 1
+        node[5] = self._less.flatten(nodes, fragments)
+        node[6] = self._mid.flatten(nodes, fragments)
+        node[7] = self._more.flatten(nodes, fragments)
+        return index
+
 ########################################################################################################################
 # Only needed for debug and statistics:
 
+    def _materialize_all(self):
+        """Debug info only. Build any lazy subtrees so the whole tree can be inspected."""
+        if self._lock is not None:
+            for child_name in ("_less", "_mid", "_more"):
+                if getattr(self, child_name) is None:
+                    self._materialize(child_name)
+
     def __iter__(self):
+        self._materialize_all()
         for zone in self._less:
             yield zone
         for zone in self._mid:
@@ -113,10 +293,38 @@ class ZoneTreeParent(ZoneTreeBase):
             yield zone
 
     def __len__(self):
+        self._materialize_all()
         return len(self._less) + len(self._mid) + len(self._more)
 
+    def node_count(self):
+        """Debug info only. Lazy subtrees that have not been built yet are not counted."""
+        result = 1
+        for child in (self._less, self._mid, self._more):
+            if child is not None:
+                result += child.node_count()
+        return result
+
+    def nodes_visited(self, pos):
+        """Debug info only. The number of nodes get_zone(pos) looks at."""
+        self._materialize_all()
+        result = 1
+        if pos[self._axis] > self._pivot:
+            result += self._more.nodes_visited(pos)
+            if self._more.get_zone(pos) is not None:
+                return result
+        else:
+            result += self._less.nodes_visited(pos)
+            if self._less.get_zone(pos) is not None:
+                return result
+
+        if self._mid_min <= pos[self._axis] and pos[self._axis] < self._mid_max:
+            result += self._mid.nodes_visited(pos)
+
+        return result
+
     def max_depth(self):
         """Debug info only."""
+        self._materialize_all()
         return 1 + max(
             self._less.max_depth(),
             self._mid.max_depth(),
@@ -125,6 +333,7 @@ class ZoneTreeParent(ZoneTreeBase):
 
     def all_leaf_depths(self):
         """Debug info only."""
+        self._materialize_all()
         return [leaf_depth + 1 for leaf_depth in self._less.all_leaf_depths() + self._mid.all_leaf_depths() + self._more.all_leaf_depths()]
 
     def total_leaf_depth(self):
@@ -143,6 +352,7 @@ class ZoneTreeParent(ZoneTreeBase):
         if header:
             prefix = header
 
+        self._materialize_all()
         print(prefix + "┬╴axis={!r}, pivot={!r}, mid_min={!r}, mid_max={!r}".format(self._axis, self._pivot, self._mid_min, self._mid_max))
 
         if header:
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+
+import hashlib
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import permutations
+from lib.pos import Pos
+
+class ZoneTuner(object):
+    """Picks ZoneManager build parameters for a set of zones by trying them.
+
+    Each candidate (axis_order, split_mode) is built in its own worker process
+    and scored with a simple cost model:
+
+        cost = average nodes visited per lookup + memory_weight * tree node count
+
+    Lookups are sampled from the supplied query positions, or uniformly over
+    the bounds of the zones if none are given.
+
+    The chosen parameters can be saved to cache_path, keyed on a hash of the
+    zones, so later startups can skip straight to building the winner.
+    """
+    def __init__(self, zones, queries=None, num_queries=2000, memory_weight=0.001, workers=None, cache_path=None):
+        self.zones = zones
+        self.memory_weight = memory_weight
+        self.workers = workers
+        self.cache_path = cache_path
+
+        if queries is None:
+            queries = _uniform_queries(zones, num_queries)
+        self.queries = queries
+
+        # Filled in by tune(): the stats of each candidate, in the order of candidates()
+        self.results = []
+
+    def candidates(self):
+        """Returns the list of parameter dicts to try. Zones default to 3 axes if there are none."""
+        if not self.zones:
+            num_axes = 3
+        elif isinstance(self.zones[0]["pos1"], str):
+            num_axes = len(self.zones[0]["pos1"].split())
+        else:
+            num_axes = len(self.zones[0]["pos1"])
+        result = []
+        for axis_order in permutations(range(num_axes)):
+            result.append({"axis_order": list(axis_order), "split_mode": "fixed"})
+        # The best split mode tries every axis order by itself
+        default_order = [0, 2, 1] if num_axes == 3 else list(range(num_axes))
+        result.append({"axis_order": default_order, "split_mode": "best"})
+        return result
+
+    def zones_hash(self):
+        """A hash of the zone list, used to tell if cached parameters still apply."""
+        return hashlib.sha1(json.dumps(self.zones, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def cached_params(self):
+        """Returns the cached parameters for these zones, or None."""
+        if self.cache_path is None or not os.path.exists(self.cache_path):
+            return None
+        with open(self.cache_path, "r") as fp:
+            cached = json.load(fp)
+        if cached.get("zones_hash") != self.zones_hash():
+            return None
+        return cached["params"]
+
+    def save_params(self, params, stats):
+        """Record the chosen parameters so later startups don't need to search again."""
+        if self.cache_path is None:
+            return
+        with open(self.cache_path, "w") as fp:
+            json.dump({
+                "zones_hash": self.zones_hash(),
+                "params": params,
+                "stats": stats,
+            }, fp, indent=2)
+
+    def tune(self):
+        """Returns a ZoneManager built with the best parameters found.
+
+        The manager's tuned_params attribute holds the parameters used.
+        """
+        from lib.zone_manager import ZoneManager
+
+        params = self.cached_params()
+        if params is not None:
+            manager = ZoneManager(self.zones, **params)
+            manager.tuned_params = params
+            return manager
+
+        candidates = self.candidates()
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = [
+                executor.submit(_build_and_score, self.zones, params, self.queries, self.memory_weight)
+                for params in candidates
+            ]
+            # Only the best manager so far is kept; the others are dropped as soon as they lose
+            self.results = []
+            best_index = None
+            best_manager = None
+            while futures:
+                stats, manager = futures.pop(0).result()
+                self.results.append(stats)
+                if best_index is None or stats["cost"] < self.results[best_index]["cost"]:
+                    best_index = len(self.results) - 1
+                    best_manager = manager
+                manager = None
+
+        manager = best_manager
+        params = candidates[best_index]
+        self.save_params(params, self.results[best_index])
+        manager.tuned_params = params
+        return manager
+
+def _build_and_score(zones, params, queries, memory_weight):
+    """Worker process entry point for ZoneTuner.tune(). Returns (stats, manager)."""
+    from lib.zone_manager import ZoneManager
+
+    start = time.perf_counter()
+    manager = ZoneManager(zones, **params)
+    build_time = time.perf_counter() - start
+
+    tree = manager.tree
+    total_visits = 0
+    for pos in queries:
+        total_visits += tree.nodes_visited(pos)
+    average_visits = total_visits / max(1, len(queries))
+    node_count = tree.node_count()
+
+    stats = {
+        "average_visits": average_visits,
+        "node_count": node_count,
+        "fragments": len(tree),
+        "build_time": build_time,
+        "cost": average_visits + memory_weight * node_count,
+    }
+    return (stats, manager)
+
+def _uniform_queries(zones, count, seed=0):
+    """Returns count positions spread uniformly over the bounds of zone config dicts, inclusive."""
+    if not zones:
+        return []
+    min_corner = None
+    max_corner = None
+    for zone in zones:
+        for key in ("pos1", "pos2"):
+            pos = Pos(zone[key])
+            min_corner = pos if min_corner is None else min_corner.min_corner(pos)
+            max_corner = pos if max_corner is None else max_corner.max_corner(pos)
+
+    rng = random.Random(seed)
+    return [
+        tuple(rng.randint(min_corner[axis], max_corner[axis]) for axis in range(len(min_corner)))
+        for _ in range(count)
+    ]
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+from lib.synthetic import config_bounds, random_zones, uniform_trace
+from lib.zone_manager import ZoneManager
+
+zones = random_zones(40, [0, 0, 0], [200, 100, 200], [5, 5, 5], [60, 40, 60], seed=3)
+manager = ZoneManager(zones, adjacency=True)
+adjacency = manager.adjacency
+
+# Nodes tile the bounds: every position inside them is in exactly one node
+bounds_min, bounds_max = adjacency.bounds
+for pos in uniform_trace(list(bounds_min), [value - 1 for value in bounds_max], 3000):
+    nodes = [node for node in range(len(adjacency)) if adjacency.contains(node, pos)]
+    if len(nodes) != 1:
+        raise Exception("{!r} is in adjacency nodes {!r}, expected exactly one".format(pos, nodes))
+
+# Neighbours across a face touch it, and overlap along the other axes
+for node in range(len(adjacency)):
+    node_min, node_max = adjacency.box(node)
+    for face, neighbors in enumerate(adjacency.neighbors[node]):
+        axis = face // 2
+        for neighbor in neighbors:
+            neighbor_min, neighbor_max = adjacency.box(neighbor)
+            touching = node_min[axis] == neighbor_max[axis] if face % 2 == 0 else node_max[axis] == neighbor_min[axis]
+            if not touching or not all(
+                node_min[other] < neighbor_max[other] and neighbor_min[other] < node_max[other] for other in range(3) if other != axis
+            ):
+                raise Exception("Adjacency node {} is not a neighbour of {} across face {}".format(neighbor, node, face))
+            if node not in adjacency.neighbors[neighbor][face ^ 1]:
+                raise Exception("Adjacency node {} is missing {} across face {}".format(neighbor, node, face ^ 1))
+
+# Walking from the previous node finds the same zone as a lookup from the root
+min_corner, max_corner = config_bounds(zones)
+node = -1
+for pos in uniform_trace([value - 5 for value in min_corner], [value + 5 for value in max_corner], 3000):
+    zone, node = manager.get_zone_near(pos, node)
+    if zone is not manager.get_zone(pos):
+        raise Exception("get_zone_near({!r}) is {!r}, expected {!r}".format(pos, zone, manager.get_zone(pos)))
+
+# Without an adjacency graph, get_zone_near() says how to get one
+try:
+    ZoneManager(zones).get_zone_near([0, 0, 0])
+except ValueError:
+    pass
+else:
+    raise Exception("get_zone_near() without adjacency=True did not raise ValueError")
+
+print("Adjacency graph of {} nodes tiles its bounds and agrees with the tree".format(len(adjacency)))
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+from lib.zone_cache import ZoneCache
+from lib.zone_manager import ZoneManager
+
+# Packing round trips, and keeps positions apart
+positions = [(0, 0, 0), (1, 0, 0), (0, 1, 0), (0, 0, 1), (-1, -1, -1), (-30000000, 2047, 30000000), (123456, -2048, -654321)]
+keys = [ZoneCache.pack(pos) for pos in positions]
+if len(set(keys)) != len(keys):
+    raise Exception("Packed keys collide: {!r}".format(keys))
+for pos, key in zip(positions, keys):
+    if ZoneCache.unpack(key) != pos:
+        raise Exception("{!r} packed and unpacked to {!r}".format(pos, ZoneCache.unpack(key)))
+
+# Floats pack to the block they are in
+for pos, block in (((1.5, 2.0, 3.0), (1, 2, 3)), ((-0.5, 64.99, -7.25), (-1, 64, -8))):
+    if ZoneCache.pack(pos) != ZoneCache.pack(block):
+        raise Exception("{!r} packed differently from its block {!r}".format(pos, block))
+
+# Positions out of range, or without 3 axes, aren't cached
+for pos in ((1 << 25, 0, 0), (0, 1 << 11, 0), (0, -(1 << 11) - 1, 0), (0, 0), (0, 0, 0, 0)):
+    if ZoneCache.pack(pos) is not None:
+        raise Exception("{!r} should not be packed".format(pos))
+
+# Least recently used entries are evicted first
+cache = ZoneCache(2)
+cache.put(1, "a")
+cache.put(2, "b")
+if cache.get(1) != "a":
+    raise Exception("Cached value lost")
+cache.put(3, "c")
+if cache.get(2) is not ZoneCache.MISS or cache.get(1) != "a" or cache.get(3) != "c":
+    raise Exception("Expected the least recently used entry to be evicted")
+if (cache.hits, cache.misses, cache.evictions, len(cache)) != (3, 1, 1, 2):
+    raise Exception("Unexpected cache statistics {!r}".format(cache.stats()))
+# None is a result like any other
+cache.put(4, None)
+if cache.get(4) is not None:
+    raise Exception("A cached None is not a miss")
+cache.clear()
+if len(cache) != 0 or cache.get(3) is not ZoneCache.MISS:
+    raise Exception("clear() kept entries")
+
+try:
+    ZoneCache(0)
+except ValueError:
+    pass
+else:
+    raise Exception("ZoneCache(0) did not raise ValueError")
+
+# A cached manager answers the same as an uncached one, floats included
+zones = [
+    {"name": "Alice", "type": "Eggs", "pos1": [0, 0, 0], "pos2": [3, 3, 3]},
+    {"name": "Bob", "type": "Spam", "pos1": [-4, 0, -4], "pos2": [-1, 3, -1]},
+]
+cached = ZoneManager(zones, cache_size=4)
+uncached = ZoneManager(zones)
+trace = [(x / 2, 1.25, z / 2) for x in range(-12, 12) for z in range(-12, 12)] * 2
+if [getattr(zone, "original_id", None) for zone in cached.get_zones(trace)] != [getattr(zone, "original_id", None) for zone in uncached.get_zones(trace)]:
+    raise Exception("Cached lookups disagree with uncached ones")
+
+print("ZoneCache packs, evicts, and agrees with uncached lookups")
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+
+import io
+import json
+from lib.zone_config_loader import ZoneConfigLoader
+
+def load(text, **options):
+    return ZoneConfigLoader(**options).load(io.StringIO(text))
+
+def expect_error(text, message, **options):
+    """Loading text must raise a ValueError mentioning message."""
+    try:
+        load(text, **options)
+    except ValueError as error:
+        if message not in str(error):
+            raise Exception("Expected an error mentioning {!r}, got {!r}".format(message, str(error)))
+        return
+    raise Exception("Expected an error mentioning {!r} loading {!r}".format(message, text))
+
+config = {
+    "plotSurvivalMinHeight": 95,
+    "locationBounds": [
+        {"name": "Arena", "type": "AdventureZone", "pos1": "-966 90 -124", "pos2": "-926 256 -84"},
+        {"name": "Lobby", "type": "SafeZone", "pos1": [-764, 6, -23], "pos2": [-722, 37, 43], "extra": True},
+    ],
+    "unbreakableBlocks": [{"nested": ["locationBounds"]}],
+}
+text = json.dumps(config, indent=2)
+
+# The same result however small the chunks the file is read in
+for chunk_size in (1, 7, 64 * 1024):
+    names, types, pos1, pos2 = load(text, chunk_size=chunk_size)
+    if names != ["Arena", "Lobby"] or types != ["AdventureZone", "SafeZone"]:
+        raise Exception("Unexpected names {!r} and types {!r}".format(names, types))
+    if list(pos1) != [-966, 90, -124, -764, 6, -23] or list(pos2) != [-926, 256, -84, -722, 37, 43]:
+        raise Exception("Unexpected corners {!r} and {!r}".format(list(pos1), list(pos2)))
+
+names, types, pos1, pos2 = load('{"locationBounds": []}')
+if names or types or len(pos1) or len(pos2):
+    raise Exception("An empty location bounds list should load no zones")
+if load('{"locationBounds": [{"name": "a", "type": "b", "pos1": [1, 2], "pos2": "3 4"}]}', num_axes=2)[2].tolist() != [1, 2]:
+    raise Exception("2D coordinates didn't load")
+
+# Errors name the offending entry
+expect_error('{}', "No 'locationBounds' list")
+expect_error('{"other": [1, 2, 3]}', "No 'locationBounds' list")
+expect_error('{"locationBounds": [{"name": "a", "type": "b", "pos1": "1 2 3", "pos2": "4 5 6"}, {"name": "c", "type": "d", "pos1": "1 2 3"}]}', "locationBounds #1: missing pos2")
+expect_error('{"locationBounds": [{"pos1": "1 2 3", "pos2": "4 5 6"}]}', "locationBounds #0: missing name, type")
+expect_error('{"locationBounds": [{"name": "a", "type": "b", "pos1": "1 2 3", "pos2": "4 5 6"}, 7]}', "locationBounds #1: expected an object")
+expect_error('{"locationBounds": [{"name": "a", "type": "b", "pos1": "1 2 3", "pos2": "4 5 6"}, {"name": "c", "type": "d", "pos1": "1 2", "pos2": "4 5 6"}]}', "pos1 #1: expected 3 axes")
+expect_error('{"locationBounds": [{"name": "a", "type": "b", "pos1": "1 2 3", "pos2": "4 x 6"}]}', "pos2 #0: expected integer coordinates")
+expect_error('{"locationBounds": [{"name": "a", "type": "b", "pos1": 5, "pos2": "4 5 6"}]}', "pos1 #0: expected a string or list")
+expect_error('{"locationBounds": [}', "Expecting value")
+expect_error('{"locationBounds": [] "x"', "Expected one of")
+
+print("ZoneConfigLoader loads configs and names bad entries")
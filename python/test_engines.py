@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+import json
+import pickle
+import random
+from lib.synthetic import config_bounds, plot_grid_zones, random_zones, uniform_trace
+from lib.zone.zone_base import ZoneBase
+from lib.zone_engine.zone_engine_base import ZoneEngineBase
+from lib.zone_manager import ZoneManager
+
+worlds = []
+for path in ("../config/region_1.json", "../config/region_2.json"):
+    with open(path, "r") as fp:
+        worlds.append((path, json.load(fp)["locationBounds"]))
+worlds.append(("random", random_zones(30, [0, 0, 0], [300, 255, 300], [5, 5, 5], [100, 100, 100], seed=1)))
+worlds.append(("plots", plot_grid_zones(200)))
+worlds.append(("2D", [
+    {"name": "Bob", "type": "Spam", "pos1": [1, 1], "pos2": [5, 5]},
+    {"name": "Alice", "type": "Eggs", "pos1": [2, 2], "pos2": [4, 4]},
+]))
+
+def first_zone_ids(zones, points):
+    """The original_id of the first zone config dict containing each point, or None, by checking every zone.
+
+    Earlier zones take priority where zones overlap, so this is what every engine has to answer.
+    """
+    boxes = []
+    for zone in zones:
+        # Corners are lists, or strings such as "-966 90 -124"
+        pos1 = [int(coord) for coord in zone["pos1"].split()] if isinstance(zone["pos1"], str) else zone["pos1"]
+        pos2 = [int(coord) for coord in zone["pos2"].split()] if isinstance(zone["pos2"], str) else zone["pos2"]
+        boxes.append((
+            [min(pos1[axis], pos2[axis]) for axis in range(len(pos1))],
+            [max(pos1[axis], pos2[axis]) for axis in range(len(pos1))],
+        ))
+    result = []
+    for pos in points:
+        for zone_id, (min_corner, max_corner) in enumerate(boxes):
+            if all(min_corner[axis] <= pos[axis] <= max_corner[axis] for axis in range(len(pos))):
+                result.append(zone_id)
+                break
+        else:
+            result.append(None)
+    return result
+
+def zone_ids(zones):
+    return [getattr(zone, "original_id", None) for zone in zones]
+
+rng = random.Random(0)
+for name, zones in worlds:
+    manager = ZoneManager(zones, axis_order=[0, 2, 1] if len(config_bounds(zones)[0]) == 3 else [0, 1], engine="scan")
+    fragments = []
+    for zone in manager.zones:
+        fragments += zone.fragments
+
+    min_corner, max_corner = config_bounds(zones)
+    num_axes = len(min_corner)
+    padded_min = [value - 10 for value in min_corner]
+    padded_max = [value + 10 for value in max_corner]
+
+    # Random points, plus points on and just outside every zone's and fragment's corners
+    points = uniform_trace(padded_min, padded_max, 3000)
+    for zone in manager.zones:
+        for corner in (zone.min_corner, zone.true_max_corner):
+            points.append(tuple(corner.list))
+            points.append(tuple(value - 1 for value in corner.list))
+    for fragment in fragments:
+        for corner in (fragment.min_corner, fragment.max_corner, fragment.true_max_corner):
+            points.append(tuple(corner.list))
+            points.append(tuple(value - 1 for value in corner.list))
+
+    boxes = []
+    for _ in range(300):
+        a = [rng.randint(padded_min[axis], padded_max[axis]) for axis in range(num_axes)]
+        b = [value + rng.randint(0, 80) for value in a]
+        boxes.append(ZoneBase({"pos1": a, "pos2": b}))
+
+    # Every answer is checked against the config itself, not just against another engine,
+    # so a bug in removing overlaps can't hide in the fragments all engines are built from
+    expected_ids = first_zone_ids(zones, points)
+    expected_zones = manager.get_zones(points)
+    for pos, zone, expected in zip(points, expected_zones, expected_ids):
+        if getattr(zone, "original_id", None) != expected:
+            raise Exception("{} ZoneManager: get_zone({!r}) is {!r}, expected zone {!r}".format(name, pos, zone, expected))
+    # The manager may answer some zones from a lattice, so check against a scan of every fragment too
+    reference = ZoneEngineBase.CreateZoneEngine("scan", fragments)
+    if reference.get_zones(points) != expected_zones:
+        raise Exception("{} ZoneManager lookups disagree with a scan of every fragment".format(name))
+    expected_boxes = [reference.get_zones_in_box(box) for box in boxes]
+
+    for engine in ZoneEngineBase.ENGINE_NAMES:
+        options_list = [{}]
+        if engine == "tree":
+            options_list.append({"lazy": True})
+            options_list.append({"optimize": True})
+            options_list.append({"optimize": True, "bucket_size": 16})
+            options_list.append({"quick": True})
+            options_list.append({"quick": True, "lazy": True})
+        elif engine == "compressed":
+            options_list.append({"max_dense_cells": 0})
+        for options in options_list:
+            index = ZoneEngineBase.CreateZoneEngine(engine, fragments, **options)
+            for pos, expected in zip(points, expected_ids):
+                if getattr(index.get_zone(pos), "original_id", None) != expected:
+                    raise Exception("{} engine {} {!r}: get_zone({!r}) is {!r}, expected zone {!r}".format(name, engine, options, pos, index.get_zone(pos), expected))
+            if index.get_zones(points) != expected_zones:
+                raise Exception("{} engine {} {!r}: get_zones() disagrees with get_zone()".format(name, engine, options))
+            for box, expected in zip(boxes, expected_boxes):
+                if index.get_zones_in_box(box) != expected:
+                    raise Exception("{} engine {} {!r}: get_zones_in_box({!r}) disagrees".format(name, engine, options, box))
+            print("{:<28} {:<8} {!r:<16} agrees on {} points and {} boxes".format(name, engine, options, len(points), len(boxes)))
+
+    # Managers are sent between processes, such as by ZoneTuner, so they must survive pickling
+    for options in ({}, {"anytime": True}, {"engine": "grid", "occupancy_cell_size": 16}):
+        original = ZoneManager(zones, axis_order=[0, 2, 1] if num_axes == 3 else [0, 1], **options)
+        copy = pickle.loads(pickle.dumps(original))
+        if zone_ids(original.get_zones(points)) != expected_ids or zone_ids(copy.get_zones(points)) != expected_ids:
+            raise Exception("{} ZoneManager {!r} gives different zones after pickling".format(name, options))
+        print("{:<28} pickled ZoneManager {!r} agrees".format(name, options))
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+
+from lib.synthetic import config_bounds, plot_grid_zones, uniform_trace
+from lib.zone_manager import ZoneManager
+
+plots = plot_grid_zones(144, plot_size=[7, 20, 7], stride=[10, 0, 10], origin=[0, 60, 0])
+# Leave some holes, and repeat one plot (the second copy is eclipsed)
+del plots[50:55]
+plots.append(dict(plots[10], name="Duplicate Plot"))
+
+zones = (
+    [{"name": "Town", "type": "Capital", "pos1": [25, 0, 25], "pos2": [44, 255, 38]}]
+    + plots
+    + [{"name": "Mine", "type": "AdventureZone", "pos1": [-5, 30, 72], "pos2": [13, 70, 80]}]
+)
+
+with_lattice = ZoneManager(zones)
+without_lattice = ZoneManager(zones, lattice_min_count=None)
+
+print("-"*120)
+for lattice in with_lattice.lattices:
+    print(repr(lattice))
+print("{} zones in lattices, {} zones indexed".format(
+    sum(len(lattice) for lattice in with_lattice.lattices), len(with_lattice.indexed_zones)
+))
+if len(with_lattice.lattices) != 1:
+    raise Exception("Expected the plots to be found as one lattice")
+
+min_corner, max_corner = config_bounds(zones)
+points = uniform_trace([value - 5 for value in min_corner], [value + 5 for value in max_corner], 30000)
+for zone in zones:
+    points.append(tuple(zone["pos1"]))
+    points.append(tuple(zone["pos2"]))
+
+for pos in points:
+    a = with_lattice.get_zone(pos)
+    b = without_lattice.get_zone(pos)
+    if getattr(a, "original_id", None) != getattr(b, "original_id", None):
+        raise Exception("Lattice lookup at {!r} is {!r}, expected {!r}".format(pos, a, b))
+
+for pos1, pos2 in (([0, 0, 0], [30, 255, 30]), ([20, 60, 20], [50, 70, 75]), ([-10, 0, -10], [-1, 255, 200])):
+    a = [zone.original_id for zone in with_lattice.get_zones_in_box(pos1, pos2)]
+    b = [zone.original_id for zone in without_lattice.get_zones_in_box(pos1, pos2)]
+    if a != b:
+        raise Exception("Lattice box query {!r} to {!r} is {!r}, expected {!r}".format(pos1, pos2, a, b))
+
+print("Lattice lookups agree on {} points and 3 boxes".format(len(points)))
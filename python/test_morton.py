@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+from lib.morton import morton_key, morton_order, morton_sorted
+from lib.zone_manager import ZoneManager
+
+# Keys interleave the bits of every axis, x lowest
+for pos, expected in (((0, 0, 0), 0), ((1, 0, 0), 1), ((0, 1, 0), 2), ((0, 0, 1), 4), ((1, 1, 1), 7), ((2, 0, 0), 8)):
+    key = morton_key(pos) - morton_key((0, 0, 0))
+    if key != expected:
+        raise Exception("Morton key of {!r} is {} above the origin, expected {}".format(pos, key, expected))
+
+# Keys follow the bits of every axis, so a box's corners bound its contents, negative or not
+for low, high in (((0, 0, 0), (1, 1, 1)), ((-5, 3, -5), (-4, 4, -4)), ((-100, 0, -100), (100, 255, 100))):
+    if morton_key(low) >= morton_key(high):
+        raise Exception("Morton key of {!r} is not below {!r}".format(low, high))
+
+# Floats are keyed by the block they are in, in 3D and on the generic path
+for pos, block in (
+    ((1.5, 2.0, 3.0), (1, 2, 3)),
+    ((-0.5, 64.25, -7.75), (-1, 64, -8)),
+    ((1.5, 2.9), (1, 2)),
+    ((-3.5, 0.1, 9.99, 4.0), (-4, 0, 9, 4)),
+):
+    if morton_key(pos) != morton_key(block):
+        raise Exception("Morton key of {!r} differs from its block {!r}".format(pos, block))
+
+# 2D keys on the generic path
+if [morton_key((x, y)) - morton_key((0, 0)) for x, y in ((1, 0), (0, 1), (1, 1), (0, 2))] != [1, 2, 3, 8]:
+    raise Exception("2D Morton keys don't interleave x and y")
+
+positions = [(5, 0, 5), (0, 0, 0), (1.5, 0, 0.5), (-3, 2, -3), (4, 4, 4)]
+order = morton_order(positions)
+if [positions[i] for i in order] != morton_sorted(positions):
+    raise Exception("morton_order() and morton_sorted() disagree")
+if sorted(order) != list(range(len(positions))):
+    raise Exception("morton_order() is not a permutation: {!r}".format(order))
+
+# Sorted batch lookups give each position's zone back in the caller's order
+manager = ZoneManager([
+    {"name": "Alice", "type": "Eggs", "pos1": [0, 0, 0], "pos2": [3, 3, 3]},
+    {"name": "Bob", "type": "Spam", "pos1": [-4, 0, -4], "pos2": [-1, 3, -1]},
+])
+positions = [(1.5, 2.0, 3.0), (-0.5, 1.5, -0.5), (4.0, 0.0, 0.0), (0.0, 0.0, 0.0)]
+expected = [manager.get_zone(pos) for pos in positions]
+if manager.get_zones(positions, sort=True) != expected:
+    raise Exception("get_zones(sort=True) disagrees with get_zone() on float positions")
+if [getattr(zone, "name", None) for zone in expected] != ["Alice", "Bob", None, "Alice"]:
+    raise Exception("Unexpected zones for float positions: {!r}".format(expected))
+
+print("Morton keys agree on ints, floats, 2D, 3D and sorted lookups")
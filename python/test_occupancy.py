@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+import random
+from lib.synthetic import random_zones
+from lib.zone_manager import ZoneManager
+from lib.zone_occupancy import ZoneOccupancy
+
+rng = random.Random(0)
+
+def inside(boxes, pos):
+    return any(all(box_min[axis] <= pos[axis] < box_max[axis] for axis in range(len(pos))) for box_min, box_max in boxes)
+
+for num_axes, axes in ((3, None), (3, [0, 1, 2]), (2, None), (2, [1])):
+    boxes = []
+    for _ in range(20):
+        box_min = [rng.randint(-100, 100) for _ in range(num_axes)]
+        boxes.append((box_min, [value + rng.randint(1, 30) for value in box_min]))
+    points = [[rng.uniform(-120, 140) for _ in range(num_axes)] for _ in range(3000)]
+    points += [[rng.randint(-120, 140) for _ in range(num_axes)] for _ in range(3000)]
+    # Corners are exclusive at the max end
+    for box_min, box_max in boxes:
+        points += [list(box_min), [value - 0.5 for value in box_max], list(box_max)]
+
+    for cell_size in (1, 7, 16):
+        occupancy = ZoneOccupancy(boxes, cell_size, axes)
+        for pos in points:
+            # A clear bit must mean no zone; one block cells over every axis are exact
+            expected = inside(boxes, pos)
+            result = occupancy.maybe_occupied(pos)
+            if expected and not result:
+                raise Exception("{}D axes={!r} cell_size={}: {!r} is in a zone, but its cell is clear".format(num_axes, axes, cell_size, pos))
+            if cell_size == 1 and len(occupancy.axes) == num_axes and result != expected:
+                raise Exception("{}D cell_size=1: maybe_occupied({!r}) is {!r}, expected {!r}".format(num_axes, pos, result, expected))
+
+if ZoneOccupancy([]).maybe_occupied([0, 0, 0]) or ZoneOccupancy([]).fill_ratio() != 0.0:
+    raise Exception("An empty bitmap should have no occupied cells")
+
+# A manager using the bitmap answers the same as one without it
+zones = random_zones(40, [0, 0, 0], [600, 255, 600], [5, 5, 5], [60, 60, 60], seed=4)
+plain = ZoneManager(zones)
+for options in ({"occupancy_cell_size": 16}, {"occupancy_cell_size": 16, "engine": "grid"}, {"occupancy_cell_size": 1, "cache_size": 64}):
+    manager = ZoneManager(zones, **options)
+    points = [[rng.uniform(-20, 620), rng.uniform(-5, 260), rng.uniform(-20, 620)] for _ in range(3000)]
+    expected = [getattr(zone, "original_id", None) for zone in plain.get_zones(points)]
+    if [getattr(zone, "original_id", None) for zone in manager.get_zones(points)] != expected:
+        raise Exception("ZoneManager {!r} get_zones() disagrees with no bitmap".format(options))
+    if [getattr(manager.get_zone(pos), "original_id", None) for pos in points] != expected:
+        raise Exception("ZoneManager {!r} get_zone() disagrees with no bitmap".format(options))
+    if list(manager.get_flags_array(points)) != list(plain.get_flags_array(points)):
+        raise Exception("ZoneManager {!r} get_flags_array() disagrees with no bitmap".format(options))
+
+print("ZoneOccupancy never clears an occupied cell, and managers using it agree")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+import random
+from fractions import Fraction
+from lib.synthetic import plot_grid_zones, random_zones
+from lib.zone_manager import ZoneManager
+from lib.zone_scheduler import ZoneScheduler, _ticks_to_enter, _ticks_to_leave
+
+def brute_ticks(pos, box_min, box_max, speed, leaving):
+    """The first tick an entity could be outside (or inside) [box_min, box_max), in exact arithmetic."""
+    pos = [Fraction(value) for value in pos]
+    speed = Fraction(speed)
+    ticks = 0
+    while True:
+        reach = ticks * speed
+        if leaving:
+            if any(pos[axis] - reach < box_min[axis] or box_max[axis] <= pos[axis] + reach for axis in range(len(pos))):
+                return ticks
+        else:
+            if all(
+                max(box_min[axis], pos[axis] - reach) <= min(box_max[axis] - Fraction(1, 1 << 20), pos[axis] + reach)
+                for axis in range(len(pos))
+            ):
+                return ticks
+        ticks += 1
+
+rng = random.Random(0)
+box_min = (0, 10, -20)
+box_max = (16, 30, -4)
+for _ in range(2000):
+    speed = rng.choice((0.25, 0.5, 1, 2, 0.35, 0.1))
+    # Some positions on exact quarter blocks, to hit the faces exactly
+    inside = [rng.randint(4 * box_min[axis], 4 * box_max[axis] - 1) / 4 for axis in range(3)]
+    outside = [rng.randint(4 * (box_min[axis] - 40), 4 * (box_max[axis] + 40)) / 4 for axis in range(3)]
+    for pos, leaving in ((inside, True), (outside, False)):
+        if not leaving and all(box_min[axis] <= pos[axis] < box_max[axis] for axis in range(3)):
+            continue
+        result = (_ticks_to_leave if leaving else _ticks_to_enter)(pos, box_min, box_max, speed)
+        expected = brute_ticks(pos, box_min, box_max, speed, leaving)
+        # Never late; at most a tick early where a face is too close to call in floats
+        if not (expected - 1 <= result <= expected):
+            raise Exception("{} {!r} at speed {}: {} ticks, expected {}".format("Leaving" if leaving else "Entering", pos, speed, result, expected))
+
+# A small crowd checked against a full lookup every tick, through speed changes, teleports and removal
+for zones in (random_zones(30, [0, 0, 0], [200, 60, 200], [5, 5, 5], [40, 30, 40], seed=6), plot_grid_zones(100, origin=[0, 0, 0])):
+    manager = ZoneManager(zones, adjacency=True, lattice_min_count=64)
+    positions = [[rng.uniform(-10, 330), rng.uniform(-5, 70), rng.uniform(-10, 330)] for _ in range(300)]
+    speeds = [rng.choice((0, 0.25, 1)) for _ in positions]
+    scheduler = ZoneScheduler(manager, positions.__getitem__)
+    for i, speed in enumerate(speeds):
+        if scheduler.add(i, speed) is not manager.get_zone(positions[i]):
+            raise Exception("add() returned the wrong zone for entity {}".format(i))
+
+    removed = set()
+    for tick in range(60):
+        for i, pos in enumerate(positions):
+            if tick == 20 and i % 7 == 0:
+                speeds[i] = 1
+                scheduler.set_speed(i, 1)
+            if tick == 30 and i % 11 == 0 and i not in removed:
+                pos[0] += 100
+                scheduler.recheck(i)
+                continue
+            if tick == 40 and i % 13 == 0 and i not in removed:
+                scheduler.remove(i)
+                removed.add(i)
+            for axis in range(3):
+                pos[axis] += rng.uniform(-speeds[i], speeds[i])
+        changes = scheduler.tick()
+        for i, old_zone, new_zone in changes:
+            if old_zone is new_zone:
+                raise Exception("tick() reported entity {} changing to the zone it was in".format(i))
+        for i, pos in enumerate(positions):
+            if i not in removed and scheduler.zone_of(i) is not manager.get_zone(pos):
+                raise Exception("Tick {}: entity {} is in {!r}, scheduler says {!r}".format(tick, i, manager.get_zone(pos), scheduler.zone_of(i)))
+    if len(scheduler) != len(positions) - len(removed):
+        raise Exception("Scheduler tracks {} entities, expected {}".format(len(scheduler), len(positions) - len(removed)))
+
+try:
+    ZoneScheduler(ZoneManager(zones), positions.__getitem__)
+except ValueError:
+    pass
+else:
+    raise Exception("ZoneScheduler without adjacency=True did not raise ValueError")
+
+print("ZoneScheduler schedules lookups in time and never misses a zone change")